@@ -2,7 +2,7 @@
 
 import anthropic
 import speech_recognition as sr
-import os, sys, traceback, markdown, pyaudio, keyword, re, webbrowser, json, pkgutil, tempfile, signal, pdb
+import os, sys, traceback, markdown, pyaudio, keyword, re, webbrowser, json, pkgutil, tempfile, signal, pdb, heapq, math, time, bisect, collections, contextlib, codecs, difflib, hashlib, mmap, array, queue, uuid, threading, subprocess, inspect, builtins, html, importlib.metadata, ast, collections.abc, multiprocessing, concurrent.futures
 from PyQt6 import QtCore, QtGui, QtWidgets
 from pyqtconsole.console import PythonConsole
 
@@ -90,6 +90,9 @@ class SettingsManager:
                 "plugin_directory": "",
                 "backup_directory": "",
                 "backup_count": 10,
+                "tail_max_lines": 100000,
+                "search_max_file_mb": 8,
+                "project_index": False,
                 "check_updates": True,
                 "telemetry": False
             }
@@ -503,6 +506,11 @@ class SettingsDialog(QtWidgets.QDialog):
         self.backup_count.setValue(self.temp_settings["advanced"]["backup_count"])
         layout.addRow("Backup Count:", self.backup_count)
         
+        # Project search index
+        self.project_index = QtWidgets.QCheckBox("Index project folder for fast Find in Files")
+        self.project_index.setChecked(self.temp_settings["advanced"].get("project_index", False))
+        layout.addRow(self.project_index)
+        
         # Check updates
         self.check_updates = QtWidgets.QCheckBox("Check for updates")
         self.check_updates.setChecked(self.temp_settings["advanced"]["check_updates"])
@@ -577,6 +585,7 @@ class SettingsDialog(QtWidgets.QDialog):
         self.temp_settings["advanced"]["plugin_directory"] = self.plugin_directory.text()
         self.temp_settings["advanced"]["backup_directory"] = self.backup_directory.text()
         self.temp_settings["advanced"]["backup_count"] = self.backup_count.value()
+        self.temp_settings["advanced"]["project_index"] = self.project_index.isChecked()
         self.temp_settings["advanced"]["check_updates"] = self.check_updates.isChecked()
         self.temp_settings["advanced"]["telemetry"] = self.telemetry.isChecked()
     
@@ -961,6 +970,19 @@ class ClaudeAIWidget(QtWidgets.QWidget):
         )
         
 # Advanced line number widget with perfect pixel-level alignment
+class PaneFocusFilter(QtCore.QObject):
+    """Moves the shared bottom completer to whichever editor pane gains focus"""
+    
+    def __init__(self, parent_window):
+        super().__init__(parent_window)
+        self.parent_window = parent_window
+    
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Type.FocusIn:
+            self.parent_window.switch_completer_to_editor(obj)
+        return super().eventFilter(obj, event)
+
+
 class LineCountWidget(QtWidgets.QWidget):
     line_clicked = QtCore.pyqtSignal(int)
     
@@ -1804,6 +1826,14 @@ class ProjectExplorer(QtWidgets.QDockWidget):
         self.tree_view.setRootIndex(index)
         self.tree_view.expandToDepth(1)
         
+        # Completion statistics are kept per project
+        if self.parent_window and hasattr(self.parent_window, 'completion_frecency'):
+            self.parent_window.completion_frecency.project_root = path
+        if self.parent_window and hasattr(self.parent_window, 'signature_resolver'):
+            self.parent_window.signature_resolver.project_root = path
+        if self.parent_window and hasattr(self.parent_window, 'project_search'):
+            self.parent_window.project_search.set_project_root(path)
+        
     def refresh_tree(self):
         """Refresh the file tree"""
         current_root = self.file_model.rootPath()
@@ -1815,7 +1845,253 @@ class ProjectExplorer(QtWidgets.QDockWidget):
             file_path = self.file_model.filePath(index)
             if self.parent_window:
                 # Create new tab with the file
-                self.parent_window.createNewTab(file_path)
+                self.parent_window.open_files([file_path])
+
+def build_search_pattern(search_text, case_sensitive=False, whole_words=False, regex=False):
+    """Compile Find options into a pattern; raises re.error for a bad regex"""
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    if not regex:
+        search_text = re.escape(search_text)
+    if whole_words:
+        search_text = r'\b' + search_text + r'\b'
+    return re.compile(search_text, flags)
+
+
+class DocumentMatchIndex:
+    """
+    Sorted start/end positions of every match of one pattern in one document,
+    in QTextDocument positions (UTF-16 units), like contentsChange and cursors.
+    Edits are patched in place: matches before the edit are kept, matches
+    after it are shifted, and only the lines the edit touched are searched
+    again. Regex patterns may match across lines, so for those an edit just
+    invalidates the index and the caller rescans in the background.
+    """
+    
+    def __init__(self, pattern, spans_lines=False):
+        self.pattern = pattern
+        self.spans_lines = spans_lines
+        self.starts = array.array('q')
+        self.ends = array.array('q')
+        self.valid = False
+    
+    @staticmethod
+    def scan(pattern, text, offset=0, should_stop=None):
+        """Document positions of the non-empty matches of pattern in text, which starts at position offset"""
+        starts, ends = array.array('q'), array.array('q')
+        position = utf16_position_mapper(text)
+        for count, match in enumerate(pattern.finditer(text)):
+            if match.end() > match.start():
+                starts.append(position(match.start()) + offset)
+                ends.append(position(match.end()) + offset)
+            if should_stop and count % 4096 == 4095 and should_stop():
+                return None
+        return starts, ends
+    
+    def set_matches(self, starts, ends):
+        self.starts, self.ends = starts, ends
+        self.valid = True
+    
+    def count(self):
+        return len(self.starts)
+    
+    def apply_edit(self, position, removed, added, text_range, line_range):
+        """
+        Patch the index after an edit. text_range(start, end) returns document
+        text and line_range(start, end) widens a range to whole lines, both in
+        post-edit coordinates. Returns False if a full rescan is needed.
+        """
+        if not self.valid:
+            return False
+        if self.spans_lines:
+            self.valid = False
+            return False
+        
+        delta = added - removed
+        starts, ends = self.starts, self.ends
+        # Matches touching the edited range (old coordinates)
+        low = bisect.bisect_left(ends, position)
+        high = bisect.bisect_right(starts, position + removed)
+        if low < high:
+            changed_start = min(position, starts[low])
+            changed_end = max(position + added, ends[high - 1] + delta)
+        else:
+            changed_start, changed_end = position, position + added
+        region_start, region_end = line_range(changed_start, changed_end)
+        
+        # Anything else on the rescanned lines is found again by the scan
+        while low > 0 and ends[low - 1] > region_start:
+            low -= 1
+        while high < len(starts) and starts[high] + delta < region_end:
+            high += 1
+        
+        found_starts, found_ends = self.scan(self.pattern, text_range(region_start, region_end), region_start)
+        tail_starts = array.array('q', (start + delta for start in starts[high:]))
+        tail_ends = array.array('q', (end + delta for end in ends[high:]))
+        self.starts = starts[:low] + found_starts + tail_starts
+        self.ends = ends[:low] + found_ends + tail_ends
+        return True
+    
+    def nearest(self, position):
+        """Index of the first match starting at or after position (wraps to 0)"""
+        index = bisect.bisect_left(self.starts, position)
+        return index if index < len(self.starts) else 0
+    
+    def index_of(self, start, end):
+        """Index of the match exactly spanning start..end, or -1"""
+        index = bisect.bisect_left(self.starts, start)
+        if index < len(self.starts) and self.starts[index] == start and self.ends[index] == end:
+            return index
+        return -1
+    
+    def in_range(self, start, end):
+        """Index range of matches overlapping start..end"""
+        return bisect.bisect_right(self.ends, start), bisect.bisect_left(self.starts, end)
+
+
+def document_text_range(document, start, end):
+    """Plain text of document between two positions"""
+    cursor = QtGui.QTextCursor(document)
+    cursor.setPosition(start)
+    cursor.setPosition(end, QtGui.QTextCursor.MoveMode.KeepAnchor)
+    return cursor.selectedText().replace('\u2029', '\n')
+
+
+def document_line_range(document, start, end):
+    """Widen start..end to whole lines of document"""
+    last = document.characterCount() - 1
+    first_block = document.findBlock(min(start, last))
+    last_block = document.findBlock(min(end, last))
+    return first_block.position(), min(last, last_block.position() + last_block.length() - 1)
+
+
+ASTRAL_CHARACTER_PATTERN = re.compile('[\U00010000-\U0010ffff]')
+
+
+def utf16_position_mapper(text):
+    """
+    Map code point offsets into text (what re and str slicing use) to
+    QTextDocument positions, which count UTF-16 units: every character
+    outside the BMP before an offset shifts it by one.
+    """
+    astral = [match.start() for match in ASTRAL_CHARACTER_PATTERN.finditer(text)]
+    if not astral:
+        return lambda offset: offset
+    return lambda offset: offset + bisect.bisect_left(astral, offset)
+
+
+def replace_spans_in_document(document, edits, text=None):
+    """
+    Apply (start, end, text) edits, sorted by start, as a single undo step.
+    Offsets are code points into document.toPlainText() (pass it as text if
+    it is at hand). Edits on the same or adjacent lines are merged into one
+    cursor edit, and runs are processed from the end backwards so earlier
+    positions stay valid. Every run is its own joined edit block, so
+    contentsChange (and with it the highlighter) covers the changed lines
+    once each, not every line between the first and last edit.
+    """
+    if not edits:
+        return
+    if text is None:
+        text = document.toPlainText()
+    position = utf16_position_mapper(text)
+    groups = []  # [start, end, last block number, pieces], offsets in code points
+    for start, end, replacement in edits:
+        group = groups[-1] if groups else None
+        if group is not None and document.findBlock(position(start)).blockNumber() <= group[2] + 1:
+            group[3].append(text[group[1]:start])
+        else:
+            group = [start, start, 0, []]
+            groups.append(group)
+        group[3].append(replacement)
+        group[1] = end
+        group[2] = document.findBlock(position(end)).blockNumber()
+    
+    cursor = QtGui.QTextCursor(document)
+    for number, (start, end, _, pieces) in enumerate(reversed(groups)):
+        if number:
+            cursor.joinPreviousEditBlock()
+        else:
+            cursor.beginEditBlock()
+        cursor.setPosition(position(start))
+        cursor.setPosition(position(end), QtGui.QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(''.join(pieces))
+        cursor.endEditBlock()
+
+
+class MatchIndexCache:
+    """
+    DocumentMatchIndex per (document, pattern, flags) for find navigation.
+    Each entry is stamped with the document version it matches; versions are
+    counted from contentsChange, which also patches every index of the
+    document in place, so repeated Find Next/Previous are bisect lookups.
+    Indexes hold document positions, so cursor positions and contentsChange
+    ranges are compared with them directly.
+    """
+    
+    MAX_ENTRIES = 32
+    
+    def __init__(self):
+        self.entries = collections.OrderedDict()  # key -> [document, index, version]
+        self.versions = {}  # id(document) -> edit count
+    
+    def get(self, document, pattern, spans_lines=True):
+        """Up-to-date match index for pattern over document"""
+        key = (id(document), pattern.pattern, pattern.flags)
+        doc_id = id(document)
+        if doc_id not in self.versions:
+            self.versions[doc_id] = 0
+            document.contentsChange.connect(
+                lambda position, removed, added, document=document: self.on_contents_change(document, position, removed, added))
+            document.destroyed.connect(lambda *args, doc_id=doc_id: self.forget(doc_id))
+        
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] is document:
+            self.entries.move_to_end(key)
+            if entry[2] == self.versions[doc_id] and entry[1].valid:
+                return entry[1]
+        else:
+            entry = [document, DocumentMatchIndex(pattern, spans_lines), None]
+            self.entries[key] = entry
+            while len(self.entries) > self.MAX_ENTRIES:
+                self.entries.popitem(last=False)
+        
+        entry[1].set_matches(*DocumentMatchIndex.scan(pattern, document.toPlainText()))
+        entry[2] = self.versions[doc_id]
+        return entry[1]
+    
+    def on_contents_change(self, document, position, removed, added):
+        doc_id = id(document)
+        self.versions[doc_id] = self.versions.get(doc_id, 0) + 1
+        text_range = lambda start, end: document_text_range(document, start, end)
+        line_range = lambda start, end: document_line_range(document, start, end)
+        for key, entry in self.entries.items():
+            if key[0] != doc_id or entry[2] != self.versions[doc_id] - 1:
+                continue
+            if entry[1].apply_edit(position, removed, added, text_range, line_range):
+                entry[2] = self.versions[doc_id]
+    
+    def forget(self, doc_id):
+        self.versions.pop(doc_id, None)
+        for key in [key for key in self.entries if key[0] == doc_id]:
+            del self.entries[key]
+
+
+class SearchMatchWorker(QtCore.QThread):
+    """Finds all matches in a document snapshot off the GUI thread"""
+    
+    matches_ready = QtCore.pyqtSignal(int, object, object)  # generation, starts, ends
+    
+    def __init__(self, generation, pattern, text, parent=None):
+        super().__init__(parent)
+        self.generation = generation
+        self.pattern = pattern
+        self.text = text
+    
+    def run(self):
+        result = DocumentMatchIndex.scan(self.pattern, self.text, 0, self.isInterruptionRequested)
+        if result is not None:
+            self.matches_ready.emit(self.generation, *result)
+
 
 class FindReplaceDialog(QtWidgets.QDialog):
     def __init__(self, parent=None):
@@ -1832,6 +2108,9 @@ class FindReplaceDialog(QtWidgets.QDialog):
         find_layout.addWidget(QtWidgets.QLabel("Find:"))
         self.find_edit = QtWidgets.QLineEdit()
         find_layout.addWidget(self.find_edit)
+        self.match_label = QtWidgets.QLabel("")
+        self.match_label.setMinimumWidth(90)
+        find_layout.addWidget(self.match_label)
         layout.addLayout(find_layout)
         
         # Replace section
@@ -1874,6 +2153,192 @@ class FindReplaceDialog(QtWidgets.QDialog):
         self.close_btn.clicked.connect(self.close)
         self.find_edit.returnPressed.connect(self.find_next)
         
+        # Incremental search state
+        self.match_index = None
+        self.search_editor = None
+        self.search_generation = 0
+        self.search_workers = []
+        self.search_origin = None
+        self.jump_to_match = False
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.timeout.connect(self.start_incremental_search)
+        self.highlight_timer = QtCore.QTimer(self)
+        self.highlight_timer.setSingleShot(True)
+        self.highlight_timer.timeout.connect(self.highlight_visible_matches)
+        
+        self.find_edit.textChanged.connect(self.on_search_text_edited)
+        for option in (self.case_sensitive, self.whole_words, self.regex_mode):
+            option.toggled.connect(self.on_search_text_edited)
+        if parent is not None and hasattr(parent, 'tab_widget'):
+            parent.tab_widget.currentChanged.connect(lambda index: self.search_timer.start(0) if self.isVisible() else None)
+    
+    def current_editor(self):
+        """Editor of the current tab, or None for viewer tabs"""
+        parent = self.parent_editor
+        if parent is None or not hasattr(parent, 'tab_widget'):
+            return None
+        index = parent.tab_widget.currentIndex()
+        if index in getattr(parent, 'viewers', {}):
+            return None
+        return parent.editors.get(index)
+    
+    def on_search_text_edited(self, *args):
+        # Typing searches from where the cursor was when the query started
+        editor = self.current_editor()
+        if self.search_origin is None and editor is not None:
+            self.search_origin = editor.textCursor().selectionStart()
+        self.jump_to_match = True
+        self.search_timer.start(150)
+    
+    def attach_editor(self, editor):
+        if editor is self.search_editor:
+            return
+        self.detach_editor()
+        self.search_editor = editor
+        if editor is None:
+            return
+        editor.document().contentsChange.connect(self.on_contents_change)
+        editor.verticalScrollBar().valueChanged.connect(self.schedule_highlight)
+        editor.horizontalScrollBar().valueChanged.connect(self.schedule_highlight)
+        editor.cursorPositionChanged.connect(self.update_match_label)
+    
+    def detach_editor(self):
+        editor = self.search_editor
+        self.search_editor = None
+        if editor is None:
+            return
+        try:
+            editor.setExtraSelections([])
+            editor.document().contentsChange.disconnect(self.on_contents_change)
+            editor.verticalScrollBar().valueChanged.disconnect(self.schedule_highlight)
+            editor.horizontalScrollBar().valueChanged.disconnect(self.schedule_highlight)
+            editor.cursorPositionChanged.disconnect(self.update_match_label)
+        except (TypeError, RuntimeError):
+            pass
+    
+    def start_incremental_search(self):
+        editor = self.current_editor()
+        self.attach_editor(editor)
+        search_text = self.find_edit.text()
+        if editor is None or not search_text:
+            self.match_index = None
+            self.match_label.setText("")
+            self.schedule_highlight()
+            return
+        try:
+            pattern = build_search_pattern(search_text, self.case_sensitive.isChecked(),
+                                           self.whole_words.isChecked(), self.regex_mode.isChecked())
+        except re.error:
+            self.match_index = None
+            self.match_label.setText("Invalid pattern")
+            self.schedule_highlight()
+            return
+        self.match_index = DocumentMatchIndex(pattern, spans_lines=self.regex_mode.isChecked())
+        self.run_search_worker()
+    
+    def run_search_worker(self):
+        """Search a snapshot of the document in the background"""
+        self.search_generation += 1
+        for worker in self.search_workers:
+            worker.requestInterruption()
+        worker = SearchMatchWorker(self.search_generation, self.match_index.pattern,
+                                   self.search_editor.toPlainText(), self)
+        worker.matches_ready.connect(self.on_matches_ready)
+        worker.finished.connect(lambda worker=worker: self.search_workers.remove(worker))
+        self.search_workers.append(worker)
+        self.match_label.setText("Searching…")
+        worker.start()
+    
+    def on_matches_ready(self, generation, starts, ends):
+        if generation != self.search_generation or self.match_index is None or self.search_editor is None:
+            return
+        self.match_index.set_matches(starts, ends)
+        if self.jump_to_match and self.match_index.count():
+            # Search as you type: select the first match after the origin
+            index = self.match_index.nearest(self.search_origin or 0)
+            cursor = self.search_editor.textCursor()
+            cursor.setPosition(self.match_index.starts[index])
+            cursor.setPosition(self.match_index.ends[index], QtGui.QTextCursor.MoveMode.KeepAnchor)
+            self.search_editor.setTextCursor(cursor)
+            self.search_editor.ensureCursorVisible()
+        self.jump_to_match = False
+        self.update_match_label()
+        self.schedule_highlight()
+    
+    def on_contents_change(self, position, removed, added):
+        if self.match_index is None:
+            return
+        self.search_generation += 1  # Results from an older snapshot are stale
+        document = self.search_editor.document()
+        if self.match_index.apply_edit(position, removed, added,
+                                       lambda start, end: document_text_range(document, start, end),
+                                       lambda start, end: document_line_range(document, start, end)):
+            self.update_match_label()
+            self.schedule_highlight()
+        else:
+            self.jump_to_match = False
+            self.search_timer.start(300)
+    
+    def update_match_label(self):
+        index = self.match_index
+        if index is None or self.search_editor is None:
+            return
+        if not index.valid:
+            self.match_label.setText("Searching…")
+            return
+        count = index.count()
+        if count == 0:
+            self.match_label.setText("No matches")
+            return
+        cursor = self.search_editor.textCursor()
+        current = index.index_of(cursor.selectionStart(), cursor.selectionEnd())
+        self.match_label.setText(f"{current + 1} of {count}" if current >= 0 else f"{count} matches")
+    
+    def schedule_highlight(self, *args):
+        self.highlight_timer.start(0)
+    
+    def highlight_visible_matches(self):
+        """Paint only the matches inside the editor's viewport"""
+        editor = self.search_editor
+        if editor is None:
+            return
+        index = self.match_index
+        if index is None or not index.valid or not self.isVisible():
+            editor.setExtraSelections([])
+            return
+        viewport = editor.viewport()
+        top = editor.cursorForPosition(QtCore.QPoint(0, 0)).block().position()
+        bottom_block = editor.cursorForPosition(QtCore.QPoint(viewport.width(), viewport.height())).block()
+        bottom = bottom_block.position() + bottom_block.length()
+        
+        match_format = QtGui.QTextCharFormat()
+        match_format.setBackground(QtGui.QColor("#ffd866"))
+        selections = []
+        first, last = index.in_range(top, bottom)
+        document = editor.document()
+        for i in range(first, min(last, first + 2000)):
+            selection = QtWidgets.QTextEdit.ExtraSelection()
+            selection.cursor = QtGui.QTextCursor(document)
+            selection.cursor.setPosition(index.starts[i])
+            selection.cursor.setPosition(index.ends[i], QtGui.QTextCursor.MoveMode.KeepAnchor)
+            selection.format = match_format
+            selections.append(selection)
+        editor.setExtraSelections(selections)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.search_origin = None
+        self.search_timer.start(0)
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        for worker in self.search_workers:
+            worker.requestInterruption()
+        self.detach_editor()
+        self.match_index = None
+        self.search_origin = None
+        
     def find_next(self):
         if self.parent_editor:
             self.parent_editor.find_text_in_dialog(self.find_edit.text(), 
@@ -3758,6 +4223,1024 @@ class debugger(AdvancedDebugger):
             self.debug_stop()
         event.accept()
 
+class CompletionFrecency:
+    """
+    Persistent frequency/recency table of accepted completions.
+    Each entry stores an exponentially decayed use count and the time of the
+    last use, kept separately per (project, file type) scope.
+    """
+    
+    HALF_LIFE = 7 * 24 * 3600  # Seconds for a use to lose half its weight
+    MAX_ENTRIES_PER_SCOPE = 500
+    SAVE_DELAY = 5.0  # Seconds between persisted writes
+    
+    def __init__(self, config_dir=None):
+        self.config_dir = config_dir or os.path.expanduser("~/.pythonico")
+        self.data_file = os.path.join(self.config_dir, "completion_frecency.json")
+        self.project_root = ""
+        self.scopes = {}
+        self.stats = {"accepted": 0, "typed": 0, "inserted": 0}
+        self.dirty = False
+        self.last_save = 0.0
+        self.load()
+    
+    def load(self):
+        if not os.path.exists(self.data_file):
+            return
+        try:
+            with open(self.data_file, 'r') as f:
+                data = json.load(f)
+            self.scopes = data.get("scopes", {})
+            self.stats.update(data.get("stats", {}))
+        except Exception as e:
+            print(f"Error loading completion statistics: {e}")
+    
+    def save(self):
+        """Write the table to disk if it changed since the last save"""
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(self.config_dir, exist_ok=True)
+            temp_file = self.data_file + ".tmp"
+            with open(temp_file, 'w') as f:
+                json.dump({"scopes": self.scopes, "stats": self.stats}, f, separators=(',', ':'))
+            os.replace(temp_file, self.data_file)
+            self.dirty = False
+            self.last_save = time.time()
+        except Exception as e:
+            print(f"Error saving completion statistics: {e}")
+    
+    def scope_for_editor(self, editor):
+        """Build the (project, file type) scope key for an editor"""
+        file_path = editor.property("file_path") if editor is not None else None
+        if file_path:
+            extension = os.path.splitext(file_path)[1].lower() or "none"
+            project = self.project_root
+            if not project or not os.path.abspath(file_path).startswith(os.path.abspath(project) + os.sep):
+                project = os.path.dirname(os.path.abspath(file_path))
+        else:
+            extension = ".py"
+            project = self.project_root or ""
+        return f"{project}|{extension}"
+    
+    def _decayed(self, entry, now):
+        score, last_used = entry
+        return score * 0.5 ** (max(0.0, now - last_used) / self.HALF_LIFE)
+    
+    def record(self, scope, text, typed_length=0):
+        """Record that completion text was accepted after typing typed_length characters"""
+        if not text:
+            return
+        now = time.time()
+        table = self.scopes.setdefault(scope, {})
+        entry = table.get(text)
+        score = self._decayed(entry, now) + 1.0 if entry else 1.0
+        table[text] = [round(score, 3), int(now)]
+        
+        self.stats["accepted"] += 1
+        self.stats["typed"] += typed_length
+        self.stats["inserted"] += len(text)
+        
+        if len(table) > self.MAX_ENTRIES_PER_SCOPE:
+            self.compact(scope, now)
+        
+        self.dirty = True
+        if now - self.last_save >= self.SAVE_DELAY:
+            self.save()
+    
+    def compact(self, scope, now=None):
+        """Drop the weakest entries of a scope down to the size limit"""
+        now = now or time.time()
+        table = self.scopes.get(scope, {})
+        keep = heapq.nlargest(self.MAX_ENTRIES_PER_SCOPE * 3 // 4, table.items(),
+                              key=lambda item: self._decayed(item[1], now))
+        self.scopes[scope] = dict(keep)
+    
+    def scores_for(self, scope):
+        """Return {text: decayed score} for a scope"""
+        now = time.time()
+        return {text: self._decayed(entry, now) for text, entry in self.scopes.get(scope, {}).items()}
+    
+    @staticmethod
+    def rank_bucket(score):
+        """Coarse bucket so that small score differences do not reorder items"""
+        return int(math.log2(1.0 + score) * 2) if score > 0 else 0
+    
+    def keystrokes_per_completion(self):
+        """Average number of characters typed before accepting a completion"""
+        if not self.stats["accepted"]:
+            return 0.0
+        return self.stats["typed"] / self.stats["accepted"]
+
+class CompletionProfiler:
+    """
+    Per-stage latency recorder for the completion pipeline.
+    Each stage keeps its most recent samples in a ring buffer so percentiles
+    reflect current behaviour rather than the whole session.
+    """
+    
+    STAGES = ['index', 'filter', 'rank', 'render', 'total']
+    HISTOGRAM_BOUNDS = [0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128]  # Milliseconds
+    
+    def __init__(self, capacity=2048):
+        self.capacity = capacity
+        self.samples = {}
+        self.reset()
+    
+    def reset(self):
+        self.samples = {stage: collections.deque(maxlen=self.capacity) for stage in self.STAGES}
+    
+    def record(self, stage, milliseconds):
+        if stage not in self.samples:
+            self.samples[stage] = collections.deque(maxlen=self.capacity)
+        self.samples[stage].append(milliseconds)
+    
+    @contextlib.contextmanager
+    def measure(self, stage):
+        """Context manager timing the enclosed block into stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - started) * 1000.0)
+    
+    @staticmethod
+    def percentile(ordered, fraction):
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return ordered[index]
+    
+    def histogram(self, stage):
+        """Bucket counts for stage using HISTOGRAM_BOUNDS as upper limits"""
+        counts = [0] * (len(self.HISTOGRAM_BOUNDS) + 1)
+        for value in self.samples.get(stage, ()):
+            counts[bisect.bisect_left(self.HISTOGRAM_BOUNDS, value)] += 1
+        return counts
+    
+    def summary(self):
+        """Return {stage: {count, p50, p95, p99, max}} in milliseconds"""
+        result = {}
+        for stage, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[stage] = {
+                'count': len(ordered),
+                'p50': self.percentile(ordered, 0.50),
+                'p95': self.percentile(ordered, 0.95),
+                'p99': self.percentile(ordered, 0.99),
+                'max': ordered[-1] if ordered else 0.0
+            }
+        return result
+    
+    def export_json(self, file_path):
+        """Write summary, histograms and raw samples to a JSON file"""
+        data = {
+            'generated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'capacity': self.capacity,
+            'histogram_bounds_ms': self.HISTOGRAM_BOUNDS,
+            'stages': {}
+        }
+        summary = self.summary()
+        for stage, samples in self.samples.items():
+            data['stages'][stage] = dict(summary[stage],
+                                         histogram=self.histogram(stage),
+                                         samples=[round(value, 4) for value in samples])
+        with open(file_path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+class CompletionDiagnosticsDialog(QtWidgets.QDialog):
+    """Live p50/p95/p99 readout of completion stage latencies and completion usage"""
+    
+    def __init__(self, profiler, frecency=None, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.frecency = frecency
+        self.setWindowTitle("Completion Diagnostics")
+        self.setModal(False)
+        self.resize(560, 320)
+        
+        layout = QtWidgets.QVBoxLayout(self)
+        
+        self.table = QtWidgets.QTableWidget(0, 6)
+        self.table.setHorizontalHeaderLabels(["Stage", "Samples", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Max (ms)"])
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+        
+        self.histogram_label = QtWidgets.QLabel()
+        self.histogram_label.setFont(QtGui.QFont("Monospace", 9))
+        layout.addWidget(self.histogram_label)
+        
+        self.usage_label = QtWidgets.QLabel()
+        layout.addWidget(self.usage_label)
+        
+        button_layout = QtWidgets.QHBoxLayout()
+        self.reset_btn = QtWidgets.QPushButton("Reset")
+        self.export_btn = QtWidgets.QPushButton("Export JSON...")
+        self.close_btn = QtWidgets.QPushButton("Close")
+        button_layout.addWidget(self.reset_btn)
+        button_layout.addWidget(self.export_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(self.close_btn)
+        layout.addLayout(button_layout)
+        
+        self.reset_btn.clicked.connect(self.reset)
+        self.export_btn.clicked.connect(self.export)
+        self.close_btn.clicked.connect(self.close)
+        
+        # Refresh while visible
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(1000)
+        self.refresh()
+    
+    def refresh(self):
+        summary = self.profiler.summary()
+        stages = [stage for stage in self.profiler.STAGES if stage in summary]
+        self.table.setRowCount(len(stages))
+        for row, stage in enumerate(stages):
+            values = summary[stage]
+            cells = [stage, str(values['count'])] + [f"{values[key]:.3f}" for key in ('p50', 'p95', 'p99', 'max')]
+            for column, text in enumerate(cells):
+                self.table.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+        
+        # Text histogram of the total per-keystroke latency
+        counts = self.profiler.histogram('total')
+        peak = max(counts) or 1
+        labels = [f"<{bound}" for bound in self.profiler.HISTOGRAM_BOUNDS] + [f">={self.profiler.HISTOGRAM_BOUNDS[-1]}"]
+        lines = [f"{label:>7} ms | {'#' * int(30 * count / peak)} {count}" for label, count in zip(labels, counts)]
+        self.histogram_label.setText("Total latency histogram\n" + "\n".join(lines))
+        
+        if self.frecency is not None:
+            stats = self.frecency.stats
+            self.usage_label.setText(
+                f"Completions accepted: {stats['accepted']:,}, "
+                f"{self.frecency.keystrokes_per_completion():.1f} keystrokes typed per completion, "
+                f"{max(0, stats['inserted'] - stats['typed']):,} characters saved")
+    
+    def reset(self):
+        self.profiler.reset()
+        self.refresh()
+    
+    def export(self):
+        home_dir = QtCore.QDir.homePath()
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Completion Timings", home_dir, "JSON Files (*.json)")
+        if file_path:
+            try:
+                self.profiler.export_json(file_path)
+            except Exception as e:
+                QtWidgets.QMessageBox.critical(self, "Error", f"Could not export timings: {str(e)}")
+    
+    def closeEvent(self, event):
+        self.refresh_timer.stop()
+        event.accept()
+    
+    def showEvent(self, event):
+        self.refresh_timer.start(1000)
+        super().showEvent(event)
+
+class SharedWordIndex(QtCore.QObject):
+    """
+    Word index over every open document, used as a low-priority completion
+    source. Each document keeps a per-block word list that is patched from
+    contentsChange, so an edit only re-tokenizes the blocks it touched.
+    Documents are reference counted by the editors that show them.
+    """
+    
+    WORD_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]{2,}')
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.documents = {}  # document -> state dict
+        self.counts = collections.Counter()  # word -> occurrences across documents
+        self.buckets = {}  # lowercase 1/2-char prefix -> set of words
+    
+    def acquire(self, document):
+        """Start (or keep) indexing document; balanced by release()"""
+        state = self.documents.get(document)
+        if state is not None:
+            state['refs'] += 1
+            return
+        
+        def on_change(position, removed, added, document=document):
+            self.on_contents_change(document, position, removed, added)
+        
+        state = {'refs': 1, 'blocks': [], 'counts': collections.Counter(), 'slot': on_change}
+        self.documents[document] = state
+        self._rebuild(document, state)
+        document.contentsChange.connect(on_change)
+        document.destroyed.connect(lambda *_, document=document: self._drop(document))
+    
+    def release(self, document):
+        """Drop one reference; the document is forgotten at zero"""
+        state = self.documents.get(document)
+        if state is None:
+            return
+        state['refs'] -= 1
+        if state['refs'] <= 0:
+            try:
+                document.contentsChange.disconnect(state['slot'])
+            except (TypeError, RuntimeError):
+                pass
+            self._drop(document)
+    
+    def _drop(self, document):
+        state = self.documents.pop(document, None)
+        if state is not None:
+            self._remove_words(state['counts'], state['counts'])
+    
+    def _tokenize(self, text):
+        return self.WORD_PATTERN.findall(text)
+    
+    def _add_words(self, doc_counts, words):
+        for word in words:
+            doc_counts[word] += 1
+            self.counts[word] += 1
+            if self.counts[word] == 1:
+                lowered = word.lower()
+                self.buckets.setdefault(lowered[:1], set()).add(word)
+                self.buckets.setdefault(lowered[:2], set()).add(word)
+    
+    def _remove_words(self, doc_counts, words):
+        for word, count in list(collections.Counter(words).items()):
+            doc_counts[word] -= count
+            if doc_counts[word] <= 0:
+                del doc_counts[word]
+            self.counts[word] -= count
+            if self.counts[word] <= 0:
+                del self.counts[word]
+                lowered = word.lower()
+                for key in (lowered[:1], lowered[:2]):
+                    bucket = self.buckets.get(key)
+                    if bucket is not None:
+                        bucket.discard(word)
+                        if not bucket:
+                            del self.buckets[key]
+    
+    def _rebuild(self, document, state):
+        self._remove_words(state['counts'], dict(state['counts']))
+        blocks = []
+        block = document.begin()
+        while block.isValid():
+            words = self._tokenize(block.text())
+            blocks.append(words)
+            self._add_words(state['counts'], words)
+            block = block.next()
+        state['blocks'] = blocks
+    
+    def on_contents_change(self, document, position, removed, added):
+        """Re-tokenize only the blocks touched by an edit"""
+        state = self.documents.get(document)
+        if state is None:
+            return
+        
+        blocks = state['blocks']
+        first = document.findBlock(position).blockNumber()
+        last_new = document.findBlock(position + added).blockNumber()
+        if first < 0:
+            first = 0
+        if last_new < 0:
+            last_new = document.blockCount() - 1
+        delta = document.blockCount() - len(blocks)
+        last_old = last_new - delta
+        
+        if last_old < first - 1 or last_old >= len(blocks):
+            # Lost track of the block structure; start over for this document
+            self._rebuild(document, state)
+            return
+        
+        for words in blocks[first:last_old + 1]:
+            self._remove_words(state['counts'], words)
+        
+        new_words = []
+        block = document.findBlockByNumber(first)
+        for _ in range(last_new - first + 1):
+            if not block.isValid():
+                break
+            words = self._tokenize(block.text())
+            new_words.append(words)
+            self._add_words(state['counts'], words)
+            block = block.next()
+        
+        blocks[first:last_old + 1] = new_words
+    
+    def words_with_prefix(self, prefix, exclude=None, limit=50):
+        """
+        Words starting with prefix (case-insensitive) that occur in any
+        indexed document other than exclude.
+        """
+        lowered = prefix.lower()
+        if not lowered:
+            return []
+        bucket = self.buckets.get(lowered[:2], ())
+        excluded_counts = self.documents[exclude]['counts'] if exclude in self.documents else {}
+        
+        results = []
+        for word in bucket:
+            if (word.lower().startswith(lowered) and word != prefix and
+                    self.counts[word] > excluded_counts.get(word, 0)):
+                results.append(word)
+        
+        results.sort(key=lambda word: (-self.counts[word], word.lower()))
+        return results[:limit]
+
+class FuzzyMatcher:
+    """
+    fzf-style fuzzy matcher used to filter and rank completion candidates.
+    Candidates are indexed once into per-character bitsets so that a query can
+    reject non-matching candidates with a handful of big-integer ANDs before
+    any per-candidate scoring happens. A single character would leave most of
+    a large list to score, so one-character queries only match candidates
+    that start with it, read from a per-character bucket in rank order.
+    Longer queries are scored per survivor in Python; over a 200k-name list
+    that is tens to hundreds of milliseconds, well above the 2 ms target,
+    which is met only by completion-sized lists.
+    """
+    
+    # Scoring model (mirrors fzf's v1 algorithm)
+    SCORE_MATCH = 16
+    SCORE_GAP_START = -3
+    SCORE_GAP_EXTENSION = -1
+    BONUS_BOUNDARY = SCORE_MATCH // 2
+    BONUS_NON_WORD = SCORE_MATCH // 2
+    BONUS_CAMEL = BONUS_BOUNDARY + SCORE_GAP_EXTENSION
+    BONUS_CONSECUTIVE = -(SCORE_GAP_START + SCORE_GAP_EXTENSION)
+    BONUS_FIRST_CHAR_MULTIPLIER = 2
+    
+    # Character classes used for boundary detection
+    CHAR_NON_WORD = 0
+    CHAR_LOWER = 1
+    CHAR_UPPER = 2
+    CHAR_NUMBER = 3
+    
+    def __init__(self, candidates=None):
+        self.candidates = []
+        self._lowered = []
+        self._char_bits = {}
+        self._first_chars = {}  # first character -> indices in rank order
+        self._all_bits = 0
+        self._last_query = ""
+        self._last_bits = 0
+        self.set_candidates(candidates or [])
+    
+    def set_candidates(self, candidates):
+        """Index a new candidate list into per-character bitsets"""
+        self.candidates = list(candidates)
+        self._lowered = [text.lower() for text in self.candidates]
+        count = len(self._lowered)
+        
+        # Build each bitset in a bytearray, converting to an int only once
+        buckets = {}
+        size = (count + 7) // 8
+        for i, text in enumerate(self._lowered):
+            byte_index = i >> 3
+            bit = 1 << (i & 7)
+            for char in set(text):
+                bucket = buckets.get(char)
+                if bucket is None:
+                    bucket = buckets[char] = bytearray(size)
+                bucket[byte_index] |= bit
+        
+        self._char_bits = {char: int.from_bytes(bucket, 'little') for char, bucket in buckets.items()}
+        self._all_bits = (1 << count) - 1
+        
+        # Prefix matches of one character all score the same, so shorter (then later) ones rank first
+        first_chars = {}
+        for i, text in enumerate(self._lowered):
+            if text:
+                first_chars.setdefault(text[0], []).append(i)
+        for indices in first_chars.values():
+            indices.sort(key=lambda i: (len(self._lowered[i]), -i))
+        self._first_chars = first_chars
+        self._last_query = ""
+        self._last_bits = self._all_bits
+    
+    @classmethod
+    def char_class(cls, char):
+        """Classify a character for boundary and camel-case bonuses"""
+        if char.islower():
+            return cls.CHAR_LOWER
+        if char.isupper():
+            return cls.CHAR_UPPER
+        if char.isdigit():
+            return cls.CHAR_NUMBER
+        if char.isalpha():
+            return cls.CHAR_LOWER
+        return cls.CHAR_NON_WORD
+    
+    @classmethod
+    def bonus_for(cls, prev_class, current_class):
+        """Bonus for matching a character given the class of its predecessor"""
+        if prev_class == cls.CHAR_NON_WORD and current_class != cls.CHAR_NON_WORD:
+            return cls.BONUS_BOUNDARY
+        if ((prev_class == cls.CHAR_LOWER and current_class == cls.CHAR_UPPER) or
+                (prev_class != cls.CHAR_NUMBER and current_class == cls.CHAR_NUMBER)):
+            return cls.BONUS_CAMEL
+        if current_class == cls.CHAR_NON_WORD:
+            return cls.BONUS_NON_WORD
+        return 0
+    
+    def prefilter(self, query):
+        """Return indices of candidates containing every character of query"""
+        query = query.lower()
+        
+        # Typing usually extends the previous query, so narrow its survivors
+        if self._last_query and query.startswith(self._last_query):
+            bits = self._last_bits
+        else:
+            bits = self._all_bits
+        
+        for char in set(query):
+            bits &= self._char_bits.get(char, 0)
+            if not bits:
+                break
+        
+        self._last_query = query
+        self._last_bits = bits
+        
+        if not bits:
+            return []
+        
+        # Walk the set bits of the survivor mask; cost scales with survivors
+        flags = bin(bits)[:1:-1]
+        indices = []
+        append = indices.append
+        find = flags.find
+        index = find('1')
+        while index != -1:
+            append(index)
+            index = find('1', index + 1)
+        return indices
+    
+    def score(self, pattern, text, lowered=None):
+        """Score text against a lowercase pattern, or None if it does not match"""
+        if not pattern:
+            return 0
+        if lowered is None:
+            lowered = text.lower()
+        
+        pattern_length = len(pattern)
+        
+        # Forward pass: find the earliest end position of the subsequence
+        end = -1
+        for char in pattern:
+            end = lowered.find(char, end + 1)
+            if end < 0:
+                return None
+        
+        # Backward pass: tighten the match to the shortest window ending at end
+        start = end + 1
+        for char in reversed(pattern):
+            start = lowered.rfind(char, 0, start)
+        
+        # Score the window
+        char_class = self.char_class
+        bonus_for = self.bonus_for
+        score = 0
+        pattern_index = 0
+        consecutive = 0
+        first_bonus = 0
+        in_gap = False
+        prev_class = char_class(text[start - 1]) if start > 0 else self.CHAR_NON_WORD
+        
+        for index in range(start, end + 1):
+            current_class = char_class(text[index])
+            if pattern_index < pattern_length and lowered[index] == pattern[pattern_index]:
+                score += self.SCORE_MATCH
+                bonus = bonus_for(prev_class, current_class)
+                if consecutive == 0:
+                    first_bonus = bonus
+                else:
+                    if bonus >= self.BONUS_BOUNDARY and bonus > first_bonus:
+                        first_bonus = bonus
+                    bonus = max(bonus, first_bonus, self.BONUS_CONSECUTIVE)
+                if pattern_index == 0:
+                    score += bonus * self.BONUS_FIRST_CHAR_MULTIPLIER
+                else:
+                    score += bonus
+                in_gap = False
+                consecutive += 1
+                pattern_index += 1
+            else:
+                score += self.SCORE_GAP_EXTENSION if in_gap else self.SCORE_GAP_START
+                in_gap = True
+                consecutive = 0
+                first_bonus = 0
+            prev_class = current_class
+        
+        return score
+    
+    def score_batch(self, pattern, candidates=None, limit=None):
+        """
+        Score many candidates at once.
+        Returns (score, index) pairs for matching candidates, best first.
+        """
+        if candidates is not None and candidates is not self.candidates:
+            self.set_candidates(candidates)
+        
+        pattern = pattern.lower()
+        if not pattern:
+            return [(0, index) for index in range(len(self.candidates))][:limit]
+        
+        score = self.score
+        texts = self.candidates
+        lowered = self._lowered
+        if len(pattern) == 1:
+            bucket = self._first_chars.get(pattern, [])
+            return [(score(pattern, texts[index], lowered[index]), index) for index in bucket[:limit]]
+        
+        results = []
+        for index in self.prefilter(pattern):
+            value = score(pattern, texts[index], lowered[index])
+            if value is not None:
+                # Shorter candidates win ties
+                results.append((value, -len(texts[index]), index))
+        
+        if limit is not None and limit < len(results):
+            results = heapq.nlargest(limit, results)
+        else:
+            results.sort(reverse=True)
+        return [(value, index) for value, _, index in results]
+    
+    def match(self, pattern, text):
+        """Check whether pattern is a fuzzy subsequence of text"""
+        return self.score(pattern.lower(), text) is not None
+
+
+class SignatureResolver:
+    """
+    Resolves callable signatures for signature help.
+    Sources are tried in order: definitions in the current buffer and project
+    files, stub files (.pyi / typeshed), then an out-of-process introspection
+    run so that arbitrary modules are never imported into the IDE itself.
+    Only names bound by an import in the buffer are introspected, in an
+    isolated interpreter, so typing a call never runs a same-named local script.
+    Results are memoized per (module version, qualified name); only stub and
+    introspection results are persisted, since project files change while editing.
+    """
+    
+    PERSISTED_SOURCES = ('stub', 'introspection')
+    # Stdlib modules that act on import
+    INTROSPECT_SKIP = {'antigravity', 'this', '__hello__', '__phello__'}
+    
+    DEF_PATTERN = re.compile(
+        r'^([ \t]*)(?:async[ \t]+)?(def|class)[ \t]+([A-Za-z_]\w*)[ \t]*(\([^)]*\))?(?:[ \t]*->[ \t]*([^:\n]+))?[ \t]*:',
+        re.M)
+    IMPORT_PATTERN = re.compile(r'^[ \t]*import[ \t]+([\w.]+)(?:[ \t]+as[ \t]+(\w+))?', re.M)
+    FROM_IMPORT_PATTERN = re.compile(r'^[ \t]*from[ \t]+([\w.]+)[ \t]+import[ \t]+\(?([^)\n]+)', re.M)
+    
+    INTROSPECT_SCRIPT = (
+        "import importlib, inspect, json, sys\n"
+        "parts = sys.argv[1].split('.')\n"
+        "obj = None\n"
+        "for i in range(len(parts), 0, -1):\n"
+        "    try:\n"
+        "        obj = importlib.import_module('.'.join(parts[:i]))\n"
+        "    except Exception:\n"
+        "        continue\n"
+        "    try:\n"
+        "        for attr in parts[i:]:\n"
+        "            obj = getattr(obj, attr)\n"
+        "    except AttributeError:\n"
+        "        obj = None\n"
+        "    break\n"
+        "result = {'signature': None, 'doc': ''}\n"
+        "if obj is not None:\n"
+        "    try:\n"
+        "        result['signature'] = str(inspect.signature(obj))\n"
+        "    except (TypeError, ValueError):\n"
+        "        pass\n"
+        "    result['doc'] = (inspect.getdoc(obj) or '').split('\\n\\n')[0][:400]\n"
+        "print(json.dumps(result))\n"
+    )
+    
+    def __init__(self, config_dir=None):
+        self.config_dir = config_dir or os.path.expanduser("~/.pythonico")
+        self.cache_file = os.path.join(self.config_dir, "signature_cache.json")
+        self.memo = {}  # "version|qualified name" -> {'signature', 'doc', 'source'}
+        self.file_definitions = {}  # path -> (mtime, definitions)
+        self.stub_roots = None
+        self.project_root = ""
+        self.versions = {}  # top-level module -> memo key prefix
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()  # Serializes cache writes from worker threads
+        self.load_cache()
+    
+    def load_cache(self):
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r') as f:
+                    memo = json.load(f)
+                # Older caches also stored project and unresolved results
+                self.memo = {key: value for key, value in memo.items()
+                             if value.get('source') in self.PERSISTED_SOURCES}
+            except Exception as e:
+                print(f"Error loading signature cache: {e}")
+    
+    def save_cache(self):
+        try:
+            os.makedirs(self.config_dir, exist_ok=True)
+            with self.save_lock:
+                with self.lock:
+                    data = {key: value for key, value in self.memo.items()
+                            if value.get('source') in self.PERSISTED_SOURCES}
+                write_file_atomically(self.cache_file, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        except Exception as e:
+            print(f"Error saving signature cache: {e}")
+    
+    @classmethod
+    def definitions_from_source(cls, source):
+        """Map function/class names (and Class.method) to signature strings"""
+        definitions = {}
+        classes = []  # Stack of (indent, name)
+        for match in cls.DEF_PATTERN.finditer(source):
+            indent, kind, name, params, returns = match.groups()
+            indent = len(indent.expandtabs(4))
+            while classes and classes[-1][0] >= indent:
+                classes.pop()
+            params = ' '.join((params or '()').split())
+            if kind == 'class':
+                definitions.setdefault(name, f"{name}(...)")
+                classes.append((indent, name))
+                continue
+            signature = f"{name}{params}" + (f" -> {returns.strip()}" if returns else "")
+            if classes:
+                owner = classes[-1][1]
+                definitions[f"{owner}.{name}"] = signature
+                definitions.setdefault(name, signature)
+                if name == '__init__':
+                    # Calling the class shows the constructor without self
+                    ctor_params = re.sub(r'^\(\s*self\s*,?\s*', '(', params)
+                    definitions[owner] = f"{owner}{ctor_params}"
+            else:
+                definitions[name] = signature
+        return definitions
+    
+    @classmethod
+    def import_aliases(cls, source):
+        """Map local names to the qualified names they were imported as"""
+        aliases = {}
+        for match in cls.IMPORT_PATTERN.finditer(source):
+            module, alias = match.groups()
+            aliases[alias or module.split('.')[0]] = module if alias else module.split('.')[0]
+        for match in cls.FROM_IMPORT_PATTERN.finditer(source):
+            module, names = match.groups()
+            for name in names.split(','):
+                name = name.strip()
+                if not name or name == '*':
+                    continue
+                original, _, alias = name.partition(' as ')
+                aliases[(alias or original).strip()] = f"{module}.{original.strip()}"
+        return aliases
+    
+    def qualify(self, callee, source):
+        """Expand the leading name of callee through the buffer's imports; (qualified name, imported)"""
+        head, _, rest = callee.partition('.')
+        if head == 'self':
+            return rest, False
+        qualified = self.import_aliases(source).get(head)
+        if qualified:
+            return qualified + ('.' + rest if rest else ''), True
+        return callee, False
+    
+    @staticmethod
+    def builtin_signature(name):
+        """Signature of a builtin via in-process introspection (builtins are always loaded)"""
+        obj = getattr(builtins, name, None)
+        if obj is None or not callable(obj):
+            return None
+        try:
+            return f"{name}{inspect.signature(obj)}"
+        except (TypeError, ValueError):
+            return None
+    
+    def lookup_local(self, callee, source):
+        """Resolve from the current buffer or a builtin"""
+        definitions = self.definitions_from_source(source)
+        name = callee[5:] if callee.startswith('self.') else callee
+        if name in definitions:
+            return {'signature': definitions[name], 'doc': '', 'source': 'buffer'}
+        tail = name.rsplit('.', 1)[-1]
+        if '.' not in name and tail in definitions:
+            return {'signature': definitions[tail], 'doc': '', 'source': 'buffer'}
+        if '.' not in name:
+            signature = self.builtin_signature(name)
+            if signature:
+                return {'signature': signature, 'doc': '', 'source': 'builtin'}
+        return None
+    
+    def module_version(self, module):
+        top = module.split('.')[0]
+        version = self.versions.get(top)
+        if version is None:
+            # Package metadata lookups scan sys.path, so do each only once
+            try:
+                version = f"{top}=={importlib.metadata.version(top)}"
+            except Exception:
+                version = f"python=={sys.version.split()[0]}"
+            self.versions[top] = version
+        return version
+    
+    def find_project_file(self, module):
+        if not self.project_root:
+            return None
+        base = os.path.join(self.project_root, *module.split('.'))
+        for candidate in (base + '.pyi', base + '.py', os.path.join(base, '__init__.pyi'), os.path.join(base, '__init__.py')):
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+    
+    def find_stub_file(self, module):
+        if self.stub_roots is None:
+            roots = []
+            for entry in sys.path:
+                if not entry or not os.path.isdir(entry):
+                    continue
+                roots.append(entry)
+                for typeshed in (os.path.join(entry, 'mypy', 'typeshed', 'stdlib'),
+                                 os.path.join(entry, 'jedi', 'third_party', 'typeshed', 'stdlib')):
+                    if os.path.isdir(typeshed):
+                        roots.append(typeshed)
+            self.stub_roots = roots
+        
+        parts = module.split('.')
+        for root in self.stub_roots:
+            for base in (os.path.join(root, *parts), os.path.join(root, parts[0] + '-stubs', *parts[1:])):
+                for candidate in (base + '.pyi', os.path.join(base, '__init__.pyi')):
+                    if os.path.isfile(candidate):
+                        return candidate
+        return None
+    
+    def definitions_from_file(self, path):
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return {}
+        cached = self.file_definitions.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                definitions = self.definitions_from_source(f.read())
+        except OSError:
+            definitions = {}
+        self.file_definitions[path] = (mtime, definitions)
+        return definitions
+    
+    def lookup_files(self, qualified, project=True, stubs=True):
+        """Resolve from project modules or stub files, trying each module/attribute split"""
+        finders = []
+        if project:
+            finders.append((self.find_project_file, 'project'))
+        if stubs:
+            finders.append((self.find_stub_file, 'stub'))
+        parts = qualified.split('.')
+        for split in range(len(parts) - 1, 0, -1):
+            module, attribute = '.'.join(parts[:split]), '.'.join(parts[split:])
+            for finder, source in finders:
+                path = finder(module)
+                if path:
+                    signature = self.definitions_from_file(path).get(attribute)
+                    if signature:
+                        return {'signature': f"{module}.{signature}", 'doc': '', 'source': source}
+        return None
+    
+    def introspect(self, qualified):
+        """Ask a separate interpreter for inspect.signature of qualified"""
+        try:
+            # Not sys.executable: in the frozen build that is the editor itself
+            # Isolated mode from a neutral folder keeps the current folder off sys.path
+            completed = subprocess.run(["python3", '-I', '-c', self.INTROSPECT_SCRIPT, qualified],
+                                       capture_output=True, text=True, timeout=5, cwd=os.path.abspath(os.sep))
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+        except Exception:
+            return None
+        if not result.get('signature'):
+            return None
+        return {'signature': f"{qualified}{result['signature']}", 'doc': result.get('doc', ''), 'source': 'introspection'}
+    
+    def resolve_callee(self, callee, source):
+        """Resolve callee as written in source; (result, newly memoized). Call from a worker thread"""
+        result = self.lookup_local(callee, source)
+        if result is not None:
+            return result, False
+        qualified, imported = self.qualify(callee, source)
+        return self.resolve(qualified, imported and qualified.split('.')[0] not in self.INTROSPECT_SKIP)
+    
+    def resolve(self, qualified, introspect=True):
+        """Full (possibly slow) resolution; (result, newly memoized). Call from a worker thread"""
+        unresolved = {'signature': None, 'doc': '', 'source': 'unresolved'}
+        if '.' in qualified:
+            # Project files are edited during the session; they are re-read by mtime, never memoized
+            result = self.lookup_files(qualified, stubs=False)
+            if result is not None:
+                return result, False
+        elif not introspect:
+            return unresolved, False
+        key = f"{self.module_version(qualified)}|{qualified}"
+        with self.lock:
+            if key in self.memo:
+                return self.memo[key], False
+        result = self.lookup_files(qualified, project=False) if '.' in qualified else None
+        if result is None and introspect:
+            result = self.introspect(qualified)
+        if result is None:
+            if not introspect:
+                # Not memoized: the name may be imported later
+                return unresolved, False
+            result = unresolved
+        with self.lock:
+            self.memo[key] = result
+        return result, True
+
+
+class SignatureWorker(QtCore.QThread):
+    """Parses the buffer and resolves one callee off the GUI thread"""
+    
+    resolved = QtCore.pyqtSignal(int, object)
+    
+    def __init__(self, resolver, serial, callee, source, parent=None):
+        super().__init__(parent)
+        self.resolver = resolver
+        self.serial = serial
+        self.callee = callee
+        self.source = source
+    
+    def run(self):
+        result, fresh = self.resolver.resolve_callee(self.callee, self.source)
+        if fresh:
+            self.resolver.save_cache()
+        self.resolved.emit(self.serial, result)
+
+
+class SignatureHelp(QtCore.QObject):
+    """Shows the callee signature as a tooltip when '(' is typed"""
+    
+    CALLEE_PATTERN = re.compile(r'([A-Za-z_][\w.]*)\s*$')
+    
+    def __init__(self, resolver, parent=None):
+        super().__init__(parent)
+        self.resolver = resolver
+        self.workers = []
+        self.pending = {}  # request serial -> editor waiting for it
+        self.serial = 0
+    
+    def on_text_changed(self, editor):
+        """Trigger on an opening parenthesis, dismiss on a closing one"""
+        cursor = editor.textCursor()
+        column = cursor.positionInBlock()
+        line = cursor.block().text()
+        if column == 0:
+            return
+        typed = line[column - 1]
+        if typed == ')':
+            QtWidgets.QToolTip.hideText()
+            return
+        if typed != '(':
+            return
+        
+        match = self.CALLEE_PATTERN.search(line[:column - 1])
+        if not match or keyword.iskeyword(match.group(1)):
+            return
+        self.request(editor, match.group(1), editor.toPlainText())
+    
+    def request(self, editor, callee, source):
+        """Resolve in the background; only the latest request is shown"""
+        self.serial += 1
+        self.pending[self.serial] = editor
+        worker = SignatureWorker(self.resolver, self.serial, callee, source, self)
+        worker.resolved.connect(self.on_resolved)
+        worker.finished.connect(lambda worker=worker: self.workers.remove(worker))
+        self.workers.append(worker)
+        worker.start()
+    
+    def on_resolved(self, serial, result):
+        editor = self.pending.pop(serial, None)
+        if editor is None or serial != self.serial:
+            return
+        try:
+            if editor.hasFocus():
+                self.show(editor, result)
+        except RuntimeError:
+            # Editor was deleted while resolving
+            pass
+    
+    def show(self, editor, result):
+        if not result or not result.get('signature'):
+            return
+        doc = html.escape(result.get('doc') or '')
+        tooltip_text = f"""<div style="font-family: monospace; font-size: 11px;">
+            <div style="font-weight: bold;">{html.escape(result['signature'])}</div>
+            {f'<div style="color: #565f89; margin-top: 4px;">{doc}</div>' if doc else ''}
+        </div>"""
+        position = editor.mapToGlobal(editor.cursorRect().bottomLeft())
+        QtWidgets.QToolTip.showText(position, tooltip_text, editor)
+    
+    def wait_for_workers(self):
+        for worker in list(self.workers):
+            worker.wait(2000)
+
 class BottomCodeCompleter(QtWidgets.QWidget):
     """
     Simplistic bottom-positioned code completer widget.
@@ -3780,7 +5263,8 @@ class BottomCodeCompleter(QtWidgets.QWidget):
         'attribute': {'color': '#89ddff', 'prefix': 'T'},
         'constant': {'color': '#ff7a93', 'prefix': 'N'},
         'import': {'color': '#9ece6a', 'prefix': 'I'},
-        'snippet': {'color': '#c0caf5', 'prefix': 'S'}
+        'snippet': {'color': '#c0caf5', 'prefix': 'S'},
+        'word': {'color': '#a9b1d6', 'prefix': 'W'}
     }
     
     def __init__(self, parent=None):
@@ -3793,6 +5277,10 @@ class BottomCodeCompleter(QtWidgets.QWidget):
         self.selected_index = 0
         self.current_theme = "Tokyo Night Day"  # Default theme
         self.inserting_completion = False  # Flag to prevent recursive completions
+        self.frecency = None  # Shared CompletionFrecency, set by the main window
+        self.profiler = None  # Shared CompletionProfiler, set by the main window
+        self.word_index = None  # Shared SharedWordIndex, set by the main window
+        self.fuzzy_matcher = FuzzyMatcher()
         
         self.init_ui()
         self.init_completion_data()
@@ -3939,28 +5427,18 @@ class BottomCodeCompleter(QtWidgets.QWidget):
             
         # Check if we have split editors that need wider completer
         main_window = self.get_main_window()
-        current_tab_index = -1
         
         if main_window:
             # Find which tab this editor belongs to
-            for tab_idx, editor in main_window.editors.items():
-                if editor == target_editor:
-                    current_tab_index = tab_idx
-                    break
-            if current_tab_index == -1:
-                # Check split editors
-                for tab_idx, split_ed in main_window.split_editors.items():
-                    if split_ed == target_editor:
-                        current_tab_index = tab_idx
-                        break
+            session = main_window.session_for(target_editor)
             
-            # If we have a horizontal split (side by side), make completer span both editors
-            if current_tab_index >= 0 and current_tab_index in main_window.split_editors:
-                splitter = main_window.splitters.get(current_tab_index)
-                if splitter and splitter.orientation() == QtCore.Qt.Orientation.Horizontal:
+            # If we have a single side-by-side split, make completer span both editors
+            if session is not None and len(session.split_editors) == 1:
+                splitter = session.splitter
+                if splitter and splitter.count() == 2 and splitter.orientation() == QtCore.Qt.Orientation.Horizontal:
                     # Horizontal split (side by side) - make completer span both editors
-                    main_editor = main_window.editors.get(current_tab_index)
-                    split_ed = main_window.split_editors.get(current_tab_index)
+                    main_editor = session.editor
+                    split_ed = session.split_editors[0]
                     
                     if main_editor and split_ed:
                         # Calculate total width of both editors
@@ -4348,19 +5826,33 @@ class BottomCodeCompleter(QtWidgets.QWidget):
             
     def add_completion_item(self, text, item_type):
         """Add a completion item"""
+        self.completion_items.append(self.make_completion_item(text, item_type))
+    
+    def make_completion_item(self, text, item_type):
+        """Build a completion item without adding it"""
         type_info = self.COMPLETION_TYPES.get(item_type, self.COMPLETION_TYPES['variable'])
-        item = {
+        return {
             'text': text,
             'type': item_type,
             'color': type_info['color'],
             'prefix': type_info['prefix']
         }
-        self.completion_items.append(item)
         
+    def measure(self, stage):
+        """Time a completion stage if a profiler is attached"""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.measure(stage)
+    
     def show_completions(self, prefix, editor=None):
         """Show completions for the given prefix"""
+        with self.measure('total'):
+            return self._show_completions(prefix, editor)
+    
+    def _show_completions(self, prefix, editor):
         # Update completion data from current editor content
-        self.update_completion_data_from_editor(editor)
+        with self.measure('index'):
+            self.update_completion_data_from_editor(editor)
         
         # Set the current target editor for completion insertion
         self.current_target_editor = editor or self.editor_widget
@@ -4372,12 +5864,29 @@ class BottomCodeCompleter(QtWidgets.QWidget):
         self.current_prefix = prefix.lower()
         self.filtered_items = []
         
-        # Filter items based on prefix
-        for item in self.completion_items:
-            if item['text'].lower().startswith(self.current_prefix):
+        # Filter items by fuzzy match against the prefix
+        fuzzy_scores = {}
+        with self.measure('filter'):
+            self.sync_fuzzy_candidates()
+            for score, index in self.fuzzy_matcher.score_batch(self.current_prefix):
+                item = self.completion_items[index]
+                fuzzy_scores[id(item)] = score
                 self.filtered_items.append(item)
+            
+            # Low-priority words from the other open documents
+            if self.word_index is not None and self.current_target_editor is not None:
+                known = {item['text'] for item in self.filtered_items}
+                document = self.current_target_editor.document()
+                for word in self.word_index.words_with_prefix(prefix, exclude=document):
+                    if word not in known:
+                        self.filtered_items.append(self.make_completion_item(word, 'word'))
+        
+        # Usage statistics for the editor's project and file type
+        usage_scores = {}
+        if self.frecency is not None:
+            usage_scores = self.frecency.scores_for(self.frecency.scope_for_editor(self.current_target_editor))
                 
-        # Sort by relevance and type priority
+        # Sort by relevance, usage frequency and type priority
         def sort_key(item):
             type_priority = {
                 'keyword': 1,
@@ -4390,27 +5899,38 @@ class BottomCodeCompleter(QtWidgets.QWidget):
                 'constant': 8,
                 'parameter': 9,
                 'import': 10,
-                'snippet': 11
+                'snippet': 11,
+                'word': 12
             }
             exact_match = item['text'].lower() == self.current_prefix
             starts_with = item['text'].lower().startswith(self.current_prefix)
-            return (not exact_match, not starts_with, type_priority.get(item['type'], 99), item['text'].lower())
-        
-        self.filtered_items.sort(key=sort_key)
-        
-        # Limit to reasonable number
-        self.filtered_items = self.filtered_items[:25]
-        
-        if self.filtered_items:
-            self.update_list()
-            self.selected_index = 0
-            self.highlight_selected()
-            self.show()
-            return True
-        else:
-            self.hide()
-            return False
+            usage = CompletionFrecency.rank_bucket(usage_scores.get(item['text'], 0))
+            return (not exact_match, not starts_with, -usage, type_priority.get(item['type'], 99),
+                    -fuzzy_scores.get(id(item), 0), item['text'].lower())
+        
+        with self.measure('rank'):
+            self.filtered_items.sort(key=sort_key)
+            
+            # Limit to reasonable number
+            self.filtered_items = self.filtered_items[:25]
+        
+        with self.measure('render'):
+            if self.filtered_items:
+                self.update_list()
+                self.selected_index = 0
+                self.highlight_selected()
+                self.show()
+                return True
+            else:
+                self.hide()
+                return False
             
+    def sync_fuzzy_candidates(self):
+        """Re-index the fuzzy matcher only when the completion texts actually changed"""
+        texts = [item['text'] for item in self.completion_items]
+        if texts != self.fuzzy_matcher.candidates:
+            self.fuzzy_matcher.set_candidates(texts)
+    
     def update_list(self):
         """Update the list widget with filtered items"""
         self.completion_list.clear()
@@ -4440,6 +5960,8 @@ class BottomCodeCompleter(QtWidgets.QWidget):
                 display_text = f"[{type_prefix}] {item_name} - Parameter"
             elif item['type'] == 'constant':
                 display_text = f"[{type_prefix}] {item_name} - Constant"
+            elif item['type'] == 'word':
+                display_text = f"[{type_prefix}] {item_name} - Word from open files"
             else:
                 display_text = f"[{type_prefix}] {item_name}"
             
@@ -4560,7 +6082,8 @@ class AdvancedCodeCompleter(QtWidgets.QCompleter):
         'attribute': {'priority': 70, 'icon': '🔧', 'color': '#89ddff', 'desc': 'Attribute'},
         'constant': {'priority': 80, 'icon': '🔒', 'color': '#ff7a93', 'desc': 'Constant'},
         'import': {'priority': 90, 'icon': '📥', 'color': '#9ece6a', 'desc': 'Import suggestion'},
-        'snippet': {'priority': 100, 'icon': '✂', 'color': '#c0caf5', 'desc': 'Code snippet'}
+        'snippet': {'priority': 100, 'icon': '✂', 'color': '#c0caf5', 'desc': 'Code snippet'},
+        'word': {'priority': 110, 'icon': '📄', 'color': '#a9b1d6', 'desc': 'Word from open files'}
     }
     
     def __init__(self, parent=None):
@@ -4589,6 +6112,12 @@ class AdvancedCodeCompleter(QtWidgets.QCompleter):
             'from': 'from ${module} import ${item}'
         }
         
+        # Shared fuzzy matcher for filtering and ranking
+        self.fuzzy_matcher = FuzzyMatcher()
+        self.frecency = None  # Shared CompletionFrecency, set by the owner
+        self.profiler = None  # Shared CompletionProfiler, set by the owner
+        self.word_index = None  # Shared SharedWordIndex, set by the owner
+        
         # Initialize completion data
         self.initialize_completion_data()
     
@@ -4637,9 +6166,10 @@ class AdvancedCodeCompleter(QtWidgets.QCompleter):
             'print': 'print(*values: Any, sep: str = " ", end: str = "\\n", file: IO = None) -> None'
         }
         
-        for name in dir(__builtins__):
+        for name in dir(builtins):
             if not name.startswith('_'):
-                signature = builtin_signatures.get(name, f"{name}(...)")
+                signature = (SignatureResolver.builtin_signature(name)
+                             or builtin_signatures.get(name, f"{name}(...)"))
                 doc = f"Built-in function: {signature}"
                 self.add_completion_item(name, 'builtin', signature=signature, doc=doc)
     
@@ -4856,6 +6386,12 @@ class AdvancedCodeCompleter(QtWidgets.QCompleter):
         
         return classes
     
+    def measure(self, stage):
+        """Time a completion stage if a profiler is attached"""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.measure(stage)
+    
     def setCompletionPrefix(self, prefix):
         """Enhanced prefix handling with intelligent filtering"""
         if not prefix:
@@ -4865,33 +6401,32 @@ class AdvancedCodeCompleter(QtWidgets.QCompleter):
         if not widget:
             return
         
+        with self.measure('total'):
+            self._set_completion_prefix(widget, prefix)
+    
+    def _set_completion_prefix(self, widget, prefix):
         # Analyze current context
-        cursor = widget.textCursor()
-        text = widget.toPlainText()
-        context = self.analyze_context(text, cursor.position())
+        with self.measure('index'):
+            cursor = widget.textCursor()
+            text = widget.toPlainText()
+            context = self.analyze_context(text, cursor.position())
         
         # Skip completion in comments or strings (unless it's a special case)
         if context['in_comment'] or context['in_string']:
             return
         
-        # Get context-appropriate completions
+        # Get context-appropriate completions, already sorted by relevance
         filtered_items = self.get_contextual_completions(prefix, context)
         
-        # Sort by relevance
-        filtered_items.sort(key=lambda x: (
-            x['priority'],
-            -self.calculate_fuzzy_score(prefix.lower(), x['text'].lower()),
-            x['text'].lower()
-        ))
-        
         # Update model with filtered and sorted items
-        display_items = [item['display'] for item in filtered_items[:50]]  # Limit to 50 items
-        self.current_items = {item['display']: item for item in filtered_items[:50]}
-        
-        model = QtCore.QStringListModel(display_items)
-        self.setModel(model)
-        
-        super().setCompletionPrefix(prefix)
+        with self.measure('render'):
+            display_items = [item['display'] for item in filtered_items[:50]]  # Limit to 50 items
+            self.current_items = {item['display']: item for item in filtered_items[:50]}
+            
+            model = QtCore.QStringListModel(display_items)
+            self.setModel(model)
+            
+            super().setCompletionPrefix(prefix)
     
     def get_contextual_completions(self, prefix, context):
         """Get completions based on current context"""
@@ -4913,14 +6448,51 @@ class AdvancedCodeCompleter(QtWidgets.QCompleter):
             
             # Add all available completions
             completions = self.completion_items[:]
+            
+            # Words from other open documents come last
+            if self.word_index is not None and prefix and self.widget():
+                known = {item['text'] for item in completions}
+                type_info = self.COMPLETION_TYPES['word']
+                for word in self.word_index.words_with_prefix(prefix[:1], exclude=self.widget().document(), limit=500):
+                    if word not in known:
+                        completions.append({
+                            'text': word,
+                            'type': 'word',
+                            'display': f"{type_info['icon']} {word}",
+                            'signature': word,
+                            'documentation': f"{type_info['desc']}: {word}",
+                            'priority': type_info['priority'],
+                            'color': type_info['color']
+                        })
         
-        # Filter by prefix using fuzzy matching
+        # Filter and rank by prefix using batch fuzzy scoring
         if prefix:
-            completions = [item for item in completions 
-                         if self.fuzzy_match(prefix.lower(), item['text'].lower())]
+            completions = self.rank_completions(prefix, completions)
         
         return completions
     
+    def rank_completions(self, prefix, items):
+        """Filter items by fuzzy match and sort by priority, then score"""
+        with self.measure('filter'):
+            # Keep the indexed list when the items are unchanged so typing narrows the last survivors
+            texts = [item['text'] for item in items]
+            if texts != self.fuzzy_matcher.candidates:
+                self.fuzzy_matcher.set_candidates(texts)
+            scored = self.fuzzy_matcher.score_batch(prefix)
+        
+        with self.measure('rank'):
+            return self._order_scored(items, scored)
+    
+    def _order_scored(self, items, scored):
+        usage_scores = {}
+        if self.frecency is not None:
+            usage_scores = self.frecency.scores_for(self.frecency.scope_for_editor(self.widget()))
+        ranked = [(-CompletionFrecency.rank_bucket(usage_scores.get(items[index]['text'], 0)),
+                   items[index]['priority'], -score, items[index]['text'].lower(), index)
+                  for score, index in scored]
+        ranked.sort()
+        return [items[index] for *_, index in ranked]
+    
     def get_attribute_completions(self, obj_name, prefix):
         """Get attribute completions for an object"""
         completions = []
@@ -4944,39 +6516,15 @@ class AdvancedCodeCompleter(QtWidgets.QCompleter):
         return completions
     
     def fuzzy_match(self, pattern, text):
-        """Simple fuzzy matching algorithm"""
+        """Check whether pattern fuzzily matches text"""
         if not pattern:
             return True
-        
-        if pattern in text:
-            return True
-        
-        # Check if all characters of pattern appear in order in text
-        pattern_idx = 0
-        for char in text:
-            if pattern_idx < len(pattern) and char == pattern[pattern_idx]:
-                pattern_idx += 1
-        
-        return pattern_idx == len(pattern)
+        return self.fuzzy_matcher.match(pattern, text)
     
     def calculate_fuzzy_score(self, pattern, text):
-        """Calculate fuzzy match score for sorting"""
-        if pattern == text:
-            return 1000
-        if text.startswith(pattern):
-            return 500
-        if pattern in text:
-            return 100
-        
-        # Simple character-order-based scoring
-        score = 0
-        pattern_idx = 0
-        for i, char in enumerate(text):
-            if pattern_idx < len(pattern) and char == pattern[pattern_idx]:
-                score += 10 - i  # Earlier matches score higher
-                pattern_idx += 1
-        
-        return score if pattern_idx == len(pattern) else 0
+        """Calculate fuzzy match score for sorting (0 when not matching)"""
+        score = self.fuzzy_matcher.score(pattern.lower(), text)
+        return score if score is not None else 0
     
     def update_completion_model(self):
         """Update the completion model with current items"""
@@ -5028,6 +6576,9 @@ class AdvancedCodeCompleter(QtWidgets.QCompleter):
         
         # Select the current word/prefix
         cursor.select(QtGui.QTextCursor.SelectionType.WordUnderCursor)
+        if self.frecency is not None:
+            self.frecency.record(self.frecency.scope_for_editor(self.widget()),
+                                 text_to_insert, len(cursor.selectedText()))
         cursor.insertText(text_to_insert)
         
         # Auto-add parentheses for functions
@@ -5109,6 +6660,3688 @@ class AdvancedCodeCompleter(QtWidgets.QCompleter):
         return self.original_complete(QtCore.QRect(popup_x, popup_y, popup_width, popup_height))
 
     
+# UTF-32 marks first: the UTF-16 LE mark is a prefix of the UTF-32 LE one
+TEXT_BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def text_encoding_for(data):
+    """Codec for file contents: UTF-16/32 when a byte order mark says so, otherwise UTF-8"""
+    for mark, encoding in TEXT_BYTE_ORDER_MARKS:
+        if data.startswith(mark):
+            return encoding
+    return 'utf-8-sig'
+
+
+def decode_file_bytes(data):
+    """Decode file contents the way the editor expects (UTF-8 or BOM-marked UTF-16/32, normalized newlines)"""
+    text = bytes(data).decode(text_encoding_for(data[:4]), errors='replace')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+class FileLoadSignals(QtCore.QObject):
+    # sequence, file path, QTextDocument (or None), error message
+    loaded = QtCore.pyqtSignal(int, str, object, str)
+
+
+class FileLoadTask(QtCore.QRunnable):
+    """Read, decode and build the document for one file on a pool thread"""
+    
+    def __init__(self, sequence, file_path, signals):
+        super().__init__()
+        self.sequence = sequence
+        self.file_path = file_path
+        self.signals = signals
+    
+    def run(self):
+        try:
+            with open(self.file_path, 'rb') as f:
+                data = f.read()
+            document = QtGui.QTextDocument()
+            document.setPlainText(decode_file_bytes(data))
+            document.setModified(False)
+            # Follow mode resumes from here, not from whatever size the file has by then
+            document.setProperty("loaded_bytes", len(data))
+            # Hand ownership to the GUI thread, which attaches it to the tab
+            document.moveToThread(QtCore.QCoreApplication.instance().thread())
+            self.signals.loaded.emit(self.sequence, self.file_path, document, "")
+        except Exception as e:
+            self.signals.loaded.emit(self.sequence, self.file_path, None, str(e))
+
+
+class ChunkedFileReader(QtCore.QThread):
+    """Reads a file in fixed-size chunks and decodes it incrementally"""
+    
+    chunk_ready = QtCore.pyqtSignal(str)
+    progress = QtCore.pyqtSignal(int, int)
+    failed = QtCore.pyqtSignal(str)
+    
+    CHUNK_SIZE = 256 * 1024
+    MAX_PENDING_CHUNKS = 16
+    
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.cancelled = False
+        # Backpressure: the reader never runs more than a few chunks ahead of the GUI
+        self.pending = threading.Semaphore(self.MAX_PENDING_CHUNKS)
+    
+    def cancel(self):
+        self.cancelled = True
+        self.pending.release()
+    
+    def chunk_consumed(self):
+        self.pending.release()
+    
+    def run(self):
+        remainder = ""
+        try:
+            total = os.path.getsize(self.file_path)
+            bytes_read = 0
+            with open(self.file_path, 'rb') as f:
+                decoder = codecs.getincrementaldecoder(text_encoding_for(f.read(4)))(errors='replace')
+                f.seek(0)
+                while not self.cancelled:
+                    data = f.read(self.CHUNK_SIZE)
+                    final = not data
+                    text = remainder + decoder.decode(data, final)
+                    bytes_read += len(data)
+                    
+                    # Emit whole lines only, so '\r\n' never straddles two chunks
+                    if final:
+                        remainder = ""
+                    else:
+                        cut = text.rfind('\n') + 1
+                        text, remainder = text[:cut], text[cut:]
+                    if '\r' in text:
+                        text = text.replace('\r\n', '\n').replace('\r', '\n')
+                    
+                    if text:
+                        self.pending.acquire()
+                        if self.cancelled:
+                            break
+                        self.chunk_ready.emit(text)
+                    self.progress.emit(bytes_read, total)
+                    if final:
+                        break
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class StreamingFileLoader(QtCore.QObject):
+    """
+    Streams a large file into an editor's document in time-sliced batches.
+    The loaded prefix can be scrolled, selected and copied while the rest
+    arrives; the editor stays read-only until loading completes.
+    Syntax highlighting stays off for streamed files: re-attaching a
+    highlighter rehighlights the whole document in one pass on the GUI
+    thread, which takes many seconds at these sizes.
+    """
+    
+    finished = QtCore.pyqtSignal(object, bool)  # loader, completed
+    
+    SLICE_BUDGET = 0.012  # Seconds of GUI time per batch
+    INSERT_SIZE = 64 * 1024
+    
+    def __init__(self, editor, file_path, status_bar, parent=None):
+        super().__init__(parent)
+        self.editor = editor
+        self.file_path = file_path
+        self.status_bar = status_bar
+        self.queue = collections.deque()  # (text, last piece of its chunk)
+        self.done_reading = False
+        self.bytes_read = 0
+        self.failed = False
+        self.completed = False
+        self.finished_loading = False
+        
+        self.document = editor.document()
+        self.document.setUndoRedoEnabled(False)
+        self.editor.setReadOnly(True)
+        self.editor.setProperty("streaming_load", True)
+        self.cursor = QtGui.QTextCursor(self.document)
+        
+        # Highlighting runs inside each insert and would blow the slice budget
+        for highlighter in self.document.findChildren(QtGui.QSyntaxHighlighter):
+            highlighter.setDocument(None)
+        
+        # Progress indicator with cancel in the status bar
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setMaximumWidth(160)
+        self.progress_bar.setFormat(f"{QtCore.QFileInfo(file_path).fileName()} %p%")
+        self.cancel_button = QtWidgets.QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel)
+        self.status_bar.addPermanentWidget(self.progress_bar)
+        self.status_bar.addPermanentWidget(self.cancel_button)
+        
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.append_batch)
+        
+        self.reader = ChunkedFileReader(file_path, self)
+        self.reader.chunk_ready.connect(self.on_chunk)
+        self.reader.progress.connect(self.on_progress)
+        self.reader.failed.connect(self.on_failed)
+        self.reader.finished.connect(self.on_reader_finished)
+    
+    def start(self):
+        self.reader.start()
+        self.timer.start()
+    
+    def on_chunk(self, text):
+        if self.reader.cancelled:
+            return
+        # Split large chunks so a single insert never blows the slice budget
+        starts = range(0, len(text), self.INSERT_SIZE)
+        for start in starts:
+            self.queue.append((text[start:start + self.INSERT_SIZE], start == starts[-1]))
+    
+    def on_progress(self, bytes_read, total):
+        self.bytes_read = bytes_read
+        self.progress_bar.setValue(int(bytes_read * 1000 / total) if total else 1000)
+    
+    def on_failed(self, error):
+        # Treat a failed read like a cancelled one: the prefix stays a partial read-only view
+        self.failed = True
+        self.status_bar.showMessage(f"Error reading {self.file_path}: {error}", 5000)
+    
+    def on_reader_finished(self):
+        self.done_reading = True
+    
+    def append_batch(self):
+        """Append queued text until this slice's time budget is used up"""
+        deadline = time.perf_counter() + self.SLICE_BUDGET
+        if self.queue:
+            self.cursor.beginEditBlock()
+            while self.queue and time.perf_counter() < deadline:
+                text, chunk_done = self.queue.popleft()
+                self.cursor.movePosition(QtGui.QTextCursor.MoveOperation.End)
+                self.cursor.insertText(text)
+                if chunk_done:
+                    # Only now may the reader run another chunk ahead
+                    self.reader.chunk_consumed()
+            self.cursor.endEditBlock()
+        
+        if self.done_reading and not self.queue:
+            self.completed = not self.reader.cancelled and not self.failed
+            self.finish()
+    
+    def cancel(self):
+        """Stop reading; the loaded prefix stays visible as a partial read-only view"""
+        self.reader.cancel()
+        self.queue.clear()
+        self.done_reading = self.reader.isFinished()
+        if self.done_reading:
+            self.finish()
+    
+    def finish(self):
+        if self.finished_loading:
+            return
+        self.finished_loading = True
+        self.timer.stop()
+        self.reader.wait()
+        self.status_bar.removeWidget(self.progress_bar)
+        self.status_bar.removeWidget(self.cancel_button)
+        self.progress_bar.deleteLater()
+        self.cancel_button.deleteLater()
+        
+        self.editor.setProperty("streaming_load", False)
+        self.document.setUndoRedoEnabled(True)
+        if self.completed:
+            self.editor.setReadOnly(False)
+            self.document.setModified(False)
+            self.document.setProperty("loaded_bytes", self.bytes_read)
+        self.finished.emit(self, self.completed)
+
+
+class FileOpenPipeline(QtCore.QObject):
+    """
+    Opens files by reading and decoding each one exactly once on a thread pool.
+    Documents are built off the GUI thread and handed to tabs in selection order.
+    """
+    
+    document_ready = QtCore.pyqtSignal(str, object)
+    load_failed = QtCore.pyqtSignal(str, str)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, min(8, QtCore.QThread.idealThreadCount())))
+        self.signals = FileLoadSignals()
+        self.signals.loaded.connect(self.on_loaded)
+        self.next_sequence = 0
+        self.next_to_deliver = 0
+        self.finished_loads = {}  # sequence -> (path, document, error)
+    
+    def open(self, file_paths):
+        for file_path in file_paths:
+            self.pool.start(FileLoadTask(self.next_sequence, file_path, self.signals))
+            self.next_sequence += 1
+    
+    def on_loaded(self, sequence, file_path, document, error):
+        self.finished_loads[sequence] = (file_path, document, error)
+        # Deliver in the order the files were requested
+        while self.next_to_deliver in self.finished_loads:
+            file_path, document, error = self.finished_loads.pop(self.next_to_deliver)
+            self.next_to_deliver += 1
+            if document is None:
+                self.load_failed.emit(file_path, error)
+            else:
+                self.document_ready.emit(file_path, document)
+    
+    def wait(self):
+        self.pool.waitForDone()
+
+
+def write_file_atomically(file_path, data):
+    """Write bytes to a temp file beside file_path, fsync it and rename it over the target"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            # Keep the permissions of the file being replaced
+            os.chmod(temp_path, os.stat(file_path).st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    
+    # Persist the rename itself (not supported on every platform)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+
+def write_backup(backup_root, file_path, data, digest, keep):
+    """
+    Store a rotated backup of data for file_path under backup_root.
+    Each file gets its own folder; a snapshot whose hash is already backed up
+    is not written again, and only the newest `keep` backups are retained.
+    """
+    absolute = os.path.abspath(file_path)
+    folder_name = f"{os.path.basename(absolute)}.{hashlib.sha1(absolute.encode('utf-8')).hexdigest()[:12]}"
+    folder = os.path.join(backup_root, folder_name)
+    os.makedirs(folder, exist_ok=True)
+    
+    backups = sorted(name for name in os.listdir(folder) if name.endswith('.bak'))
+    if any(name.split('.')[-2] == digest[:16] for name in backups):
+        return False
+    
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 1000000000:09d}.{digest[:16]}.bak"
+    write_file_atomically(os.path.join(folder, name), data)
+    backups.append(name)
+    for old in backups[:-keep] if keep > 0 else backups:
+        try:
+            os.unlink(os.path.join(folder, old))
+        except OSError:
+            pass
+    return True
+
+
+class FileSaveSignals(QtCore.QObject):
+    # request id, file path, content digest, written (False when skipped), error message
+    finished = QtCore.pyqtSignal(int, str, str, bool, str)
+
+
+class FileSaveTask(QtCore.QRunnable):
+    """Hash, compare and atomically write one buffer snapshot on a pool thread"""
+    
+    def __init__(self, request_id, file_path, text, engine, backup=None):
+        super().__init__()
+        self.request_id = request_id
+        self.file_path = file_path
+        self.text = text
+        self.engine = engine
+        self.backup = backup  # (backup directory, backup count) or None
+    
+    def run(self):
+        digest = ""
+        try:
+            data = self.text.encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+            if self.backup:
+                try:
+                    write_backup(self.backup[0], self.file_path, data, digest, self.backup[1])
+                except OSError as e:
+                    print(f"Error writing backup for {self.file_path}: {e}")
+            if self.engine.disk_digest(self.file_path) == digest:
+                self.engine.signals.finished.emit(self.request_id, self.file_path, digest, False, "")
+                return
+            write_file_atomically(self.file_path, data)
+            self.engine.remember_digest(self.file_path, digest)
+            self.engine.signals.finished.emit(self.request_id, self.file_path, digest, True, "")
+        except Exception as e:
+            self.engine.signals.finished.emit(self.request_id, self.file_path, digest, False, str(e))
+
+
+class FileSaveEngine(QtCore.QObject):
+    """
+    Saves buffers off the GUI thread.
+    The text is snapshotted on the GUI thread, then written to a temp file in
+    the target directory, fsynced and renamed into place. Writes are skipped
+    when the content hash matches the file on disk. Saves to the same path
+    are serialized, and only the newest pending snapshot is written.
+    """
+    
+    # editor, file path, written, error message, quiet (auto-save)
+    save_finished = QtCore.pyqtSignal(object, str, bool, str, bool)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(4)
+        self.signals = FileSaveSignals()
+        self.signals.finished.connect(self.on_task_finished)
+        self.lock = threading.Lock()
+        self.digests = {}  # path -> (mtime_ns, size, sha256) of what is on disk
+        self.next_request = 0
+        self.requests = {}  # request id -> (editor, document revision)
+        self.in_flight = {}  # path -> request id
+        self.queued = {}  # path -> (editor, text, revision, quiet) waiting for the in-flight save
+        self.backup_directory = ""
+        self.backup_count = 0
+    
+    def disk_digest(self, file_path):
+        """Hash of the file on disk, cached by mtime and size"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        with self.lock:
+            cached = self.digests.get(file_path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        with open(file_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        with self.lock:
+            self.digests[file_path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+    
+    def remember_digest(self, file_path, digest):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        with self.lock:
+            self.digests[file_path] = (stat.st_mtime_ns, stat.st_size, digest)
+    
+    @staticmethod
+    def refusal(editor):
+        """Why the editor's buffer must not be written to disk, or None"""
+        if editor.property("streaming_load"):
+            return "the file is still loading"
+        if editor.isReadOnly():
+            return "the buffer is read-only"
+        return None
+    
+    def save(self, editor, file_path, quiet=False):
+        """Snapshot the editor's text and save it in the background"""
+        refusal = self.refusal(editor)
+        if refusal:
+            # A partial or read-only buffer would overwrite the real file
+            self.save_finished.emit(editor, file_path, False, f"Not saved: {refusal}", quiet)
+            return
+        text = editor.toPlainText()
+        revision = editor.document().revision()
+        if file_path in self.in_flight:
+            self.queued[file_path] = (editor, text, revision, quiet)
+            return
+        self.start(editor, file_path, text, revision, quiet)
+    
+    def start(self, editor, file_path, text, revision, quiet=False):
+        request_id = self.next_request
+        self.next_request += 1
+        self.requests[request_id] = (editor, revision, quiet)
+        self.in_flight[file_path] = request_id
+        backup = (self.backup_directory, self.backup_count) if self.backup_directory and self.backup_count > 0 else None
+        self.pool.start(FileSaveTask(request_id, file_path, text, self, backup))
+    
+    def on_task_finished(self, request_id, file_path, digest, written, error):
+        editor, revision, quiet = self.requests.pop(request_id)
+        if self.in_flight.get(file_path) == request_id:
+            del self.in_flight[file_path]
+        
+        try:
+            # Only a snapshot of the current text makes the buffer clean
+            if not error and editor.document().revision() == revision:
+                editor.document().setModified(False)
+        except RuntimeError:
+            # Editor was closed while saving
+            editor = None
+        self.save_finished.emit(editor, file_path, written, error, quiet)
+        
+        if file_path in self.queued:
+            queued_editor, text, revision, queued_quiet = self.queued.pop(file_path)
+            self.start(queued_editor, file_path, text, revision, queued_quiet)
+    
+    def wait(self):
+        self.pool.waitForDone()
+
+
+class AutoSaveManager(QtCore.QObject):
+    """
+    Periodically saves dirty buffers, honoring general.auto_save and
+    general.auto_save_interval. Dirty documents are found through
+    document().isModified(); all of them are handed to the save engine in
+    one pass, one save per file path.
+    """
+    
+    def __init__(self, main_window, save_engine, settings_manager):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.save_engine = save_engine
+        self.settings_manager = settings_manager
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self.save_dirty_buffers)
+        self.settings_manager.add_observer(self.on_settings_changed)
+        self.on_settings_changed(self.settings_manager.settings)
+    
+    def on_settings_changed(self, settings):
+        general = settings.get("general", {})
+        advanced = settings.get("advanced", {})
+        
+        # Backups are configured on the engine so manual saves are covered too
+        self.save_engine.backup_directory = (advanced.get("backup_directory")
+                                             or os.path.join(self.settings_manager.config_dir, "backups"))
+        self.save_engine.backup_count = advanced.get("backup_count", 10)
+        
+        if general.get("auto_save", True):
+            self.timer.start(max(5, general.get("auto_save_interval", 30)) * 1000)
+        else:
+            self.timer.stop()
+    
+    def dirty_editors(self):
+        """Editors backed by a file whose document has unsaved changes"""
+        seen_paths = set()
+        for editor in list(self.main_window.editors.values()):
+            file_path = editor.property("file_path")
+            if (not file_path or file_path in seen_paths or self.save_engine.refusal(editor)
+                    or editor.property("recovered") or not editor.document().isModified()):
+                continue
+            seen_paths.add(file_path)
+            yield editor, file_path
+    
+    def save_dirty_buffers(self):
+        count = 0
+        for editor, file_path in self.dirty_editors():
+            self.save_engine.save(editor, file_path, quiet=True)
+            count += 1
+        return count
+
+
+class JournalWriter(QtCore.QThread):
+    """Background writer for EditJournal; applies queued file operations in order"""
+    
+    def __init__(self, journal_dir, parent=None):
+        super().__init__(parent)
+        self.journal_dir = journal_dir
+        self.queue = queue.Queue()
+    
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            action, journal_id, payload = item
+            log_path = os.path.join(self.journal_dir, f"{journal_id}.log")
+            snapshot_path = os.path.join(self.journal_dir, f"{journal_id}.snapshot.json")
+            try:
+                if action == 'append':
+                    with open(log_path, 'a', encoding='utf-8') as f:
+                        f.write(payload)
+                        f.flush()
+                        os.fsync(f.fileno())
+                elif action == 'snapshot':
+                    # Ops up to the snapshot's seq are skipped on replay, so truncating after is safe
+                    write_file_atomically(snapshot_path, json.dumps(payload).encode('utf-8'))
+                    with open(log_path, 'w', encoding='utf-8'):
+                        pass
+                elif action == 'discard':
+                    for path in (log_path, snapshot_path):
+                        if os.path.exists(path):
+                            os.unlink(path)
+            except OSError as e:
+                print(f"Error writing edit journal: {e}")
+    
+    def stop(self):
+        self.queue.put(None)
+        self.wait()
+
+
+class EditJournal(QtCore.QObject):
+    """
+    Crash-recovery journal of unsaved edits.
+    Each attached buffer gets a snapshot plus an append-only log of
+    (seq, position, removed, inserted) operations taken from contentsChange.
+    Recording a keystroke only appends a tuple; a short timer batches the
+    operations to a background writer, and long logs are compacted into a
+    fresh snapshot. Journals are discarded when a buffer becomes clean, is
+    closed, or the application exits normally. Every instance holds a lock
+    file and stamps its snapshots with its id, so only journals whose owner
+    is no longer running are offered for recovery.
+    Positions are Qt's UTF-16 offsets, as reported by contentsChange.
+    """
+    
+    FLUSH_INTERVAL = 500  # ms
+    COMPACT_AFTER_OPS = 5000
+    
+    def __init__(self, config_dir, parent=None):
+        super().__init__(parent)
+        self.journal_dir = os.path.join(config_dir, "journal")
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self.instance_id = uuid.uuid4().hex
+        self.instance_lock = QtCore.QLockFile(self.lock_path(self.instance_id))
+        self.instance_lock.setStaleLockTime(0)
+        self.instance_lock.tryLock(0)
+        self.buffers = {}  # id(document) -> state dict
+        self.writer = JournalWriter(self.journal_dir, self)
+        self.writer.start()
+        self.flush_timer = QtCore.QTimer(self)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start(self.FLUSH_INTERVAL)
+    
+    def attach(self, editor):
+        document = editor.document()
+        key = id(document)
+        if key in self.buffers:
+            return
+        state = {
+            'id': uuid.uuid4().hex,
+            'editor': editor,
+            'document': document,
+            'seq': 0,
+            'pending': [],
+            'logged_ops': 0,
+            'needs_snapshot': True,
+        }
+        state['on_change'] = lambda pos, removed, added, state=state: self.on_contents_change(state, pos, removed, added)
+        state['on_modified'] = lambda modified, state=state: self.on_modification_changed(state, modified)
+        document.contentsChange.connect(state['on_change'])
+        document.modificationChanged.connect(state['on_modified'])
+        self.buffers[key] = state
+        if document.isModified():
+            self.snapshot(state)
+    
+    def detach(self, editor, discard=True):
+        state = self.buffers.pop(id(editor.document()), None)
+        if state is None:
+            return
+        try:
+            state['document'].contentsChange.disconnect(state['on_change'])
+            state['document'].modificationChanged.disconnect(state['on_modified'])
+        except (TypeError, RuntimeError):
+            pass
+        if discard:
+            self.writer.queue.put(('discard', state['id'], None))
+    
+    def on_contents_change(self, state, position, removed, added):
+        if state['editor'].isReadOnly():
+            # Streaming loads and tail mode are not user edits
+            return
+        state['seq'] += 1
+        if state['needs_snapshot']:
+            self.snapshot(state)
+            return
+        document = state['document']
+        end = min(position + added, document.characterCount() - 1)
+        cursor = QtGui.QTextCursor(document)
+        cursor.setPosition(position)
+        cursor.setPosition(end, QtGui.QTextCursor.MoveMode.KeepAnchor)
+        inserted = cursor.selectedText().replace('\u2029', '\n')
+        state['pending'].append((state['seq'], position, removed, inserted))
+    
+    def on_modification_changed(self, state, modified):
+        if not modified:
+            # Saved: nothing to recover until the next edit
+            state['pending'] = []
+            state['needs_snapshot'] = True
+            self.writer.queue.put(('discard', state['id'], None))
+    
+    def snapshot(self, state):
+        editor = state['editor']
+        state['pending'] = []
+        state['logged_ops'] = 0
+        state['needs_snapshot'] = False
+        self.writer.queue.put(('snapshot', state['id'], {
+            'owner': self.instance_id,
+            'seq': state['seq'],
+            'file_path': editor.property("file_path") or "",
+            'text': editor.toPlainText(),
+            'time': time.time(),
+        }))
+    
+    def flush(self):
+        for state in list(self.buffers.values()):
+            if not state['pending']:
+                continue
+            if state['logged_ops'] + len(state['pending']) > self.COMPACT_AFTER_OPS:
+                self.snapshot(state)
+                continue
+            lines = ''.join(json.dumps(op) + '\n' for op in state['pending'])
+            state['logged_ops'] += len(state['pending'])
+            state['pending'] = []
+            self.writer.queue.put(('append', state['id'], lines))
+    
+    def shutdown(self, clean=True):
+        """Stop the writer; a clean exit leaves no journals behind"""
+        self.flush_timer.stop()
+        if clean:
+            for state in list(self.buffers.values()):
+                self.writer.queue.put(('discard', state['id'], None))
+        else:
+            self.flush()
+        self.writer.stop()
+        self.instance_lock.unlock()
+    
+    def lock_path(self, instance_id):
+        return os.path.join(self.journal_dir, f"{instance_id}.lock")
+    
+    def owner_alive(self, owner, checked):
+        """True if the instance that wrote a journal is still running"""
+        if not owner or owner == self.instance_id:
+            return False
+        if owner not in checked:
+            lock = QtCore.QLockFile(self.lock_path(owner))
+            lock.setStaleLockTime(0)
+            # Locking only succeeds once the owner's process is gone (its lock is then stale)
+            checked[owner] = not lock.tryLock(0)
+            if not checked[owner]:
+                lock.unlock()
+        return checked[owner]
+    
+    @staticmethod
+    def replay(snapshot, log_lines):
+        """Rebuild the buffer text from a snapshot and its log"""
+        # Logged positions count UTF-16 code units, so edit the text in that form
+        text = bytearray(snapshot['text'].encode('utf-16-le', 'surrogatepass'))
+        for line in log_lines:
+            try:
+                seq, position, removed, inserted = json.loads(line)
+            except ValueError:
+                # A torn final line from the crash
+                break
+            if seq <= snapshot['seq']:
+                continue
+            start = min(position * 2, len(text))
+            end = min(start + removed * 2, len(text))
+            text[start:end] = inserted.encode('utf-16-le', 'surrogatepass')
+        return text.decode('utf-16-le', 'replace')
+    
+    def recoverable(self):
+        """[(journal id, file path, text, saved time)] left over from a previous session"""
+        active = {state['id'] for state in self.buffers.values()}
+        checked = {}  # owner id -> still running
+        recovered = []
+        for name in sorted(os.listdir(self.journal_dir)):
+            if name.endswith('.lock'):
+                # Checking a dead instance's lock also clears it away
+                self.owner_alive(name[:-len('.lock')], checked)
+                continue
+            if not name.endswith('.snapshot.json'):
+                continue
+            journal_id = name[:-len('.snapshot.json')]
+            if journal_id in active:
+                continue
+            try:
+                with open(os.path.join(self.journal_dir, name), 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                if self.owner_alive(snapshot.get('owner'), checked):
+                    # Live edits of another running instance
+                    continue
+                log_path = os.path.join(self.journal_dir, f"{journal_id}.log")
+                log_lines = []
+                if os.path.exists(log_path):
+                    with open(log_path, 'r', encoding='utf-8') as f:
+                        log_lines = f.readlines()
+                recovered.append((journal_id, snapshot.get('file_path', ""),
+                                  self.replay(snapshot, log_lines), snapshot.get('time', 0)))
+            except (OSError, ValueError) as e:
+                print(f"Error reading edit journal {journal_id}: {e}")
+        return recovered
+    
+    def discard_journal(self, journal_id):
+        self.writer.queue.put(('discard', journal_id, None))
+
+
+class ExternalDiffSignals(QtCore.QObject):
+    # file path, buffer snapshot revision, disk text, opcodes (or None on error), bytes read
+    finished = QtCore.pyqtSignal(str, int, str, object, object)
+
+
+class ExternalDiffTask(QtCore.QRunnable):
+    """Reads the changed file and diffs it line by line against a buffer snapshot"""
+    
+    def __init__(self, file_path, revision, buffer_text, signals):
+        super().__init__()
+        self.file_path = file_path
+        self.revision = revision
+        self.buffer_text = buffer_text
+        self.signals = signals
+    
+    def run(self):
+        try:
+            with open(self.file_path, 'rb') as f:
+                data = f.read()
+            disk_text = decode_file_bytes(data)
+        except OSError:
+            self.signals.finished.emit(self.file_path, self.revision, "", None, 0)
+            return
+        if disk_text == self.buffer_text:
+            self.signals.finished.emit(self.file_path, self.revision, disk_text, [], len(data))
+            return
+        buffer_lines = self.block_lines(self.buffer_text)
+        disk_lines = self.block_lines(disk_text)
+        matcher = difflib.SequenceMatcher(None, buffer_lines, disk_lines, autojunk=False)
+        opcodes = [op for op in matcher.get_opcodes() if op[0] != 'equal']
+        self.signals.finished.emit(self.file_path, self.revision, disk_text, opcodes, len(data))
+    
+    @staticmethod
+    def block_lines(text):
+        """Lines with their '\n', split exactly where the document starts a new block"""
+        lines = text.split('\n')
+        tail = lines.pop()
+        lines = [line + '\n' for line in lines]
+        if tail:
+            lines.append(tail)
+        return lines
+
+
+class ExternalChangeWatcher(QtCore.QObject):
+    """
+    Watches open files for changes made by other programs.
+    Bursts of change notifications are debounced; the diff against the buffer
+    is computed on a pool thread and only the changed line ranges are
+    replaced, inside one edit block, so cursor, undo history and highlighting
+    of untouched lines survive. The user is asked only if the buffer is dirty.
+    """
+    
+    DEBOUNCE_INTERVAL = 300  # ms
+    
+    def __init__(self, main_window, save_engine):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.save_engine = save_engine
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+        self.editors_by_path = {}  # path -> list of editors
+        self.pending_paths = set()
+        self.in_flight = set()
+        self.debounce_timer = QtCore.QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.timeout.connect(self.check_pending)
+        self.signals = ExternalDiffSignals()
+        self.signals.finished.connect(self.on_diff_finished)
+    
+    def watch(self, editor, file_path):
+        self.unwatch(editor)
+        if not file_path:
+            return
+        file_path = os.path.abspath(file_path)
+        self.editors_by_path.setdefault(file_path, []).append(editor)
+        if os.path.exists(file_path) and file_path not in self.watcher.files():
+            self.watcher.addPath(file_path)
+    
+    def unwatch(self, editor):
+        for file_path, editors in list(self.editors_by_path.items()):
+            if editor in editors:
+                editors.remove(editor)
+                if not editors:
+                    del self.editors_by_path[file_path]
+                    if file_path in self.watcher.files():
+                        self.watcher.removePath(file_path)
+    
+    def on_file_changed(self, file_path):
+        # Atomic replaces (ours included) drop the path from the watcher
+        if os.path.exists(file_path) and file_path not in self.watcher.files():
+            self.watcher.addPath(file_path)
+        self.pending_paths.add(file_path)
+        self.debounce_timer.start(self.DEBOUNCE_INTERVAL)
+    
+    def is_own_write(self, file_path):
+        """True if the file on disk is exactly what the save engine last wrote"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        with self.save_engine.lock:
+            cached = self.save_engine.digests.get(file_path)
+        return bool(cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size)
+    
+    def editor_for(self, file_path):
+        for editor in self.editors_by_path.get(file_path, []):
+            if not editor.isReadOnly():
+                return editor
+        return None
+    
+    def check_pending(self):
+        for file_path in list(self.pending_paths):
+            editor = self.editor_for(file_path)
+            if editor is None or file_path in self.in_flight:
+                continue
+            self.pending_paths.discard(file_path)
+            if not os.path.exists(file_path) or self.is_own_write(file_path):
+                continue
+            self.in_flight.add(file_path)
+            QtCore.QThreadPool.globalInstance().start(
+                ExternalDiffTask(file_path, editor.document().revision(), editor.toPlainText(), self.signals))
+        if self.pending_paths:
+            self.debounce_timer.start(self.DEBOUNCE_INTERVAL)
+    
+    def on_diff_finished(self, file_path, revision, disk_text, opcodes, size):
+        self.in_flight.discard(file_path)
+        editor = self.editor_for(file_path)
+        if editor is None or not opcodes:
+            if editor is not None and opcodes is not None and editor.document().revision() == revision:
+                editor.document().setProperty("loaded_bytes", size)
+            return
+        document = editor.document()
+        if document.revision() != revision:
+            # Buffer changed while diffing; diff again against the new text
+            self.pending_paths.add(file_path)
+            self.debounce_timer.start(self.DEBOUNCE_INTERVAL)
+            return
+        
+        dirty = document.isModified()
+        if dirty:
+            reply = QtWidgets.QMessageBox.question(
+                self.main_window,
+                'File Changed on Disk',
+                f"{os.path.basename(file_path)} was changed by another program.\n"
+                "Reload it and discard your unsaved changes?",
+                QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No
+            )
+            if reply != QtWidgets.QMessageBox.StandardButton.Yes:
+                return
+            if document.revision() != revision:
+                self.pending_paths.add(file_path)
+                self.debounce_timer.start(self.DEBOUNCE_INTERVAL)
+                return
+        
+        self.apply_diff(editor, disk_text, opcodes)
+        document.setModified(False)
+        document.setProperty("loaded_bytes", size)
+        self.main_window.statusBar().showMessage(f"Reloaded changes from disk: {file_path}", 3000)
+    
+    @staticmethod
+    def apply_diff(editor, disk_text, opcodes):
+        """Replace only the changed line ranges, back to front, as one undo step"""
+        document = editor.document()
+        disk_lines = ExternalDiffTask.block_lines(disk_text)
+        
+        def line_position(line):
+            # Block positions are in Qt's UTF-16 units; summing len() of the lines would
+            # drift after any non-BMP character. Past the last line means the end.
+            block = document.findBlockByNumber(line)
+            if block.isValid():
+                return block.position()
+            return document.characterCount() - 1
+        
+        cursor = QtGui.QTextCursor(document)
+        cursor.beginEditBlock()
+        for tag, i1, i2, j1, j2 in reversed(opcodes):
+            cursor.setPosition(line_position(i1))
+            cursor.setPosition(line_position(i2), QtGui.QTextCursor.MoveMode.KeepAnchor)
+            cursor.insertText(''.join(disk_lines[j1:j2]))
+        cursor.endEditBlock()
+
+
+class LineOffsetIndex:
+    """
+    Sparse line index over a memory-mapped file.
+    Stores the number of newlines before each fixed-size block, so memory is
+    proportional to file size / BLOCK_SIZE; exact offsets are found by a short
+    scan inside one block.
+    """
+    
+    BLOCK_SIZE = 64 * 1024
+    
+    def __init__(self, data):
+        self.data = data
+        self.size = len(data)
+        self.newlines_before = array.array('Q', [0])
+        self.complete = self.size == 0
+    
+    @property
+    def indexed_bytes(self):
+        return min(self.size, (len(self.newlines_before) - 1) * self.BLOCK_SIZE)
+    
+    def build(self, max_blocks=256):
+        """Index up to max_blocks more blocks; returns True once the whole file is indexed"""
+        data, block_size = self.data, self.BLOCK_SIZE
+        newlines = self.newlines_before
+        start = (len(newlines) - 1) * block_size
+        for _ in range(max_blocks):
+            if start >= self.size:
+                self.complete = True
+                break
+            newlines.append(newlines[-1] + data[start:start + block_size].count(b'\n'))
+            start += block_size
+        else:
+            self.complete = start >= self.size
+        return self.complete
+    
+    def line_count(self):
+        """Lines known so far (final once the index is complete)"""
+        return self.newlines_before[-1] + 1
+    
+    def offset_of_line(self, line):
+        """Byte offset of the first character of line (0-based)"""
+        if line <= 0:
+            return 0
+        block = max(0, bisect.bisect_left(self.newlines_before, line) - 1)
+        position = block * self.BLOCK_SIZE
+        remaining = line - self.newlines_before[block]
+        while remaining > 0:
+            position = self.data.find(b'\n', position) + 1
+            if position == 0:
+                return self.size
+            remaining -= 1
+        return position
+    
+    def line_of_offset(self, offset):
+        """Line number containing byte offset"""
+        block = min(offset // self.BLOCK_SIZE, len(self.newlines_before) - 1)
+        start = block * self.BLOCK_SIZE
+        return self.newlines_before[block] + self.data[start:offset].count(b'\n')
+    
+    def line_bytes(self, line, limit=None):
+        """Raw bytes of a line without its newline, optionally truncated"""
+        start = self.offset_of_line(line)
+        end = self.data.find(b'\n', start)
+        if end < 0:
+            end = self.size
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.data[start:end]
+
+
+class LineIndexBuilder(QtCore.QThread):
+    """Builds a LineOffsetIndex in the background, reporting progress"""
+    
+    progress = QtCore.pyqtSignal(int, int)  # indexed bytes, total bytes
+    
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.index = index
+    
+    def run(self):
+        while not self.isInterruptionRequested():
+            done = self.index.build()
+            self.progress.emit(self.index.indexed_bytes, self.index.size)
+            if done:
+                break
+
+
+class LargeFileSearchWorker(QtCore.QThread):
+    """
+    Searches mapped bytes for the next or previous hit, wrapping around.
+    The file is scanned one window at a time: a single re call over the
+    whole mapping would hold the GIL (and with it the GUI) until it returns,
+    and windows are where an interruption request is noticed.
+    """
+    
+    found = QtCore.pyqtSignal(int, object)  # generation, (start, end) or None
+    
+    WINDOW = 4 * 1024 * 1024
+    OVERLAP = 4 * 1024  # Windows overlap so hits straddling a boundary are not lost
+    
+    def __init__(self, generation, data, size, pattern, origin, reverse, parent=None):
+        super().__init__(parent)
+        self.generation = generation
+        self.data = data
+        self.size = size
+        self.pattern = pattern
+        self.origin = origin
+        self.reverse = reverse
+    
+    def run(self):
+        if self.reverse:
+            found = self.search_backward(self.origin) or self.search_backward(self.size)
+        else:
+            found = self.search_forward(self.origin, self.size) or self.search_forward(0, self.origin)
+        if not self.isInterruptionRequested():
+            self.found.emit(self.generation, found)
+    
+    def search_forward(self, start, end):
+        """First match starting in start..end"""
+        while start < end and not self.isInterruptionRequested():
+            window_end = min(end, start + self.WINDOW)
+            match = self.pattern.search(self.data, start, min(end, window_end + self.OVERLAP))
+            if match and match.start() < window_end:
+                return match.span()
+            start = window_end
+        return None
+    
+    def search_backward(self, origin):
+        """Last match ending at or before origin, scanning back one window at a time"""
+        end = origin
+        while end > 0 and not self.isInterruptionRequested():
+            start = max(0, end - self.WINDOW)
+            last = None
+            for match in self.pattern.finditer(self.data, start, end):
+                last = match
+            if last:
+                return last.span()
+            if start == 0:
+                break
+            end = start + self.OVERLAP
+        return None
+
+
+class LargeFileViewer(QtWidgets.QAbstractScrollArea):
+    """
+    Read-only viewer for files too large for a QPlainTextEdit document.
+    The file is memory-mapped and only the visible lines are decoded and painted.
+    Lines can be selected with the mouse or keyboard and copied with Ctrl+C.
+    """
+    
+    MAX_LINE_DISPLAY_BYTES = 16 * 1024
+    COPY_LIMIT = 32 * 1024 * 1024
+    
+    index_progress = QtCore.pyqtSignal(int, int)
+    cursor_moved = QtCore.pyqtSignal(int)
+    
+    def __init__(self, file_path, parent=None, data=None, index=None, builder=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        # The page that opened the file may share its mapping and line index
+        self.owns_data = data is None
+        if self.owns_data:
+            self.file = open(file_path, 'rb')
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.file = None
+            self.data = data
+        self.index = index if index is not None else LineOffsetIndex(self.data)
+        
+        self.cursor_line = 0
+        self.anchor_line = 0
+        self.match = None  # (start offset, end offset) of the last search hit
+        self.max_line_width = 0
+        self.search_workers = []
+        self.search_generation = 0
+        
+        self.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont))
+        self.viewport().setCursor(QtCore.Qt.CursorShape.IBeamCursor)
+        self.setFocusPolicy(QtCore.Qt.FocusPolicy.StrongFocus)
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+        self.horizontalScrollBar().valueChanged.connect(self.viewport().update)
+        
+        self.owns_builder = builder is None
+        self.builder = builder if builder is not None else LineIndexBuilder(self.index, self)
+        self.builder.progress.connect(self.on_index_progress)
+        if self.owns_builder:
+            self.builder.start()
+        else:
+            self.update_scrollbars()
+    
+    def close_file(self):
+        """Stop indexing and searching, and release the mapping (unless they are shared)"""
+        for worker in list(self.search_workers):
+            worker.requestInterruption()
+            worker.wait()
+        if self.owns_builder:
+            self.builder.requestInterruption()
+            self.builder.wait()
+        if self.owns_data:
+            self.data.close()
+            self.file.close()
+    
+    def on_index_progress(self, indexed, total):
+        self.update_scrollbars()
+        self.index_progress.emit(indexed, total)
+    
+    def line_height(self):
+        return self.fontMetrics().lineSpacing()
+    
+    def gutter_width(self):
+        digits = len(str(self.index.line_count()))
+        return self.fontMetrics().horizontalAdvance('9') * (digits + 2)
+    
+    def visible_line_count(self):
+        return max(1, self.viewport().height() // self.line_height())
+    
+    def update_scrollbars(self):
+        visible = self.visible_line_count()
+        self.verticalScrollBar().setRange(0, max(0, self.index.line_count() - visible))
+        self.verticalScrollBar().setPageStep(visible)
+        self.horizontalScrollBar().setRange(0, max(0, self.max_line_width - self.viewport().width() + self.gutter_width()))
+        self.horizontalScrollBar().setPageStep(self.viewport().width())
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scrollbars()
+    
+    def decode_line(self, raw):
+        return raw.decode('utf-8', errors='replace').expandtabs(4)
+    
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self.viewport())
+        palette = self.palette()
+        painter.fillRect(self.viewport().rect(), palette.color(QtGui.QPalette.ColorRole.Base))
+        
+        metrics = self.fontMetrics()
+        line_height = self.line_height()
+        gutter = self.gutter_width()
+        first_line = self.verticalScrollBar().value()
+        x_offset = self.horizontalScrollBar().value()
+        last_line = min(self.index.line_count(), first_line + self.visible_line_count() + 1)
+        selection = (min(self.anchor_line, self.cursor_line), max(self.anchor_line, self.cursor_line))
+        match_line = self.index.line_of_offset(self.match[0]) if self.match else -1
+        widest = self.max_line_width
+        
+        # Walk the visible lines sequentially from the first one's offset
+        position = self.index.offset_of_line(first_line)
+        for row, line in enumerate(range(first_line, last_line)):
+            end = self.data.find(b'\n', position)
+            if end < 0:
+                end = self.index.size
+            raw = self.data[position:min(end, position + self.MAX_LINE_DISPLAY_BYTES)]
+            text = self.decode_line(raw)
+            y = row * line_height
+            
+            if selection[0] <= line <= selection[1]:
+                painter.fillRect(0, y, self.viewport().width(), line_height,
+                                 palette.color(QtGui.QPalette.ColorRole.Highlight).lighter(170))
+            if line == match_line:
+                prefix = self.decode_line(self.data[position:self.match[0]])
+                matched = self.decode_line(self.data[self.match[0]:min(self.match[1], end)])
+                painter.fillRect(gutter - x_offset + metrics.horizontalAdvance(prefix), y,
+                                 max(2, metrics.horizontalAdvance(matched)), line_height,
+                                 QtGui.QColor("#ffd866"))
+            
+            painter.setPen(palette.color(QtGui.QPalette.ColorRole.PlaceholderText))
+            painter.drawText(0, y, gutter - metrics.horizontalAdvance('9'), line_height,
+                             QtCore.Qt.AlignmentFlag.AlignRight | QtCore.Qt.AlignmentFlag.AlignVCenter, str(line + 1))
+            painter.setClipRect(gutter, 0, self.viewport().width() - gutter, self.viewport().height())
+            painter.setPen(palette.color(QtGui.QPalette.ColorRole.Text))
+            painter.drawText(gutter - x_offset, y + metrics.ascent(), text)
+            painter.setClipping(False)
+            
+            widest = max(widest, metrics.horizontalAdvance(text))
+            position = end + 1
+        painter.end()
+        
+        if widest != self.max_line_width:
+            self.max_line_width = widest
+            QtCore.QTimer.singleShot(0, self.update_scrollbars)
+    
+    def set_cursor_line(self, line, extend=False):
+        line = max(0, min(line, self.index.line_count() - 1))
+        self.cursor_line = line
+        if not extend:
+            self.anchor_line = line
+        self.ensure_line_visible(line)
+        self.viewport().update()
+        self.cursor_moved.emit(line)
+    
+    def ensure_line_visible(self, line):
+        scrollbar = self.verticalScrollBar()
+        visible = self.visible_line_count()
+        if line < scrollbar.value():
+            scrollbar.setValue(line)
+        elif line >= scrollbar.value() + visible:
+            scrollbar.setValue(line - visible + 1)
+    
+    def goto_line(self, line_number):
+        """Jump to a 1-based line number"""
+        self.match = None
+        self.set_cursor_line(line_number - 1)
+        self.verticalScrollBar().setValue(max(0, line_number - 1 - self.visible_line_count() // 3))
+    
+    def mousePressEvent(self, event):
+        line = self.verticalScrollBar().value() + int(event.position().y()) // self.line_height()
+        extend = bool(event.modifiers() & QtCore.Qt.KeyboardModifier.ShiftModifier)
+        self.match = None
+        self.set_cursor_line(line, extend)
+    
+    def mouseMoveEvent(self, event):
+        if event.buttons() & QtCore.Qt.MouseButton.LeftButton:
+            line = self.verticalScrollBar().value() + int(event.position().y()) // self.line_height()
+            self.set_cursor_line(line, extend=True)
+    
+    def keyPressEvent(self, event):
+        if event.matches(QtGui.QKeySequence.StandardKey.Copy):
+            self.copy_selection()
+            return
+        
+        key = event.key()
+        extend = bool(event.modifiers() & QtCore.Qt.KeyboardModifier.ShiftModifier)
+        moves = {
+            QtCore.Qt.Key.Key_Up: -1,
+            QtCore.Qt.Key.Key_Down: 1,
+            QtCore.Qt.Key.Key_PageUp: -self.visible_line_count(),
+            QtCore.Qt.Key.Key_PageDown: self.visible_line_count(),
+        }
+        if key in moves:
+            self.set_cursor_line(self.cursor_line + moves[key], extend)
+        elif key == QtCore.Qt.Key.Key_Home and event.modifiers() & QtCore.Qt.KeyboardModifier.ControlModifier:
+            self.set_cursor_line(0, extend)
+        elif key == QtCore.Qt.Key.Key_End and event.modifiers() & QtCore.Qt.KeyboardModifier.ControlModifier:
+            self.set_cursor_line(self.index.line_count() - 1, extend)
+        else:
+            super().keyPressEvent(event)
+    
+    def copy_selection(self):
+        """Copy the search hit, or the selected lines, to the clipboard"""
+        if self.match:
+            start, end = self.match
+        else:
+            first, last = sorted((self.anchor_line, self.cursor_line))
+            start = self.index.offset_of_line(first)
+            end = self.data.find(b'\n', self.index.offset_of_line(last))
+            if end < 0:
+                end = self.index.size
+        if end - start > self.COPY_LIMIT:
+            QtWidgets.QMessageBox.warning(self, "Copy", f"Selection is larger than {self.COPY_LIMIT // (1024 * 1024)} MB.")
+            return
+        QtWidgets.QApplication.clipboard().setText(self.data[start:end].decode('utf-8', errors='replace'))
+    
+    def find(self, search_text, reverse=False, case_sensitive=False, whole_words=False, regex=False):
+        """Start searching the mapped bytes in the background; wraps around like the editor search"""
+        if not search_text:
+            return False
+        flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+        if not regex:
+            search_text = re.escape(search_text)
+        if whole_words:
+            search_text = r'\b' + search_text + r'\b'
+        try:
+            pattern = re.compile(search_text.encode('utf-8'), flags)
+        except re.error as e:
+            QtWidgets.QMessageBox.warning(self, "Invalid Regex", f"Invalid regular expression: {str(e)}")
+            return False
+        
+        if self.match:
+            origin = self.match[0] if reverse else self.match[1]
+        else:
+            origin = self.index.offset_of_line(self.cursor_line)
+        
+        self.search_generation += 1
+        for worker in self.search_workers:
+            worker.requestInterruption()
+        worker = LargeFileSearchWorker(self.search_generation, self.data, self.index.size, pattern, origin, reverse, self)
+        worker.found.connect(self.on_search_found)
+        worker.finished.connect(lambda worker=worker: self.search_workers.remove(worker))
+        self.search_workers.append(worker)
+        self.viewport().setCursor(QtCore.Qt.CursorShape.BusyCursor)
+        worker.start()
+        return True
+    
+    def on_search_found(self, generation, found):
+        if generation != self.search_generation:
+            return
+        self.viewport().setCursor(QtCore.Qt.CursorShape.IBeamCursor)
+        if not found:
+            QtWidgets.QApplication.beep()
+            return
+        self.match = found
+        line = self.index.line_of_offset(found[0])
+        self.set_cursor_line(line)
+        
+        # Bring the hit into horizontal view as well
+        line_start = self.index.offset_of_line(line)
+        prefix = self.decode_line(self.data[line_start:found[0]])
+        x = self.fontMetrics().horizontalAdvance(prefix)
+        scrollbar = self.horizontalScrollBar()
+        if not scrollbar.value() <= x < scrollbar.value() + self.viewport().width() - self.gutter_width():
+            scrollbar.setValue(max(0, x - self.viewport().width() // 3))
+
+
+class LargeFileView(QtWidgets.QWidget):
+    """Tab page wrapping LargeFileViewer with an indexing status line"""
+    
+    def __init__(self, file_path, parent=None, data=None, index=None, builder=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.viewer = LargeFileViewer(file_path, self, data, index, builder)
+        
+        self.status_label = QtWidgets.QLabel()
+        self.status_label.setStyleSheet("padding: 2px 6px; color: #565f89;")
+        
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.viewer)
+        
+        self.viewer.index_progress.connect(self.on_index_progress)
+        self.on_index_progress(self.viewer.index.indexed_bytes, self.viewer.index.size)
+    
+    def on_index_progress(self, indexed, total):
+        size_mb = total / (1024 * 1024)
+        if indexed < total:
+            state = f"indexing lines {indexed * 100 // max(1, total)}%"
+        else:
+            state = f"{self.viewer.index.line_count():,} lines"
+        self.status_label.setText(f"Read-only large file view: {size_mb:,.1f} MB, {state}")
+    
+    def text_viewer(self):
+        return self.viewer
+    
+    def close_file(self):
+        self.viewer.close_file()
+
+
+JSON_STRUCTURE_PATTERN = re.compile(rb'["\[\]{}]')
+JSON_STRING_PATTERN = re.compile(rb'"(?:[^"\\]|\\.)*"', re.S)
+JSON_WHITESPACE_PATTERN = re.compile(rb'[ \t\r\n]*')
+JSON_SCALAR_PATTERN = re.compile(rb'[^,\]}\s]+')
+
+
+def json_skip_whitespace(data, position):
+    return JSON_WHITESPACE_PATTERN.match(data, position).end()
+
+
+def json_skip_value(data, position):
+    """End offset of the JSON value starting at position, without parsing it"""
+    first = data[position:position + 1]
+    if first == b'"':
+        match = JSON_STRING_PATTERN.match(data, position)
+        if not match:
+            raise ValueError(f"Unterminated string at offset {position}")
+        return match.end()
+    if first in (b'[', b'{'):
+        depth = 0
+        while True:
+            match = JSON_STRUCTURE_PATTERN.search(data, position)
+            if not match:
+                raise ValueError("Unexpected end of data")
+            token = match.group()
+            if token == b'"':
+                string_match = JSON_STRING_PATTERN.match(data, match.start())
+                if not string_match:
+                    raise ValueError(f"Unterminated string at offset {match.start()}")
+                position = string_match.end()
+                continue
+            depth += 1 if token in (b'[', b'{') else -1
+            position = match.end()
+            if depth == 0:
+                return position
+    match = JSON_SCALAR_PATTERN.match(data, position)
+    if not match:
+        raise ValueError(f"Expected a value at offset {position}")
+    return match.end()
+
+
+def json_iter_children(data, position, is_object):
+    """
+    Yield (key, value start, value end, resume position) for the direct
+    children of a container. position is just after the opening bracket, or a
+    resume position from a previous call. Nested values are skipped, not parsed.
+    """
+    closer = b'}' if is_object else b']'
+    index = 0
+    while True:
+        position = json_skip_whitespace(data, position)
+        token = data[position:position + 1]
+        if token == b',':
+            position = json_skip_whitespace(data, position + 1)
+            token = data[position:position + 1]
+        if token == closer or not token:
+            return
+        key = None
+        if is_object:
+            match = JSON_STRING_PATTERN.match(data, position)
+            if not match:
+                raise ValueError(f"Expected a key at offset {position}")
+            key = json.loads(match.group().decode('utf-8', errors='replace'))
+            position = json_skip_whitespace(data, match.end())
+            if data[position:position + 1] != b':':
+                raise ValueError(f"Expected ':' at offset {position}")
+            position = json_skip_whitespace(data, position + 1)
+        start = position
+        position = json_skip_value(data, start)
+        yield (key if is_object else index), start, position, position
+        index += 1
+
+
+class JsonNode:
+    """A value in the lazy JSON tree; only offsets are kept until it is expanded"""
+    
+    __slots__ = ('parent', 'key', 'start', 'end', 'kind', 'children', 'resume', 'complete', 'row')
+    
+    KINDS = {b'{': 'object', b'[': 'array', b'"': 'string', b't': 'boolean', b'f': 'boolean', b'n': 'null'}
+    
+    def __init__(self, parent, key, start, end, kind, row=0):
+        self.parent = parent
+        self.key = key
+        self.start = start
+        self.end = end
+        self.kind = kind
+        self.children = []
+        # Children are scanned from just after the opening bracket
+        self.resume = start + 1 if kind in ('object', 'array') else None
+        self.complete = kind not in ('object', 'array')
+        self.row = row
+
+
+class JsonChildScanner(QtCore.QThread):
+    """Finds the next batch of a container's children off the GUI thread"""
+    
+    # node, resume position scanned from, [(key, start, end, resume)], error message
+    scanned = QtCore.pyqtSignal(object, object, object, str)
+    
+    def __init__(self, data, node, limit, parent=None):
+        super().__init__(parent)
+        self.data = data
+        self.node = node
+        self.start_position = node.resume
+        self.limit = limit
+    
+    def run(self):
+        children = []
+        error = ""
+        try:
+            for child in json_iter_children(self.data, self.start_position, self.node.kind == 'object'):
+                children.append(child)
+                if len(children) >= self.limit or self.isInterruptionRequested():
+                    break
+        except Exception as e:
+            # Any failure must still reach the model, or the node stays busy forever
+            error = str(e) or type(e).__name__
+        self.scanned.emit(self.node, self.start_position, children, error)
+
+
+class LazyJsonModel(QtCore.QAbstractItemModel):
+    """
+    Tree model over a memory-mapped JSON or NDJSON file.
+    Children are scanned from the byte range of their parent when it is
+    expanded, FETCH_BATCH at a time, so memory follows what has been expanded.
+    NDJSON records are rows of the root addressed through the line index;
+    a record's node is only created when its row is shown or looked up.
+    Skipping over a large sibling value can take seconds, so views fetch
+    through JsonChildScanner threads; path lookups scan synchronously.
+    """
+    
+    FETCH_BATCH = 1000
+    PREVIEW_BYTES = 200
+    
+    def __init__(self, data, ndjson=False, line_index=None, parent=None):
+        super().__init__(parent)
+        self.buffer = data
+        self.ndjson = ndjson
+        self.line_index = line_index
+        self.records = {}  # line -> JsonNode, NDJSON only
+        self.record_count = 0
+        self.scanners = {}  # node -> JsonChildScanner in flight
+        if ndjson:
+            self.root = JsonNode(None, "$", 0, len(data), 'records')
+            self.root.complete = True
+        else:
+            start = json_skip_whitespace(data, 0)
+            kind = self.kind_at(start)
+            self.root = JsonNode(None, "$", start, len(data), kind)
+    
+    def kind_at(self, position):
+        first = self.buffer[position:position + 1]
+        return JsonNode.KINDS.get(first, 'number')
+    
+    def node(self, index):
+        return index.internalPointer() if index.isValid() else self.root
+    
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        node = self.node(parent)
+        if node.kind == 'records':
+            if row < 0 or row >= self.record_count:
+                return QtCore.QModelIndex()
+            return self.createIndex(row, column, self.record_node(row))
+        if row < 0 or row >= len(node.children):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+    
+    def record_node(self, line):
+        """Node for NDJSON record number line, created on first use"""
+        node = self.records.get(line)
+        if node is None:
+            start = self.line_index.offset_of_line(line)
+            end = self.buffer.find(b'\n', start)
+            end = len(self.buffer) if end < 0 else end
+            value_start = json_skip_whitespace(self.buffer, start)
+            kind = self.kind_at(value_start) if value_start < end else 'null'
+            node = JsonNode(self.root, line, value_start, end, kind, line)
+            self.records[line] = node
+        return node
+    
+    def update_record_count(self):
+        """Expose records indexed so far as rows of the root"""
+        count = self.line_index.line_count()
+        if self.line_index.complete and self.buffer[-1:] == b'\n':
+            count -= 1
+        if count > self.record_count:
+            self.beginInsertRows(QtCore.QModelIndex(), self.record_count, count - 1)
+            self.record_count = count
+            self.endInsertRows()
+    
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self.root:
+            return QtCore.QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+    
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        node = self.node(parent)
+        return self.record_count if node.kind == 'records' else len(node.children)
+    
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 2
+    
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        node = self.node(parent)
+        if node.kind == 'records':
+            return self.record_count > 0
+        return node.kind in ('object', 'array') and (bool(node.children) or not node.complete)
+    
+    def canFetchMore(self, parent):
+        return not self.node(parent).complete
+    
+    def fetchMore(self, parent):
+        """Scan the next batch in the background; rows are inserted when it arrives"""
+        node = self.node(parent)
+        if node in self.scanners or node.complete:
+            return
+        scanner = JsonChildScanner(self.buffer, node, self.FETCH_BATCH, self)
+        scanner.scanned.connect(self.on_scanned)
+        scanner.finished.connect(scanner.deleteLater)
+        self.scanners[node] = scanner
+        scanner.start()
+    
+    def on_scanned(self, node, start_position, children, error):
+        self.scanners.pop(node, None)
+        if node.complete or node.resume != start_position:
+            # A path lookup scanned these children meanwhile
+            return
+        batch = []
+        for key, start, end, resume in children:
+            batch.append(JsonNode(node, key, start, end, self.kind_at(start)))
+            node.resume = resume
+        if error:
+            batch.append(self.error_node(node, error))
+        elif len(children) < self.FETCH_BATCH:
+            node.complete = True
+        self.insert_children(self.index_of(node), node, batch)
+    
+    def index_of(self, node):
+        if node is self.root:
+            return QtCore.QModelIndex()
+        return self.createIndex(node.row, 0, node)
+    
+    def error_node(self, node, error):
+        node.complete = True
+        print(f"Error parsing JSON: {error}")
+        return JsonNode(node, "error", node.start, node.start, 'error')
+    
+    def fetch_now(self, parent):
+        """Scan the next batch on the calling thread"""
+        node = self.node(parent)
+        try:
+            batch = self.scan_children(node, self.FETCH_BATCH)
+        except Exception as e:
+            batch = [self.error_node(node, str(e) or type(e).__name__)]
+        self.insert_children(parent, node, batch)
+    
+    def insert_children(self, parent, node, batch):
+        if not batch:
+            node.complete = True
+            return
+        first = len(node.children)
+        self.beginInsertRows(parent, first, first + len(batch) - 1)
+        for row, child in enumerate(batch, first):
+            child.row = row
+        node.children.extend(batch)
+        self.endInsertRows()
+    
+    def scan_children(self, node, limit):
+        """Scan up to limit more children of node, resuming where the last scan stopped"""
+        batch = []
+        for key, start, end, resume in json_iter_children(self.buffer, node.resume, node.kind == 'object'):
+            batch.append(JsonNode(node, key, start, end, self.kind_at(start)))
+            node.resume = resume
+            if len(batch) >= limit:
+                return batch
+        node.complete = True
+        return batch
+    
+    def shutdown(self):
+        """Wait for background scans; they read the mapping that is about to close"""
+        for scanner in list(self.scanners.values()):
+            scanner.requestInterruption()
+            scanner.wait()
+        self.scanners.clear()
+    
+    def preview(self, node):
+        if node.kind == 'object':
+            return f"{{…}}  {node.end - node.start:,} bytes"
+        if node.kind == 'array':
+            return f"[…]  {node.end - node.start:,} bytes"
+        raw = self.buffer[node.start:min(node.end, node.start + self.PREVIEW_BYTES)]
+        text = raw.decode('utf-8', errors='replace')
+        return text + ('…' if node.end - node.start > self.PREVIEW_BYTES else '')
+    
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            if index.column() == 0:
+                return f"[{node.key}]" if isinstance(node.key, int) else str(node.key)
+            return self.preview(node)
+        if role == QtCore.Qt.ItemDataRole.ToolTipRole:
+            return self.path_of(node)
+        return None
+    
+    def headerData(self, section, orientation, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if orientation == QtCore.Qt.Orientation.Horizontal and role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return ("Key", "Value")[section]
+        return None
+    
+    def path_of(self, node):
+        parts = []
+        while node is not None and node is not self.root:
+            parts.append(f"[{node.key}]" if isinstance(node.key, int) else f".{node.key}")
+            node = node.parent
+        return "$" + "".join(reversed(parts))
+    
+    @staticmethod
+    def parse_path(path):
+        """Split '$.a.b[3].c' (or 'a/b/3/c') into keys and indices"""
+        keys = []
+        for token in re.findall(r'\[\s*(\d+)\s*\]|\[\s*"([^"]*)"\s*\]|([^.\[\]/]+)', path.strip().lstrip('$')):
+            number, quoted, name = token
+            if number:
+                keys.append(int(number))
+            elif quoted:
+                keys.append(quoted)
+            elif name.isdigit():
+                keys.append(int(name))
+            else:
+                keys.append(name)
+        return keys
+    
+    def find_path(self, path):
+        """Index for a path, fetching only along the way; invalid index if not found"""
+        parent = QtCore.QModelIndex()
+        for key in self.parse_path(path):
+            node = self.node(parent)
+            if node.kind == 'records':
+                if not isinstance(key, int) or key >= self.record_count:
+                    return QtCore.QModelIndex()
+                parent = self.createIndex(key, 0, self.record_node(key))
+                continue
+            found = None
+            while True:
+                for child in node.children:
+                    if child.key == key or (isinstance(key, int) and node.kind == 'object' and child.key == str(key)):
+                        found = child
+                        break
+                if found or node.complete:
+                    break
+                self.fetch_now(parent)
+            if found is None:
+                return QtCore.QModelIndex()
+            parent = self.createIndex(found.row, 0, found)
+        return parent
+
+
+class JsonFileView(QtWidgets.QWidget):
+    """
+    Structured viewer for large JSON/NDJSON files with a path search box.
+    The raw text view is a LargeFileView over the same file, created on demand.
+    """
+    
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.file = open(file_path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.ndjson = file_path.lower().endswith(('.ndjson', '.jsonl'))
+        self.raw_view = None
+        
+        self.line_index = None
+        self.index_builder = None
+        if self.ndjson:
+            self.line_index = LineOffsetIndex(self.data)
+            self.index_builder = LineIndexBuilder(self.line_index, self)
+            self.index_builder.progress.connect(self.on_index_progress)
+        
+        self.model = LazyJsonModel(self.data, self.ndjson, self.line_index, self)
+        self.tree = QtWidgets.QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setUniformRowHeights(True)
+        self.tree.header().setSectionResizeMode(0, QtWidgets.QHeaderView.ResizeMode.Interactive)
+        self.tree.setColumnWidth(0, 280)
+        self.tree.selectionModel().currentChanged.connect(self.on_current_changed)
+        
+        self.path_edit = QtWidgets.QLineEdit()
+        self.path_edit.setPlaceholderText("Path, e.g. $.items[3].name" + (" or [120].id" if self.ndjson else ""))
+        self.path_edit.returnPressed.connect(self.go_to_path)
+        self.raw_button = QtWidgets.QPushButton("Raw Text")
+        self.raw_button.setCheckable(True)
+        self.raw_button.toggled.connect(self.toggle_raw_view)
+        self.status_label = QtWidgets.QLabel()
+        self.status_label.setStyleSheet("padding: 2px 6px; color: #565f89;")
+        
+        toolbar = QtWidgets.QHBoxLayout()
+        toolbar.setContentsMargins(4, 2, 4, 2)
+        toolbar.addWidget(self.path_edit, 1)
+        toolbar.addWidget(self.raw_button)
+        
+        self.stack = QtWidgets.QStackedWidget()
+        self.stack.addWidget(self.tree)
+        
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        layout.addLayout(toolbar)
+        layout.addWidget(self.stack)
+        layout.addWidget(self.status_label)
+        
+        kind = "NDJSON" if self.ndjson else "JSON"
+        self.status_label.setText(f"{kind}, {len(self.data) / (1024 * 1024):,.1f} MB (read-only structured view)")
+        if self.index_builder:
+            self.index_builder.start()
+        elif self.model.canFetchMore(QtCore.QModelIndex()):
+            self.model.fetchMore(QtCore.QModelIndex())
+    
+    def on_index_progress(self, indexed, total):
+        self.model.update_record_count()
+        if indexed >= total:
+            self.status_label.setText(f"NDJSON, {self.line_index.line_count():,} records (read-only structured view)")
+    
+    def on_current_changed(self, current, previous):
+        if current.isValid():
+            self.status_label.setText(self.model.path_of(current.internalPointer()))
+    
+    def go_to_path(self):
+        index = self.model.find_path(self.path_edit.text())
+        if not index.isValid():
+            self.status_label.setText(f"Path not found: {self.path_edit.text()}")
+            return
+        self.tree.setCurrentIndex(index)
+        self.tree.scrollTo(index)
+        self.tree.expand(index)
+    
+    def toggle_raw_view(self, raw):
+        if raw and self.raw_view is None:
+            # Reuse this page's mapping and line index rather than mapping the file twice
+            if self.line_index is None:
+                self.line_index = LineOffsetIndex(self.data)
+                self.index_builder = LineIndexBuilder(self.line_index, self)
+                self.index_builder.start()
+            self.raw_view = LargeFileView(self.file_path, data=self.data, index=self.line_index,
+                                          builder=self.index_builder)
+            self.stack.addWidget(self.raw_view)
+        if raw:
+            # Jump the raw view to the selected value
+            current = self.tree.currentIndex()
+            self.stack.setCurrentWidget(self.raw_view)
+            if current.isValid():
+                QtCore.QTimer.singleShot(0, lambda node=current.internalPointer(): self.show_raw_offset(node.start))
+        else:
+            self.stack.setCurrentWidget(self.tree)
+    
+    def show_raw_offset(self, offset):
+        viewer = self.raw_view.viewer
+        viewer.goto_line(viewer.index.line_of_offset(offset) + 1)
+    
+    def text_viewer(self):
+        """The raw text viewer when it is showing, for Find and Go to Line"""
+        if self.raw_view is not None and self.stack.currentWidget() is self.raw_view:
+            return self.raw_view.viewer
+        return None
+    
+    def close_file(self):
+        if self.index_builder:
+            self.index_builder.requestInterruption()
+            self.index_builder.wait()
+        if self.raw_view is not None:
+            self.raw_view.close_file()
+        self.model.shutdown()
+        self.tree.setModel(None)
+        self.data.close()
+        self.file.close()
+
+
+def parse_offset(text):
+    """Byte offset from decimal (leading zeros allowed) or 0x-prefixed hex text"""
+    text = text.strip().replace('_', '').lower()
+    if text.startswith('0x'):
+        return int(text[2:], 16)
+    return int(text, 10)
+
+
+def is_binary_file(file_path, sample_size=8192):
+    """Sniff the start of a file: NUL bytes or mostly control bytes mean binary"""
+    try:
+        with open(file_path, 'rb') as f:
+            sample = f.read(sample_size)
+    except OSError:
+        return False
+    if not sample:
+        return False
+    if b'\x00' in sample:
+        # UTF-16/32 text has NULs too; honour its byte order mark
+        return text_encoding_for(sample) == 'utf-8-sig'
+    try:
+        sample.decode('utf-8')
+        return False
+    except UnicodeDecodeError as e:
+        # A multi-byte sequence cut off by the sample size is still text
+        if e.start >= len(sample) - 4:
+            return False
+    text_bytes = bytes(range(32, 127)) + b'\n\r\t\b\f\x1b'
+    control = len(sample.translate(None, text_bytes))
+    return control / len(sample) > 0.30
+
+
+class HexFileViewer(QtWidgets.QAbstractScrollArea):
+    """
+    Paged hex/ASCII viewer over a memory-mapped file.
+    Only the rows in the viewport are formatted, so opening a file of any size
+    costs the same; rows can be selected and copied as hex.
+    """
+    
+    BYTES_PER_ROW = 16
+    COPY_LIMIT = 4 * 1024 * 1024
+    
+    cursor_moved = QtCore.pyqtSignal(int)
+    
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.file = open(file_path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        self.cursor_row = 0
+        self.anchor_row = 0
+        
+        self.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont))
+        self.setFocusPolicy(QtCore.Qt.FocusPolicy.StrongFocus)
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+        self.horizontalScrollBar().valueChanged.connect(self.viewport().update)
+        self.offset_digits = max(8, len(f"{self.size:x}"))
+    
+    def close_file(self):
+        if self.size:
+            self.data.close()
+        self.file.close()
+    
+    def row_count(self):
+        return (self.size + self.BYTES_PER_ROW - 1) // self.BYTES_PER_ROW
+    
+    def visible_row_count(self):
+        return max(1, self.viewport().height() // self.fontMetrics().lineSpacing())
+    
+    def format_row(self, row):
+        offset = row * self.BYTES_PER_ROW
+        chunk = self.data[offset:offset + self.BYTES_PER_ROW]
+        hex_part = chunk.hex(' ')
+        if len(chunk) > 8:
+            # Extra gap between the two 8-byte halves
+            hex_part = hex_part[:23] + ' ' + hex_part[23:]
+        ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
+        return f"{offset:0{self.offset_digits}x}  {hex_part:<49}  {ascii_part}"
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scrollbars()
+    
+    def update_scrollbars(self):
+        visible = self.visible_row_count()
+        self.verticalScrollBar().setRange(0, max(0, self.row_count() - visible))
+        self.verticalScrollBar().setPageStep(visible)
+        row_width = self.fontMetrics().horizontalAdvance('0' * (self.offset_digits + 2 + 49 + 2 + self.BYTES_PER_ROW))
+        self.horizontalScrollBar().setRange(0, max(0, row_width - self.viewport().width()))
+        self.horizontalScrollBar().setPageStep(self.viewport().width())
+    
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self.viewport())
+        palette = self.palette()
+        painter.fillRect(self.viewport().rect(), palette.color(QtGui.QPalette.ColorRole.Base))
+        metrics = self.fontMetrics()
+        line_height = metrics.lineSpacing()
+        first_row = self.verticalScrollBar().value()
+        x = -self.horizontalScrollBar().value() + 4
+        selection = (min(self.anchor_row, self.cursor_row), max(self.anchor_row, self.cursor_row))
+        
+        for index, row in enumerate(range(first_row, min(self.row_count(), first_row + self.visible_row_count() + 1))):
+            y = index * line_height
+            if selection[0] <= row <= selection[1]:
+                painter.fillRect(0, y, self.viewport().width(), line_height,
+                                 palette.color(QtGui.QPalette.ColorRole.Highlight).lighter(170))
+            painter.setPen(palette.color(QtGui.QPalette.ColorRole.Text))
+            painter.drawText(x, y + metrics.ascent(), self.format_row(row))
+        painter.end()
+    
+    def set_cursor_row(self, row, extend=False):
+        row = max(0, min(row, self.row_count() - 1))
+        self.cursor_row = row
+        if not extend:
+            self.anchor_row = row
+        scrollbar = self.verticalScrollBar()
+        if row < scrollbar.value():
+            scrollbar.setValue(row)
+        elif row >= scrollbar.value() + self.visible_row_count():
+            scrollbar.setValue(row - self.visible_row_count() + 1)
+        self.viewport().update()
+        self.cursor_moved.emit(row)
+    
+    def goto_offset(self, offset):
+        self.set_cursor_row(offset // self.BYTES_PER_ROW)
+        self.verticalScrollBar().setValue(max(0, self.cursor_row - self.visible_row_count() // 3))
+    
+    def mousePressEvent(self, event):
+        row = self.verticalScrollBar().value() + int(event.position().y()) // self.fontMetrics().lineSpacing()
+        self.set_cursor_row(row, bool(event.modifiers() & QtCore.Qt.KeyboardModifier.ShiftModifier))
+    
+    def keyPressEvent(self, event):
+        if event.matches(QtGui.QKeySequence.StandardKey.Copy):
+            self.copy_selection()
+            return
+        extend = bool(event.modifiers() & QtCore.Qt.KeyboardModifier.ShiftModifier)
+        moves = {
+            QtCore.Qt.Key.Key_Up: -1,
+            QtCore.Qt.Key.Key_Down: 1,
+            QtCore.Qt.Key.Key_PageUp: -self.visible_row_count(),
+            QtCore.Qt.Key.Key_PageDown: self.visible_row_count(),
+        }
+        if event.key() in moves:
+            self.set_cursor_row(self.cursor_row + moves[event.key()], extend)
+        elif event.key() == QtCore.Qt.Key.Key_Home:
+            self.set_cursor_row(0, extend)
+        elif event.key() == QtCore.Qt.Key.Key_End:
+            self.set_cursor_row(self.row_count() - 1, extend)
+        else:
+            super().keyPressEvent(event)
+    
+    def copy_selection(self):
+        """Copy the selected rows as hex bytes"""
+        first, last = sorted((self.anchor_row, self.cursor_row))
+        start = first * self.BYTES_PER_ROW
+        end = min(self.size, (last + 1) * self.BYTES_PER_ROW)
+        if end - start > self.COPY_LIMIT:
+            QtWidgets.QMessageBox.warning(self, "Copy", f"Selection is larger than {self.COPY_LIMIT // (1024 * 1024)} MB.")
+            return
+        QtWidgets.QApplication.clipboard().setText(self.data[start:end].hex(' '))
+
+
+class HexFileView(QtWidgets.QWidget):
+    """Tab page for binary files: a header line and the hex viewer"""
+    
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.hex_viewer = HexFileViewer(file_path, self)
+        
+        header = QtWidgets.QLabel(f"Binary file, {self.hex_viewer.size:,} bytes (read-only hex view)")
+        header.setStyleSheet("padding: 2px 6px; color: #565f89;")
+        
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        layout.addWidget(header)
+        layout.addWidget(self.hex_viewer)
+    
+    def close_file(self):
+        self.hex_viewer.close_file()
+
+
+class FileTailer(QtCore.QObject):
+    """
+    Follows a growing file (tail -f) into an editor.
+    Only bytes appended since the last read are decoded and appended; the
+    document's maximumBlockCount trims the oldest lines like a ring buffer.
+    Rotation and truncation are detected from inode and size changes.
+    Once lines were appended or trimmed the buffer no longer mirrors the
+    file, so stopping unlinks it from file_path instead of letting a save
+    truncate the log to the visible tail.
+    """
+    
+    POLL_INTERVAL = 1000  # Fallback poll in ms; watchers miss events on some filesystems
+    MAX_READ = 4 * 1024 * 1024
+    
+    def __init__(self, editor, file_path, max_lines=100000, start_offset=None, parent=None):
+        super().__init__(parent)
+        self.editor = editor
+        self.file_path = file_path
+        self.document = editor.document()
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.partial_line = ""
+        
+        try:
+            stat = os.stat(file_path)
+            # Resume after the bytes the buffer holds, so nothing written since loading is lost
+            self.inode = stat.st_ino
+            self.offset = stat.st_size if start_offset is None else start_offset
+        except OSError:
+            self.inode, self.offset = None, 0
+        
+        self.was_read_only = editor.isReadOnly()
+        editor.setReadOnly(True)
+        self.document.setUndoRedoEnabled(False)
+        self.detached = self.document.blockCount() > max_lines
+        self.document.setMaximumBlockCount(max_lines)
+        self.cursor = QtGui.QTextCursor(self.document)
+        
+        self.watcher = QtCore.QFileSystemWatcher([file_path], self)
+        self.watcher.fileChanged.connect(self.read_new_data)
+        self.poll_timer = QtCore.QTimer(self)
+        self.poll_timer.timeout.connect(self.read_new_data)
+        self.poll_timer.start(self.POLL_INTERVAL)
+    
+    def stop(self):
+        """Stop following; returns True if the buffer was unlinked from its file"""
+        self.poll_timer.stop()
+        self.watcher.removePaths(self.watcher.files())
+        self.document.setMaximumBlockCount(0)
+        self.document.setUndoRedoEnabled(True)
+        self.editor.setReadOnly(self.was_read_only)
+        if self.detached:
+            self.editor.setProperty("file_path", None)
+        return self.detached
+    
+    def read_new_data(self, *args):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            # Rotated away and not recreated yet
+            return
+        
+        # Keep watching the path if the file was replaced
+        if self.file_path not in self.watcher.files():
+            self.watcher.addPath(self.file_path)
+        
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            reason = "rotated" if stat.st_ino != self.inode else "truncated"
+            self.inode, self.offset = stat.st_ino, 0
+            self.decoder.reset()
+            self.partial_line = ""
+            self.append(f"--- {os.path.basename(self.file_path)} {reason} ---\n")
+        
+        if stat.st_size == self.offset:
+            return
+        
+        try:
+            with open(self.file_path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read(min(stat.st_size - self.offset, self.MAX_READ))
+        except OSError:
+            return
+        self.offset += len(data)
+        
+        # Append complete lines only; a partial last line waits for its newline
+        text = self.partial_line + self.decoder.decode(data)
+        cut = text.rfind('\n') + 1
+        self.partial_line = text[cut:]
+        if cut:
+            self.append(text[:cut].replace('\r\n', '\n'))
+        
+        # Large backlogs are drained in slices so the GUI stays responsive
+        if self.offset < stat.st_size:
+            QtCore.QTimer.singleShot(0, self.read_new_data)
+    
+    def append(self, text):
+        scrollbar = self.editor.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 1
+        
+        self.cursor.movePosition(QtGui.QTextCursor.MoveOperation.End)
+        self.cursor.insertText(text)
+        self.document.setModified(False)
+        self.detached = True
+        
+        # Auto-scroll unless the user has scrolled up
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+
+PROJECT_SEARCH_SKIP_DIRS = {'.git', '.hg', '.svn', '__pycache__', 'node_modules', '.venv', 'venv',
+                            '.mypy_cache', '.pytest_cache', '.tox', '.eggs', '.idea'}
+
+
+class IgnoreRules:
+    """
+    Minimal .gitignore matcher: globs, '**', '!' negation, trailing '/' for
+    directories and leading or inner '/' to anchor a pattern at the folder
+    holding the .gitignore. Nested .gitignore files add rules as the walk
+    descends into their folder.
+    """
+    
+    def __init__(self, rules=()):
+        self.rules = list(rules)  # (base directory, regex, negate, directories only)
+    
+    def child(self, directory):
+        """Rules in effect inside directory"""
+        try:
+            with open(os.path.join(directory, '.gitignore'), 'r', encoding='utf-8', errors='replace') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return self
+        rules = list(self.rules)
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            regex = self.translate(line.lstrip('/'))
+            if '/' not in line:
+                regex = '(?:.*/)?' + regex
+            rules.append((directory, re.compile(regex + r'\Z'), negate, dir_only))
+        return IgnoreRules(rules)
+    
+    @staticmethod
+    def translate(glob):
+        """gitignore glob to a regex over '/'-separated relative paths"""
+        parts = []
+        i = 0
+        while i < len(glob):
+            if glob.startswith('**/', i):
+                parts.append('(?:.*/)?')
+                i += 3
+                continue
+            if glob.startswith('**', i):
+                parts.append('.*')
+                i += 2
+                continue
+            char = glob[i]
+            end = glob.find(']', i + 1) if char == '[' else -1
+            if char == '*':
+                parts.append('[^/]*')
+            elif char == '?':
+                parts.append('[^/]')
+            elif end > i:
+                body = glob[i + 1:end].replace('\\', '\\\\')
+                parts.append('[' + ('^' + body[1:] if body.startswith('!') else body) + ']')
+                i = end
+            else:
+                parts.append(re.escape(char))
+            i += 1
+        return ''.join(parts)
+    
+    def ignored(self, path, is_dir):
+        result = False
+        relative_paths = {}
+        for base, regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base not in relative_paths:
+                relative_paths[base] = os.path.relpath(path, base).replace(os.sep, '/')
+            if regex.match(relative_paths[base]):
+                result = not negate
+        return result
+
+
+def include_filter(text):
+    """Predicate on file names from a comma/semicolon separated glob list, or None for all files"""
+    globs = [glob.strip() for glob in re.split(r'[,;]', text) if glob.strip()]
+    if not globs:
+        return None
+    regex = re.compile('|'.join(IgnoreRules.translate(glob) for glob in globs) + r'\Z')
+    return lambda name: regex.match(name) is not None
+
+
+def iter_project_files(root, include=None):
+    """Yield the files under root a project search should look at"""
+    stack = [(root, IgnoreRules().child(root))]
+    while stack:
+        directory, rules = stack.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in PROJECT_SEARCH_SKIP_DIRS and not rules.ignored(entry.path, True):
+                        subdirectories.append(entry.path)
+                elif entry.is_file() and not rules.ignored(entry.path, False):
+                    if include is None or include(entry.name):
+                        yield entry.path
+            except OSError:
+                continue
+        stack.extend((path, rules.child(path)) for path in reversed(subdirectories))
+
+
+def project_file_included(root, file_path, include=None):
+    """Whether iter_project_files(root, include) would yield file_path, without walking the tree"""
+    relative = os.path.relpath(file_path, root)
+    if os.path.isabs(relative) or relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return False
+    if include is not None and not include(os.path.basename(file_path)):
+        return False
+    rules = IgnoreRules().child(root)
+    directory = root
+    for name in relative.split(os.sep)[:-1]:
+        directory = os.path.join(directory, name)
+        if name in PROJECT_SEARCH_SKIP_DIRS or rules.ignored(directory, True):
+            return False
+        rules = rules.child(directory)
+    return not rules.ignored(file_path, False)
+
+
+def required_literals(pattern):
+    """
+    Literal strings that every match of a compiled pattern must contain.
+    Conservative: literal runs of the top-level sequence, of groups and of
+    repeats with a minimum of one are reported; alternations add nothing.
+    """
+    try:
+        from re import _parser as regex_parser
+    except ImportError:
+        import sre_parse as regex_parser
+    try:
+        parsed = regex_parser.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return []
+    literals = []
+    
+    def walk(items):
+        run = []
+        for op, argument in items:
+            name = str(op)
+            if name == 'LITERAL':
+                run.append(chr(argument))
+                continue
+            if run:
+                literals.append(''.join(run))
+                run = []
+            if name == 'SUBPATTERN':
+                walk(argument[-1])
+            elif name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT') and argument[0] >= 1:
+                walk(argument[2])
+        if run:
+            literals.append(''.join(run))
+    
+    walk(parsed)
+    return literals
+
+
+def prefilter_literal(pattern):
+    """Longest required literal as UTF-8 bytes, or None when nothing useful is required"""
+    # Files may use CRLF, so a literal never spans a newline
+    pieces = [piece for literal in required_literals(pattern) for piece in literal.split('\n')]
+    literal = max(pieces, key=len, default='')
+    if not literal or (pattern.flags & re.IGNORECASE and not literal.isascii()):
+        return None
+    return literal.encode('utf-8')
+
+
+def buffer_contains_literal(data, literal, ignore_case=False):
+    if ignore_case:
+        return re.search(re.escape(literal), data, re.IGNORECASE) is not None
+    return data.find(literal) >= 0
+
+
+PROJECT_SEARCH_MAX_HITS_PER_FILE = 1000
+
+
+def search_text_for_matches(pattern, text, replacement=None):
+    """
+    Matches of pattern in text as (line, column, length, line text) tuples.
+    With a replacement the line text previews the line before and after.
+    """
+    hits = []
+    line_number = 0
+    line_start = 0
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        if start == end:
+            continue
+        line_number += text.count('\n', line_start, start)
+        line_start = text.rfind('\n', 0, start) + 1
+        line_end = text.find('\n', start)
+        if line_end < 0:
+            line_end = len(text)
+        line = text[line_start:line_end]
+        if replacement is not None:
+            rest_end = text.find('\n', end)
+            rest = text[end:rest_end if rest_end >= 0 else len(text)]
+            replaced = line[:start - line_start] + match.expand(replacement) + rest
+            line = f"{line.strip()[:200]}  \u2192  {replaced.strip()[:200]}"
+        hits.append((line_number, start - line_start, end - start, line[:400]))
+        if len(hits) >= PROJECT_SEARCH_MAX_HITS_PER_FILE:
+            break
+    return hits
+
+
+def search_file_for_matches(file_path, pattern, literal, max_size, replacement=None):
+    """
+    Matches of pattern in one file, or None when the file is skipped by
+    policy (unreadable, larger than max_size or binary). The file is
+    memory-mapped and checked for the literal before anything is decoded.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size > max_size:
+                return None
+            if size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if b'\0' in data[:8192]:
+                    return None
+                if literal is not None and not buffer_contains_literal(data, literal, pattern.flags & re.IGNORECASE):
+                    return []
+                text = decode_file_bytes(data[:])
+    except (OSError, ValueError):
+        return None
+    return search_text_for_matches(pattern, text, replacement)
+
+
+def search_files_in_process(file_paths, pattern, literal, max_size, replacement=None):
+    """Process pool entry point: search a batch of files"""
+    return [(file_path, search_file_for_matches(file_path, pattern, literal, max_size, replacement))
+            for file_path in file_paths]
+
+
+class ProcessPoolWorker(QtCore.QThread):
+    """
+    Thread that feeds batches of files to a process pool, keeping a bounded
+    number of batches in flight and passing each finished batch to deliver().
+    """
+    
+    BATCH_SIZE = 48
+    
+    def __init__(self, executor, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.max_in_flight = 4 * (os.cpu_count() or 2)
+        self.cancelled = False
+    
+    def cancel(self):
+        self.cancelled = True
+    
+    def run_batches(self, file_paths, function, *args):
+        """Run function(batch, *args) over file_paths in the pool until done or cancelled"""
+        pending = set()
+        batch = []
+        try:
+            for file_path in file_paths:
+                if self.cancelled:
+                    break
+                batch.append(file_path)
+                if len(batch) >= self.BATCH_SIZE:
+                    pending.add(self.executor.submit(function, batch, *args))
+                    batch = []
+                    while len(pending) >= self.max_in_flight and not self.cancelled:
+                        pending = self.collect(pending)
+            if batch and not self.cancelled:
+                pending.add(self.executor.submit(function, batch, *args))
+            while pending and not self.cancelled:
+                pending = self.collect(pending)
+        except RuntimeError as e:
+            # Pool shut down while the application is closing
+            print(f"Error running process pool batches: {e}")
+        finally:
+            for future in pending:
+                future.cancel()
+    
+    def collect(self, pending):
+        done, pending = concurrent.futures.wait(pending, timeout=0.2, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            try:
+                self.deliver(future.result())
+            except Exception as e:
+                print(f"Error in process pool batch: {e}")
+        return pending
+    
+    def deliver(self, results):
+        pass
+
+
+class ProjectSearchWorker(ProcessPoolWorker):
+    """
+    Searches the project in the process pool, emitting results as each batch
+    finishes. Buffers with unsaved edits are searched as they are in the
+    editor instead of as on disk. With a trigram index, its candidate files
+    are searched first and the walk afterwards only picks up files changed
+    since they were indexed. With a replacement the hits preview the change.
+    """
+    
+    results_ready = QtCore.pyqtSignal(object, object)  # worker, [(file_path, hits)]
+    progress = QtCore.pyqtSignal(object, int, int, int)  # worker, searched, matched, skipped
+    search_done = QtCore.pyqtSignal(object, bool)  # worker, cancelled
+    
+    def __init__(self, executor, root, pattern, include, max_size, open_buffers, index=None, replacement=None, parent=None):
+        super().__init__(executor, parent)
+        self.replacement = replacement
+        self.root = root
+        self.pattern = pattern
+        self.include = include
+        self.max_size = max_size
+        self.open_buffers = open_buffers  # normalized path -> text
+        self.index = index
+        self.searched = self.matched = self.skipped = 0
+    
+    def included(self, file_path):
+        return (os.path.normcase(file_path) not in self.open_buffers
+                and (self.include is None or self.include(os.path.basename(file_path))))
+    
+    def search_buffer(self, file_path, text):
+        return search_text_for_matches(self.pattern, text, self.replacement)
+    
+    def batch_search(self):
+        """Pool function and its trailing arguments for searching a batch of files"""
+        return search_files_in_process, (self.pattern, prefilter_literal(self.pattern), self.max_size, self.replacement)
+    
+    def run(self):
+        function, args = self.batch_search()
+        # Unsaved buffers obey the same include globs and ignore rules as files on disk
+        root = os.path.normcase(self.root)
+        self.deliver([(file_path, self.search_buffer(file_path, text))
+                      for file_path, text in self.open_buffers.items()
+                      if project_file_included(root, file_path, self.include)])
+        candidates = None
+        if self.index is not None and self.index.ready and self.pattern is not None:
+            candidates, indexed = self.index.candidates(self.pattern)
+        if candidates is None:
+            self.run_batches(filter(self.included, iter_project_files(self.root, self.include)), function, *args)
+        else:
+            self.run_batches(filter(self.included, candidates), function, *args)
+            candidates = set(candidates)
+            stale = (file_path for file_path in iter_project_files(self.root, self.include)
+                     if file_path not in candidates and not self.index.is_current(file_path, indexed))
+            self.run_batches(filter(self.included, stale), function, *args)
+        self.search_done.emit(self, self.cancelled)
+    
+    def deliver(self, results):
+        found = []
+        for file_path, hits in results:
+            self.searched += 1
+            if hits is None:
+                self.skipped += 1
+            elif hits:
+                self.matched += 1
+                found.append((file_path, hits))
+        if found:
+            self.results_ready.emit(self, found)
+        self.progress.emit(self, self.searched, self.matched, self.skipped)
+
+
+STRUCTURAL_WILDCARD_PREFIX = '__pythonico_wild_'
+STRUCTURAL_EXTENSIONS = ('.py', '.pyw', '.pyi')
+
+
+class StructuralPattern:
+    """
+    Python code pattern for structural search.
+    `$name` matches any single node and must match the same code wherever
+    the name repeats (`$_` never binds); `...` matches any expression or
+    any run of arguments or statements; a keyword written `name=$absent`
+    requires that keyword to be missing. A query starting with `except`
+    matches that handler in any try statement. `\\n` separates lines.
+    """
+    
+    def __init__(self, query):
+        source = re.sub(r'\$(\w+)', STRUCTURAL_WILDCARD_PREFIX + r'\1', query.replace('\\n', '\n')).strip()
+        self.query = query
+        self.node = None
+        self.statements = None
+        self.handler = None
+        try:
+            self.node = ast.parse(source, mode='eval').body
+            return
+        except SyntaxError:
+            pass
+        if source.startswith('except'):
+            self.handler = ast.parse('try:\n    ...\n' + source).body[0].handlers[0]
+        else:
+            self.statements = ast.parse(source).body
+    
+    def required_literal(self):
+        """Longest name or string every match must contain, for prefilters and the index"""
+        words = []
+        nodes = [self.node] if self.node is not None else [self.handler] if self.handler is not None else self.statements
+        for node in (child for root in nodes for child in ast.walk(root)):
+            if isinstance(node, ast.Call):
+                # Keywords that must be absent are not required text
+                words.extend(keyword.arg for keyword in node.keywords
+                             if keyword.arg and structural_wildcard(keyword.value) != 'absent')
+            elif isinstance(node, ast.Name):
+                words.append(node.id)
+            elif isinstance(node, ast.Attribute):
+                words.append(node.attr)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                words.append(node.name)
+        words = [word for word in words if not word.startswith(STRUCTURAL_WILDCARD_PREFIX)]
+        return max(words, key=len, default='')
+
+
+def structural_wildcard(node):
+    """Name of a `$name` placeholder node, or None"""
+    if isinstance(node, ast.Expr):
+        node = node.value
+    if isinstance(node, ast.Name) and node.id.startswith(STRUCTURAL_WILDCARD_PREFIX):
+        return node.id[len(STRUCTURAL_WILDCARD_PREFIX):]
+    return None
+
+
+def structural_is_ellipsis(node):
+    if isinstance(node, ast.Expr):
+        node = node.value
+    return isinstance(node, ast.Constant) and node.value is Ellipsis
+
+
+def structural_bind(name, target, bindings):
+    if target is None:
+        return False  # An optional part that is missing, e.g. the type of a bare except
+    if name == '_':
+        return True
+    key = ast.dump(target) if isinstance(target, ast.AST) else repr(target)
+    return bindings.setdefault(name, key) == key
+
+
+def structural_match(pattern, target, bindings):
+    """Whether target matches the pattern node, extending bindings on success"""
+    name = structural_wildcard(pattern)
+    if name is not None:
+        return structural_bind(name, target, bindings)
+    if isinstance(pattern, list):
+        return isinstance(target, list) and structural_match_sequence(pattern, target, bindings)
+    if isinstance(pattern, ast.AST):
+        if structural_is_ellipsis(pattern) and isinstance(target, ast.expr):
+            return True
+        if type(pattern) is not type(target):
+            return False
+        if isinstance(pattern, ast.Call):
+            return (structural_match(pattern.func, target.func, bindings)
+                    and structural_match_sequence(pattern.args, target.args, bindings)
+                    and structural_match_keywords(pattern, target, bindings))
+        for field in pattern._fields:
+            if field in ('ctx', 'kind', 'type_comment'):
+                continue
+            if not structural_match(getattr(pattern, field, None), getattr(target, field, None), bindings):
+                return False
+        return True
+    if isinstance(pattern, str) and pattern.startswith(STRUCTURAL_WILDCARD_PREFIX):
+        return structural_bind(pattern[len(STRUCTURAL_WILDCARD_PREFIX):], target, bindings)
+    return type(pattern) is type(target) and pattern == target
+
+
+def structural_match_sequence(patterns, targets, bindings, start=0, target_start=0, stop=None):
+    """
+    Match node lists where a `...` element stands for any run of nodes.
+    With a stop list, targets may go on after the match and the index where
+    the (shortest) match ended is appended to it.
+    """
+    if start == len(patterns):
+        if stop is None:
+            return target_start == len(targets)
+        stop.append(target_start)
+        return True
+    pattern = patterns[start]
+    trial = dict(bindings)
+    if structural_is_ellipsis(pattern):
+        for skip in range(target_start, len(targets) + 1):
+            if structural_match_sequence(patterns, targets, trial, start + 1, skip, stop):
+                bindings.update(trial)
+                return True
+            trial = dict(bindings)
+        return False
+    if (target_start < len(targets) and structural_match(pattern, targets[target_start], trial)
+            and structural_match_sequence(patterns, targets, trial, start + 1, target_start + 1, stop)):
+        bindings.update(trial)
+        return True
+    return False
+
+
+def structural_match_keywords(pattern, target, bindings):
+    """Keywords match by name; extra ones are allowed only when the arguments have `...`"""
+    available = {keyword.arg: keyword.value for keyword in target.keywords}
+    for keyword in pattern.keywords:
+        if structural_wildcard(keyword.value) == 'absent':
+            if keyword.arg in available:
+                return False
+        elif keyword.arg not in available or not structural_match(keyword.value, available.pop(keyword.arg), bindings):
+            return False
+    return not available or any(structural_is_ellipsis(argument) for argument in pattern.args)
+
+
+def structural_hit(first, last, lines):
+    """(line, column, length, line text) for a node run, with AST byte offsets turned into characters"""
+    line = lines[first.lineno - 1] if first.lineno <= len(lines) else ''
+    encoded = line.encode('utf-8')
+    column = len(encoded[:first.col_offset].decode('utf-8', errors='ignore'))
+    if last.end_lineno == first.lineno:
+        length = len(encoded[:last.end_col_offset].decode('utf-8', errors='ignore')) - column
+    else:
+        length = len(line) - column
+    return first.lineno - 1, column, length, line[:400]
+
+
+def structural_search_tree(structural, tree, text):
+    """Hits of a StructuralPattern in a parsed module"""
+    lines = text.split('\n')
+    hits = []
+    if structural.node is not None:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.expr) and structural_match(structural.node, node, {}):
+                hits.append(structural_hit(node, node, lines))
+    elif structural.handler is not None:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ExceptHandler) and structural_match(structural.handler, node, {}):
+                hits.append(structural_hit(node, node, lines))
+    else:
+        # A run may start anywhere in a body, so `...` at either end of the query adds nothing
+        patterns = structural.statements
+        first = next((i for i, pattern in enumerate(patterns) if not structural_is_ellipsis(pattern)), len(patterns))
+        last = len(patterns) - next((i for i, pattern in enumerate(reversed(patterns))
+                                     if not structural_is_ellipsis(pattern)), 0)
+        patterns = patterns[first:last] or patterns
+        for node in ast.walk(tree):
+            for field in ('body', 'orelse', 'finalbody'):
+                statements = getattr(node, field, None)
+                if not isinstance(statements, list) or not statements or not isinstance(statements[0], ast.stmt):
+                    continue
+                for start in range(len(statements)):
+                    stop = []
+                    if structural_match_sequence(patterns, statements, {}, 0, start, stop) and stop[0] > start:
+                        hits.append(structural_hit(statements[start], statements[stop[0] - 1], lines))
+    hits.sort()
+    return hits[:PROJECT_SEARCH_MAX_HITS_PER_FILE]
+
+
+# Parsed modules of recently searched files, per pool process: path -> (mtime_ns, size, tree, text)
+STRUCTURAL_TREE_CACHE = collections.OrderedDict()
+STRUCTURAL_TREE_CACHE_SIZE = 128
+
+
+def structural_search_file(file_path, structural, literal, max_size):
+    """Structural hits in one Python file, or None when it is skipped or does not parse"""
+    try:
+        stat = os.stat(file_path)
+        if stat.st_size > max_size:
+            return None
+        cached = STRUCTURAL_TREE_CACHE.get(file_path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            STRUCTURAL_TREE_CACHE.move_to_end(file_path)
+            tree, text = cached[2:]
+        else:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            if literal is not None and literal not in data:
+                return []
+            text = decode_file_bytes(data)
+            tree = ast.parse(text, filename=file_path)
+            STRUCTURAL_TREE_CACHE[file_path] = (stat.st_mtime_ns, stat.st_size, tree, text)
+            if len(STRUCTURAL_TREE_CACHE) > STRUCTURAL_TREE_CACHE_SIZE:
+                STRUCTURAL_TREE_CACHE.popitem(last=False)
+        return structural_search_tree(structural, tree, text)
+    except (OSError, SyntaxError, ValueError, RecursionError):
+        return None
+
+
+def structural_search_files_in_process(file_paths, structural, literal, max_size):
+    """Process pool entry point: structural search of a batch of files"""
+    return [(file_path, structural_search_file(file_path, structural, literal, max_size)) for file_path in file_paths]
+
+
+class StructuralSearchWorker(ProjectSearchWorker):
+    """Project search for a StructuralPattern over Python files"""
+    
+    def __init__(self, executor, root, structural, include, max_size, open_buffers, index=None, parent=None):
+        literal = structural.required_literal()
+        # The regex only narrows candidates through the trigram index
+        pattern = re.compile(re.escape(literal)) if literal else None
+        super().__init__(executor, root, pattern, include, max_size, open_buffers, index, None, parent)
+        self.structural = structural
+        self.literal = literal.encode('utf-8') if literal else None
+    
+    def included(self, file_path):
+        return file_path.endswith(STRUCTURAL_EXTENSIONS) and super().included(file_path)
+    
+    def search_buffer(self, file_path, text):
+        if not file_path.endswith(STRUCTURAL_EXTENSIONS):
+            return []
+        try:
+            return structural_search_tree(self.structural, ast.parse(text), text)
+        except (SyntaxError, ValueError, RecursionError):
+            return None
+    
+    def batch_search(self):
+        return structural_search_files_in_process, (self.structural, self.literal, self.max_size)
+
+
+def byte_trigrams(data):
+    """Distinct case-folded (ASCII) byte trigrams of data as 24-bit ints"""
+    data = data.lower()
+    return {(a << 16) | (b << 8) | c for a, b, c in zip(data, data[1:], data[2:])}
+
+
+def index_files_in_process(file_paths, max_size):
+    """
+    Process pool entry point: (path, mtime_ns, size, trigrams) per file.
+    Trigrams are None for binary or oversized files and the stat fields are
+    None for files that can no longer be read.
+    """
+    results = []
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                trigrams = None
+                if stat.st_size <= max_size:
+                    data = f.read()
+                    if b'\0' not in data[:8192]:
+                        trigrams = array.array('I', byte_trigrams(data))
+            results.append((file_path, stat.st_mtime_ns, stat.st_size, trigrams))
+        except OSError:
+            results.append((file_path, None, None, None))
+    return results
+
+
+class TrigramIndex:
+    """
+    Persisted trigram index of a project folder for narrowing searches.
+    Each indexed file gets an id and postings map a trigram to the ids of
+    the files containing it. A changed or deleted file only turns its old id
+    into a tombstone, so updates append to postings and never rewrite them;
+    the index is compacted on save once tombstones pile up.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, root, cache_file):
+        self.root = root
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        self.paths = []  # id -> path, None for tombstones
+        self.files = {}  # path -> (id, mtime_ns, size)
+        self.postings = {}  # trigram -> array of ids
+        self.ready = False  # Complete enough to narrow searches
+        self.dirty = False
+    
+    def is_current(self, file_path, files=None):
+        """Whether file_path is unchanged since it was indexed, in files if given (a snapshot from candidates)"""
+        entry = (self.files if files is None else files).get(file_path)
+        if entry is None:
+            return False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        return entry[1] == stat.st_mtime_ns and entry[2] == stat.st_size
+    
+    def known_paths(self):
+        with self.lock:
+            return set(self.files)
+    
+    def add(self, file_path, mtime_ns, size, trigrams):
+        with self.lock:
+            self.remove_locked(file_path)
+            file_id = len(self.paths)
+            self.paths.append(file_path)
+            self.files[file_path] = (file_id, mtime_ns, size)
+            for trigram in trigrams or ():
+                posting = self.postings.get(trigram)
+                if posting is None:
+                    self.postings[trigram] = array.array('I', (file_id,))
+                else:
+                    posting.append(file_id)
+            self.dirty = True
+    
+    def remove(self, file_path):
+        with self.lock:
+            self.remove_locked(file_path)
+    
+    def remove_locked(self, file_path):
+        entry = self.files.pop(file_path, None)
+        if entry is not None:
+            self.paths[entry[0]] = None
+            self.dirty = True
+    
+    def candidates(self, pattern):
+        """
+        Sorted indexed files that can match pattern, with a snapshot of the
+        file entries taken under the same lock, or (None, None) if the pattern
+        has no usable trigrams. Files re-indexed after the snapshot are stale
+        against it, so checking is_current with it never loses them.
+        """
+        ignore_case = pattern.flags & re.IGNORECASE
+        wanted = set()
+        for literal in required_literals(pattern):
+            for piece in literal.split('\n'):
+                if len(piece) >= 3 and (piece.isascii() or not ignore_case):
+                    wanted |= byte_trigrams(piece.encode('utf-8'))
+        if not wanted:
+            return None, None
+        with self.lock:
+            files = dict(self.files)
+            postings = []
+            for trigram in wanted:
+                posting = self.postings.get(trigram)
+                if posting is None:
+                    return [], files
+                postings.append(posting)
+            postings.sort(key=len)
+            ids = set(postings[0])
+            for posting in postings[1:]:
+                if not ids:
+                    break
+                ids.intersection_update(posting)
+            paths = [self.paths[file_id] for file_id in ids if self.paths[file_id] is not None]
+        return sorted(paths), files
+    
+    def compact_locked(self):
+        """Renumber live files and drop tombstones from the postings"""
+        new_ids = {}
+        paths = []
+        for file_id, file_path in enumerate(self.paths):
+            if file_path is not None:
+                new_ids[file_id] = len(paths)
+                paths.append(file_path)
+        for trigram, posting in list(self.postings.items()):
+            posting = array.array('I', (new_ids[file_id] for file_id in posting if file_id in new_ids))
+            if posting:
+                self.postings[trigram] = posting
+            else:
+                del self.postings[trigram]
+        self.files = {path: (new_ids[entry[0]],) + entry[1:] for path, entry in self.files.items()}
+        self.paths = paths
+    
+    def load(self):
+        """Read the persisted index; False if missing, unreadable or for another folder"""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                header = json.loads(f.readline())
+                flat = array.array('I')
+                flat.frombytes(f.read())
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Error loading search index: {e}")
+            return False
+        if header.get('version') != self.VERSION or header.get('root') != self.root:
+            return False
+        if header.get('byteorder') != sys.byteorder:
+            flat.byteswap()
+        paths = [None] * header['id_count']
+        files = {}
+        for file_path, file_id, mtime_ns, size in header['files']:
+            paths[file_id] = file_path
+            files[file_path] = (file_id, mtime_ns, size)
+        postings = {}
+        position = 0
+        while position + 1 < len(flat):
+            count = flat[position + 1]
+            postings[flat[position]] = flat[position + 2:position + 2 + count]
+            position += 2 + count
+        with self.lock:
+            self.paths, self.files, self.postings = paths, files, postings
+            self.ready = True
+            self.dirty = False
+        return True
+    
+    def save(self):
+        """Persist the index as a JSON header line followed by the flattened postings"""
+        with self.lock:
+            if not self.dirty:
+                return
+            if self.paths.count(None) > len(self.paths) // 4:
+                self.compact_locked()
+            header = {
+                'version': self.VERSION,
+                'root': self.root,
+                'byteorder': sys.byteorder,
+                'id_count': len(self.paths),
+                'files': [[path, entry[0], entry[1], entry[2]] for path, entry in self.files.items()],
+            }
+            flat = array.array('I')
+            for trigram, posting in self.postings.items():
+                flat.append(trigram)
+                flat.append(len(posting))
+                flat.extend(posting)
+            self.dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            write_file_atomically(self.cache_file, json.dumps(header).encode('utf-8') + b'\n' + flat.tobytes())
+        except OSError as e:
+            print(f"Error saving search index: {e}")
+
+
+class TrigramIndexBuilder(ProcessPoolWorker):
+    """
+    Brings a TrigramIndex up to date in the background: loads the persisted
+    copy, then re-indexes files whose size or mtime changed and drops
+    files that are gone. With file_paths only those files are refreshed.
+    """
+    
+    progress = QtCore.pyqtSignal(int)  # files indexed so far
+    
+    def __init__(self, executor, index, max_size, file_paths=None, parent=None):
+        super().__init__(executor, parent)
+        self.index = index
+        self.max_size = max_size
+        self.file_paths = file_paths
+        self.indexed = 0
+    
+    def run(self):
+        if not self.index.ready and self.file_paths is None:
+            self.index.load()
+        seen = set()
+        
+        def changed_files(file_paths):
+            for file_path in file_paths:
+                seen.add(file_path)
+                if not self.index.is_current(file_path):
+                    yield file_path
+        
+        file_paths = self.file_paths if self.file_paths is not None else iter_project_files(self.index.root)
+        self.run_batches(changed_files(file_paths),
+                         index_files_in_process, self.max_size)
+        if self.file_paths is None and not self.cancelled:
+            for file_path in self.index.known_paths() - seen:
+                self.index.remove(file_path)
+            self.index.ready = True
+        self.index.save()
+    
+    def deliver(self, results):
+        for file_path, mtime_ns, size, trigrams in results:
+            if mtime_ns is None:
+                self.index.remove(file_path)
+            else:
+                self.index.add(file_path, mtime_ns, size, trigrams)
+                self.indexed += 1
+        self.progress.emit(self.indexed)
+
+
+def substitute_matches(pattern, replacement, text):
+    """pattern.subn that, like the search results, leaves empty matches alone"""
+    count = 0
+    
+    def expand(match):
+        nonlocal count
+        if match.start() == match.end():
+            return ''
+        count += 1
+        return match.expand(replacement)
+    
+    return pattern.sub(expand, text), count
+
+
+def substitute_matches_keeping_endings(pattern, replacement, raw):
+    """
+    substitute_matches over raw text with '\r\n' line endings: the pattern
+    sees '\n' line breaks, as in the search, but every line keeps its own
+    ending; newlines in a replacement take the ending of the line it lands on.
+    """
+    # Positions (in the normalized text) of the line breaks that were '\r\n'
+    crlf = [match.start() - number for number, match in enumerate(re.finditer('\r\n', raw))]
+    if not crlf:
+        return substitute_matches(pattern, replacement, raw)
+    text = raw.replace('\r\n', '\n')
+    
+    def raw_offset(offset):
+        return offset + bisect.bisect_left(crlf, offset)
+    
+    pieces = []
+    last = 0
+    count = 0
+    for match in pattern.finditer(text):
+        if match.start() == match.end():
+            continue
+        new_text = match.expand(replacement)
+        if '\n' in new_text:
+            line_break = text.find('\n', match.start())
+            index = bisect.bisect_left(crlf, line_break)
+            if line_break >= 0 and index < len(crlf) and crlf[index] == line_break:
+                new_text = new_text.replace('\n', '\r\n')
+        pieces.append(raw[raw_offset(last):raw_offset(match.start())])
+        pieces.append(new_text)
+        last = match.end()
+        count += 1
+    pieces.append(raw[raw_offset(last):])
+    return ''.join(pieces), count
+
+
+def replace_in_file(file_path, pattern, replacement, expected, undo_directory):
+    """
+    Apply a previewed replacement to one file and write it atomically.
+    The original bytes are kept in undo_directory; returns (count, (backup
+    path, digest of the new contents)). The BOM and each line's ending
+    survive the edit; files that are not valid UTF-8 are refused.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    bom = data.startswith(b'\xef\xbb\xbf')
+    text = data[3 if bom else 0:].decode('utf-8')
+    new_text, count = substitute_matches_keeping_endings(pattern, replacement, text)
+    if min(count, PROJECT_SEARCH_MAX_HITS_PER_FILE) != expected:
+        raise ValueError("file changed since the preview")
+    new_data = (b'\xef\xbb\xbf' if bom else b'') + new_text.encode('utf-8')
+    backup_path = os.path.join(undo_directory, hashlib.sha1(file_path.encode('utf-8')).hexdigest() + '.orig')
+    with open(backup_path, 'wb') as f:
+        f.write(data)
+    write_file_atomically(file_path, new_data)
+    return count, (backup_path, hashlib.sha256(new_data).hexdigest())
+
+
+def replace_files_in_process(jobs, pattern, replacement, undo_directory):
+    """Process pool entry point: (path, count, undo record, error) per (path, expected count) job"""
+    results = []
+    for file_path, expected in jobs:
+        try:
+            count, undo = replace_in_file(file_path, pattern, replacement, expected, undo_directory)
+            results.append((file_path, count, undo, None))
+        except (OSError, ValueError) as e:
+            results.append((file_path, 0, None, str(e)))
+    return results
+
+
+def restore_files_in_process(jobs):
+    """Process pool entry point: put back originals of (path, backup, digest) jobs unless edited since"""
+    results = []
+    for file_path, backup_path, digest in jobs:
+        try:
+            with open(file_path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() != digest:
+                    raise ValueError("file modified after the replace")
+            with open(backup_path, 'rb') as f:
+                write_file_atomically(file_path, f.read())
+            results.append((file_path, None))
+        except (OSError, ValueError) as e:
+            results.append((file_path, str(e)))
+    return results
+
+
+class FileBatchWorker(ProcessPoolWorker):
+    """Runs a file operation over a list of jobs in the process pool and gathers the results"""
+    
+    progress = QtCore.pyqtSignal(int)
+    
+    BATCH_SIZE = 16
+    
+    def __init__(self, executor, jobs, function, args=(), parent=None):
+        super().__init__(executor, parent)
+        self.jobs = jobs
+        self.function = function
+        self.args = args
+        self.results = []
+    
+    def run(self):
+        self.run_batches(self.jobs, self.function, *self.args)
+    
+    def deliver(self, results):
+        self.results.extend(results)
+        self.progress.emit(len(self.results))
+
+
+class SearchResultFile:
+    """A file row of the results tree with its hits as children"""
+    
+    __slots__ = ('row', 'file_path', 'hits', 'checked')
+    
+    def __init__(self, row, file_path, hits):
+        self.row = row
+        self.file_path = file_path
+        self.hits = hits
+        self.checked = True
+
+
+class SearchResultsModel(QtCore.QAbstractItemModel):
+    """
+    File -> hit tree that grows as result batches arrive.
+    Hits stay as plain tuples and rows are only built when the view asks for
+    them, so with uniform row heights huge result sets scroll smoothly.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = ""
+        self.files = []
+        self.hit_count = 0
+        self.checkable = False  # Files can be unticked in a replace preview
+    
+    def reset(self, root, checkable=False):
+        self.beginResetModel()
+        self.root = root
+        self.files = []
+        self.hit_count = 0
+        self.checkable = checkable
+        self.endResetModel()
+    
+    def checked_files(self):
+        return [result_file for result_file in self.files if result_file.checked]
+    
+    def flags(self, index):
+        flags = super().flags(index)
+        if self.checkable and index.isValid() and index.internalPointer() is None:
+            flags |= QtCore.Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+    
+    def setData(self, index, value, role=QtCore.Qt.ItemDataRole.EditRole):
+        if role != QtCore.Qt.ItemDataRole.CheckStateRole or not index.isValid() or index.internalPointer() is not None:
+            return False
+        self.files[index.row()].checked = QtCore.Qt.CheckState(value) == QtCore.Qt.CheckState.Checked
+        self.dataChanged.emit(index, index, [role])
+        return True
+    
+    def add_results(self, results):
+        if not results:
+            return
+        first = len(self.files)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(results) - 1)
+        for file_path, hits in results:
+            self.files.append(SearchResultFile(len(self.files), file_path, hits))
+            self.hit_count += len(hits)
+        self.endInsertRows()
+    
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        if parent.isValid():
+            return self.createIndex(row, column, self.files[parent.row()])
+        return self.createIndex(row, column, None)
+    
+    def parent(self, index):
+        if not index.isValid() or index.internalPointer() is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(index.internalPointer().row, 0, None)
+    
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self.files)
+        if parent.internalPointer() is None:
+            return len(self.files[parent.row()].hits)
+        return 0
+    
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+    
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        result_file = index.internalPointer()
+        if result_file is None:
+            result_file = self.files[index.row()]
+            if role == QtCore.Qt.ItemDataRole.DisplayRole:
+                return f"{os.path.relpath(result_file.file_path, self.root)}  ({len(result_file.hits)})"
+            if role == QtCore.Qt.ItemDataRole.ToolTipRole:
+                return result_file.file_path
+            if role == QtCore.Qt.ItemDataRole.CheckStateRole and self.checkable:
+                return QtCore.Qt.CheckState.Checked if result_file.checked else QtCore.Qt.CheckState.Unchecked
+            return None
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            line, column, length, text = result_file.hits[index.row()]
+            return f"{line + 1}: {text.strip()}"
+        return None
+    
+    def location(self, index):
+        """(file path, line, column, length) for a hit row, or None"""
+        if not index.isValid() or index.internalPointer() is None:
+            return None
+        result_file = index.internalPointer()
+        line, column, length, _ = result_file.hits[index.row()]
+        return result_file.file_path, line, column, length
+
+
+class ProjectSearchPanel(QtWidgets.QDockWidget):
+    """Find in Files over the Project Explorer folder"""
+    
+    def __init__(self, parent=None):
+        super().__init__("Find in Files", parent)
+        self.setObjectName("ProjectSearchPanel")
+        self.parent_window = parent
+        self.worker = None
+        self.pool = None
+        self.started_at = 0
+        self.index = None
+        self.index_builder = None
+        self.index_queue = None  # Files to refresh after the running build; empty set for a full refresh
+        self.index_refreshed_at = 0
+        self.replace_preview = None  # (pattern, replacement) while a preview is shown
+        self.replace_batch = None  # Undo record of the last applied replace
+        self.file_worker = None
+        
+        widget = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout(widget)
+        
+        query_layout = QtWidgets.QHBoxLayout()
+        self.query_edit = QtWidgets.QLineEdit()
+        self.query_edit.setPlaceholderText("Search in project")
+        self.include_edit = QtWidgets.QLineEdit()
+        self.include_edit.setPlaceholderText("Files to include, e.g. *.py, *.md")
+        self.search_btn = QtWidgets.QPushButton("Search")
+        self.stop_btn = QtWidgets.QPushButton("Stop")
+        self.stop_btn.setEnabled(False)
+        query_layout.addWidget(self.query_edit, 2)
+        query_layout.addWidget(self.include_edit, 1)
+        query_layout.addWidget(self.search_btn)
+        query_layout.addWidget(self.stop_btn)
+        layout.addLayout(query_layout)
+        
+        replace_layout = QtWidgets.QHBoxLayout()
+        self.replace_edit = QtWidgets.QLineEdit()
+        self.replace_edit.setPlaceholderText("Replace with")
+        self.preview_replace_btn = QtWidgets.QPushButton("Preview Replace")
+        self.apply_replace_btn = QtWidgets.QPushButton("Apply")
+        self.apply_replace_btn.setEnabled(False)
+        self.undo_replace_btn = QtWidgets.QPushButton("Undo Replace")
+        self.undo_replace_btn.setEnabled(False)
+        replace_layout.addWidget(self.replace_edit, 3)
+        replace_layout.addWidget(self.preview_replace_btn)
+        replace_layout.addWidget(self.apply_replace_btn)
+        replace_layout.addWidget(self.undo_replace_btn)
+        layout.addLayout(replace_layout)
+        
+        options_layout = QtWidgets.QHBoxLayout()
+        self.case_sensitive_cb = QtWidgets.QCheckBox("Case sensitive")
+        self.whole_words_cb = QtWidgets.QCheckBox("Whole words")
+        self.regex_cb = QtWidgets.QCheckBox("Regular expression")
+        self.structural_cb = QtWidgets.QCheckBox("Structural")
+        self.structural_cb.setToolTip(
+            "Match Python code by syntax tree, e.g. open(..., encoding=$absent) or except: pass\n"
+            "$name matches any node, ... any expression or run of arguments/statements, \\n separates lines")
+        options_layout.addWidget(self.case_sensitive_cb)
+        options_layout.addWidget(self.whole_words_cb)
+        options_layout.addWidget(self.regex_cb)
+        options_layout.addWidget(self.structural_cb)
+        options_layout.addStretch()
+        self.index_label = QtWidgets.QLabel("")
+        self.status_label = QtWidgets.QLabel("")
+        options_layout.addWidget(self.index_label)
+        options_layout.addWidget(self.status_label)
+        layout.addLayout(options_layout)
+        
+        self.results_model = SearchResultsModel(self)
+        self.results_view = QtWidgets.QTreeView()
+        self.results_view.setModel(self.results_model)
+        self.results_view.setHeaderHidden(True)
+        self.results_view.setUniformRowHeights(True)
+        layout.addWidget(self.results_view)
+        self.setWidget(widget)
+        
+        self.query_edit.returnPressed.connect(self.start_search)
+        self.include_edit.returnPressed.connect(self.start_search)
+        self.search_btn.clicked.connect(self.start_search)
+        self.stop_btn.clicked.connect(self.stop_search)
+        self.preview_replace_btn.clicked.connect(self.preview_replace)
+        self.apply_replace_btn.clicked.connect(self.apply_replace)
+        self.undo_replace_btn.clicked.connect(self.undo_replace)
+        self.results_view.clicked.connect(self.open_result)
+        self.results_view.activated.connect(self.open_result)
+        
+        self.parent_window.settings_manager.add_observer(self.on_settings_changed)
+        self.on_settings_changed(self.parent_window.settings_manager.settings)
+    
+    def on_settings_changed(self, settings):
+        if settings.get("advanced", {}).get("project_index", False):
+            if self.index is None or self.index.root != self.project_root():
+                self.set_project_root(self.project_root())
+        elif self.index is not None:
+            self.stop_indexing()
+            self.index = None
+            self.index_label.setText("")
+    
+    def max_file_size(self):
+        return self.parent_window.settings_manager.get("advanced", "search_max_file_mb", 8) * 1024 * 1024
+    
+    def set_project_root(self, root):
+        """Switch the trigram index to another folder, if indexing is enabled"""
+        if not self.parent_window.settings_manager.get("advanced", "project_index", False):
+            return
+        root = os.path.abspath(root)
+        if self.index is not None and self.index.root == root:
+            return
+        self.stop_indexing()
+        digest = hashlib.sha1(root.encode('utf-8')).hexdigest()[:16]
+        cache_file = os.path.join(self.parent_window.settings_manager.config_dir, "search_index", f"{digest}.idx")
+        self.index = TrigramIndex(root, cache_file)
+        self.refresh_index()
+    
+    def refresh_index(self, file_paths=None):
+        """Re-index changed files in the background (all of them without file_paths)"""
+        if self.index is None:
+            return
+        if file_paths is not None:
+            prefix = self.index.root + os.sep
+            file_paths = {os.path.abspath(path) for path in file_paths}
+            file_paths = {path for path in file_paths if path.startswith(prefix)}
+            if not file_paths:
+                return
+        if self.index_builder is not None:
+            # One build at a time; a full refresh absorbs any queued files
+            if file_paths is None or self.index_queue == set():
+                self.index_queue = set()
+            else:
+                self.index_queue = (self.index_queue or set()) | file_paths
+            return
+        if file_paths is None:
+            self.index_refreshed_at = time.monotonic()
+        self.index_builder = TrigramIndexBuilder(self.executor(), self.index, self.max_file_size(),
+                                                 sorted(file_paths) if file_paths is not None else None, self)
+        self.index_builder.progress.connect(self.on_index_progress)
+        self.index_builder.finished.connect(self.on_index_finished)
+        self.index_builder.start()
+    
+    def on_index_progress(self, indexed):
+        self.index_label.setText(f"Indexing: {indexed} files")
+    
+    def on_index_finished(self):
+        builder, self.index_builder = self.index_builder, None
+        if builder is not None:
+            builder.deleteLater()
+        self.index_label.setText("Index ready" if self.index is not None and self.index.ready else "")
+        queued, self.index_queue = self.index_queue, None
+        if queued is not None:
+            self.refresh_index(queued or None)
+    
+    def stop_indexing(self):
+        self.index_queue = None
+        if self.index_builder is not None:
+            self.index_builder.cancel()
+            self.index_builder.wait()
+            self.index_builder.deleteLater()
+            self.index_builder = None
+    
+    def executor(self):
+        """
+        Shared process pool, started on first use and kept for the session.
+        Spawned workers import this whole module (PyQt6, anthropic and the
+        speech modules included), which costs about a second per worker once;
+        reusing the pool keeps that out of every later search.
+        """
+        if self.pool is None:
+            self.pool = concurrent.futures.ProcessPoolExecutor(
+                max(1, (os.cpu_count() or 2) - 1), mp_context=multiprocessing.get_context('spawn'))
+        return self.pool
+    
+    def project_root(self):
+        explorer = getattr(self.parent_window, 'project_explorer', None)
+        root = explorer.file_model.rootPath() if explorer is not None else ""
+        return os.path.abspath(root or QtCore.QDir.homePath())
+    
+    def search_pattern(self):
+        """Compiled pattern for the current query; warns and returns None if invalid"""
+        query = self.query_edit.text()
+        if not query:
+            return None
+        try:
+            return build_search_pattern(query, self.case_sensitive_cb.isChecked(),
+                                        self.whole_words_cb.isChecked(), self.regex_cb.isChecked())
+        except re.error as e:
+            QtWidgets.QMessageBox.warning(self, "Regex Error", f"Invalid regular expression: {e}")
+            return None
+    
+    def start_search(self):
+        if self.structural_cb.isChecked():
+            self.run_structural_search()
+            return
+        pattern = self.search_pattern()
+        if pattern is None:
+            return
+        self.run_search(pattern)
+    
+    def run_structural_search(self):
+        query = self.query_edit.text()
+        if not query.strip():
+            return
+        try:
+            structural = StructuralPattern(query)
+        except (SyntaxError, ValueError) as e:
+            QtWidgets.QMessageBox.warning(self, "Pattern Error", f"Invalid structural pattern: {e}")
+            return
+        self.run_search(None, structural=structural)
+    
+    def run_search(self, pattern, replacement=None, structural=None):
+        self.stop_search()
+        root = self.project_root()
+        self.replace_preview = (pattern, replacement) if replacement is not None else None
+        self.apply_replace_btn.setEnabled(False)
+        self.results_model.reset(root, checkable=replacement is not None)
+        index = self.index if self.index is not None and self.index.root == root else None
+        include = include_filter(self.include_edit.text())
+        if structural is not None:
+            self.worker = StructuralSearchWorker(self.executor(), root, structural, include, self.max_file_size(),
+                                                 self.parent_window.open_buffer_texts(), index, self)
+        else:
+            self.worker = ProjectSearchWorker(self.executor(), root, pattern, include, self.max_file_size(),
+                                              self.parent_window.open_buffer_texts(), index, replacement, self)
+        self.start_worker(self.worker)
+        # Searching already covers files changed since indexing; catch up the index quietly
+        if index is not None and time.monotonic() - self.index_refreshed_at > 60:
+            self.refresh_index()
+    
+    def start_worker(self, worker):
+        worker.results_ready.connect(self.on_results_ready)
+        worker.progress.connect(self.on_progress)
+        worker.search_done.connect(self.on_search_done)
+        self.started_at = time.perf_counter()
+        self.search_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.status_label.setText("Searching...")
+        worker.start()
+    
+    def stop_search(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
+            self.worker.deleteLater()
+            self.worker = None
+        self.search_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+    
+    def on_results_ready(self, worker, results):
+        if worker is self.worker:
+            self.results_model.add_results(results)
+    
+    def on_progress(self, worker, searched, matched, skipped):
+        if worker is not self.worker:
+            return
+        text = f"{self.results_model.hit_count} matches in {matched} files, {searched} searched"
+        if skipped:
+            text += f", {skipped} skipped"
+        self.status_label.setText(text)
+    
+    def on_search_done(self, worker, cancelled):
+        if worker is not self.worker:
+            return
+        elapsed = time.perf_counter() - self.started_at
+        self.on_progress(worker, worker.searched, worker.matched, worker.skipped)
+        self.status_label.setText(self.status_label.text() + (" (stopped)" if cancelled else f" in {elapsed:.2f}s"))
+        self.worker = None
+        worker.deleteLater()
+        self.search_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        if self.replace_preview is not None and not cancelled and self.results_model.files:
+            self.apply_replace_btn.setEnabled(self.file_worker is None)
+    
+    def preview_replace(self):
+        """Search with the replacement and show each change, grouped by file, before applying"""
+        if self.structural_cb.isChecked():
+            QtWidgets.QMessageBox.information(self, "Replace in Files", "Replace is not available for structural search.")
+            return
+        pattern = self.search_pattern()
+        if pattern is None:
+            return
+        replacement = self.replace_edit.text()
+        try:
+            pattern.sub(replacement, "")
+        except re.error as e:
+            QtWidgets.QMessageBox.warning(self, "Regex Error", f"Invalid replacement: {e}")
+            return
+        self.run_search(pattern, replacement)
+    
+    def apply_replace(self):
+        """
+        Apply the previewed replace to the ticked files. Files open in a tab
+        are edited in their buffer as one edit block, others are rewritten
+        atomically in the process pool with their originals kept for undo.
+        """
+        if self.replace_preview is None or self.worker is not None or self.file_worker is not None:
+            return
+        pattern, replacement = self.replace_preview
+        result_files = self.results_model.checked_files()
+        total = sum(len(result_file.hits) for result_file in result_files)
+        if not result_files or QtWidgets.QMessageBox.question(
+                self, "Replace in Files", f"Replace {total} matches in {len(result_files)} files?") != QtWidgets.QMessageBox.StandardButton.Yes:
+            return
+        
+        self.discard_replace_batch()
+        batch = {'undo_directory': tempfile.mkdtemp(prefix="pythonico-replace-"),
+                 'files': [], 'buffers': [], 'errors': [], 'count': 0}
+        jobs = []
+        for result_file in result_files:
+            index = self.parent_window.find_tab_for_path(result_file.file_path)
+            editor = self.parent_window.editors.get(index) if index >= 0 else None
+            if editor is not None:
+                self.replace_in_buffer(editor, result_file, pattern, replacement, batch)
+            elif index >= 0:
+                batch['errors'].append((result_file.file_path, "open in a read-only viewer"))
+            else:
+                jobs.append((result_file.file_path, len(result_file.hits)))
+        
+        self.replace_batch = batch
+        self.replace_preview = None
+        self.apply_replace_btn.setEnabled(False)
+        self.results_model.reset(self.results_model.root)
+        self.run_file_jobs(jobs, replace_files_in_process, (pattern, replacement, batch['undo_directory']),
+                           self.on_replace_applied)
+    
+    def replace_in_buffer(self, editor, result_file, pattern, replacement, batch):
+        if editor.isReadOnly():
+            batch['errors'].append((result_file.file_path, "buffer is read-only"))
+            return
+        text = editor.toPlainText()
+        edits = [(match.start(), match.end(), match.expand(replacement))
+                 for match in pattern.finditer(text) if match.end() > match.start()]
+        if min(len(edits), PROJECT_SEARCH_MAX_HITS_PER_FILE) != len(result_file.hits):
+            batch['errors'].append((result_file.file_path, "buffer changed since the preview"))
+            return
+        # Offsets are code points into text; the helper maps them to document positions
+        replace_spans_in_document(editor.document(), edits, text)
+        batch['buffers'].append((editor, editor.document().availableUndoSteps()))
+        batch['count'] += len(edits)
+    
+    def run_file_jobs(self, jobs, function, args, on_done):
+        self.file_worker = FileBatchWorker(self.executor(), jobs, function, args, self)
+        self.file_worker.progress.connect(lambda done, total=len(jobs): self.status_label.setText(f"Processed {done} of {total} files"))
+        self.file_worker.finished.connect(on_done)
+        self.preview_replace_btn.setEnabled(False)
+        self.undo_replace_btn.setEnabled(False)
+        self.file_worker.start()
+    
+    def finish_file_jobs(self):
+        worker, self.file_worker = self.file_worker, None
+        self.preview_replace_btn.setEnabled(True)
+        worker.deleteLater()
+        return worker.results
+    
+    def on_replace_applied(self):
+        batch = self.replace_batch
+        written = []
+        for file_path, count, undo, error in self.finish_file_jobs():
+            if error:
+                batch['errors'].append((file_path, error))
+            else:
+                batch['files'].append((file_path,) + undo)
+                batch['count'] += count
+                written.append(file_path)
+        self.refresh_index(written)
+        changed = len(batch['files']) + len(batch['buffers'])
+        self.status_label.setText(f"Replaced {batch['count']} matches in {changed} files")
+        self.undo_replace_btn.setEnabled(changed > 0)
+        self.report_file_errors("Replace in Files", batch['errors'])
+    
+    def undo_replace(self):
+        """Revert the last project replace, skipping files edited since"""
+        batch = self.replace_batch
+        if batch is None or self.file_worker is not None:
+            return
+        batch['errors'] = []
+        for editor, undo_steps in batch['buffers']:
+            try:
+                document = editor.document()
+                file_path = editor.property("file_path")
+            except RuntimeError:
+                continue  # Tab closed since
+            if document.availableUndoSteps() == undo_steps:
+                document.undo()
+            else:
+                batch['errors'].append((file_path, "buffer edited after the replace"))
+        self.run_file_jobs(batch['files'], restore_files_in_process, (), self.on_replace_undone)
+    
+    def on_replace_undone(self):
+        batch = self.replace_batch
+        restored = []
+        for file_path, error in self.finish_file_jobs():
+            if error:
+                batch['errors'].append((file_path, error))
+            else:
+                restored.append(file_path)
+        self.refresh_index(restored)
+        self.status_label.setText(f"Undid replace in {len(restored) + len(batch['buffers'])} files")
+        self.report_file_errors("Undo Replace", batch['errors'])
+        self.discard_replace_batch()
+    
+    def report_file_errors(self, title, errors):
+        if not errors:
+            return
+        lines = [f"{os.path.relpath(file_path, self.project_root()) if file_path else 'Untitled'}: {error}"
+                 for file_path, error in errors[:20]]
+        if len(errors) > 20:
+            lines.append(f"... and {len(errors) - 20} more")
+        QtWidgets.QMessageBox.warning(self, title, "Some files were skipped:\n" + "\n".join(lines))
+    
+    def discard_replace_batch(self):
+        """Forget the undo record of the last replace and delete its backups"""
+        batch, self.replace_batch = self.replace_batch, None
+        self.undo_replace_btn.setEnabled(False)
+        if batch is None:
+            return
+        try:
+            for name in os.listdir(batch['undo_directory']):
+                os.remove(os.path.join(batch['undo_directory'], name))
+            os.rmdir(batch['undo_directory'])
+        except OSError as e:
+            print(f"Error removing replace backups: {e}")
+    
+    def open_result(self, index):
+        location = self.results_model.location(index)
+        if location is not None:
+            self.parent_window.reveal_location(*location)
+    
+    def shutdown(self):
+        self.stop_search()
+        self.stop_indexing()
+        if self.file_worker is not None:
+            self.file_worker.wait()
+        self.discard_replace_batch()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+
 class AboutLicenseDialog(QtWidgets.QDialog):
     def __init__(self):
         super().__init__()
@@ -5470,7 +10703,92 @@ class AboutDialog(QtWidgets.QDialog):
 
         self.setLayout(layout)
 
+class EditorSession:
+    """
+    Everything belonging to one tab: the page widget, its editor and split
+    panes, and the per-tab helpers attached to them. The session hangs off
+    the page (and each pane), so it follows the tab wherever it is moved.
+    """
+    
+    def __init__(self, page, editor=None, highlighter=None, filter=None, completer=None, splitter=None, viewer=None):
+        self.page = page
+        self.editor = editor
+        self.highlighter = highlighter
+        self.filter = filter
+        self.completer = completer
+        self.splitter = splitter
+        self.viewer = viewer
+        self.split_editors = []  # Extra panes viewing the editor's document
+        self.tailer = None  # FileTailer while in follow mode
+        page.editor_session = self
+        if editor is not None:
+            self.attach_pane(editor)
+    
+    def attach_pane(self, editor):
+        editor.editor_session = self
+    
+    @staticmethod
+    def of(widget):
+        """The session owning widget, looked up through its parents"""
+        while widget is not None:
+            session = getattr(widget, 'editor_session', None)
+            if session is not None:
+                return session
+            widget = widget.parentWidget()
+        return None
+    
+    def close(self, window):
+        """Release everything the tab holds once it has left the tab widget"""
+        if self.tailer is not None:
+            self.tailer.stop()
+            self.tailer = None
+        if self.viewer is not None:
+            self.viewer.close_file()
+        if self.editor is not None:
+            window.cancel_streaming_load(self.editor)
+            window.word_index.release(self.editor.document())
+            window.edit_journal.detach(self.editor)
+            window.external_watcher.unwatch(self.editor)
+        self.split_editors = []
+        self.page.editor_session = None
+        self.page.deleteLater()
+
+
+class TabSessionView(collections.abc.Mapping):
+    """Read-only tab index -> session attribute mapping over the tab widget's pages"""
+    
+    def __init__(self, window, attribute):
+        self.window = window
+        self.attribute = attribute
+    
+    def __getitem__(self, index):
+        session = self.window.session_at(index) if isinstance(index, int) else None
+        value = getattr(session, self.attribute, None)
+        if value is None or (isinstance(value, list) and not value):
+            raise KeyError(index)
+        return value
+    
+    def __iter__(self):
+        for index in range(self.window.tab_widget.count()):
+            if index in self:
+                yield index
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+    
+    def __contains__(self, index):
+        try:
+            self[index]
+        except KeyError:
+            return False
+        return True
+
+
 class Pythonico(QtWidgets.QMainWindow):
+    STREAMING_LOAD_THRESHOLD = 8 * 1024 * 1024  # Larger files are streamed in chunks
+    LARGE_FILE_VIEWER_THRESHOLD = 128 * 1024 * 1024  # Larger files open in the mmap viewer
+    STRUCTURED_VIEWER_THRESHOLD = 8 * 1024 * 1024  # Larger JSON/NDJSON files open in the tree viewer
+    
     def __init__(self):
         super().__init__()
         
@@ -5478,14 +10796,49 @@ class Pythonico(QtWidgets.QMainWindow):
         self.settings_manager = SettingsManager()
         self.settings_manager.add_observer(self.on_settings_changed)
         
+        # Completion usage statistics shared by all completers
+        self.completion_frecency = CompletionFrecency(self.settings_manager.config_dir)
+        self.completion_profiler = CompletionProfiler()
+        
+        # Word index over all open documents, shared by the completers
+        self.word_index = SharedWordIndex(self)
+        
+        # Signature help on '(' backed by cached buffer/stub/introspection lookups
+        self.signature_resolver = SignatureResolver(self.settings_manager.config_dir)
+        self.signature_help = SignatureHelp(self.signature_resolver, self)
+        
+        # Files are read and decoded once, in parallel, off the GUI thread
+        self.file_open_pipeline = FileOpenPipeline(self)
+        self.file_open_pipeline.document_ready.connect(self.on_file_document_ready)
+        self.file_open_pipeline.load_failed.connect(self.on_file_load_failed)
+        self.streaming_loaders = []
+        
+        # Saves are written atomically on worker threads
+        self.save_engine = FileSaveEngine(self)
+        self.save_engine.save_finished.connect(self.on_save_finished)
+        self.auto_save_manager = AutoSaveManager(self, self.save_engine, self.settings_manager)
+        
+        # Journal of unsaved edits for crash recovery
+        self.edit_journal = EditJournal(self.settings_manager.config_dir, self)
+        
+        # Reload files rewritten by other programs
+        self.external_watcher = ExternalChangeWatcher(self, self.save_engine)
+        
+        # Match offsets for Find Next/Previous, kept current across edits
+        self.match_index_cache = MatchIndexCache()
+        
+        # Lines to reveal once a file being opened in the background arrives
+        self.pending_locations = {}
+        
         # Initialize dictionaries at the class level
-        self.editors = {}
-        self.highlighters = {}
-        self.filters = {}
-        self.completers = {}
-        self.splitters = {}
-        self.split_editors = {}  # Store split editors
-        self.split_highlighters = {}  # Store split editor highlighters
+        # Each tab page carries an EditorSession; these are tab index views over them
+        self.editors = TabSessionView(self, 'editor')
+        self.highlighters = TabSessionView(self, 'highlighter')
+        self.filters = TabSessionView(self, 'filter')
+        self.completers = TabSessionView(self, 'completer')
+        self.splitters = TabSessionView(self, 'splitter')
+        self.split_editors = TabSessionView(self, 'split_editors')  # Extra panes viewing the tab's document
+        self.viewers = TabSessionView(self, 'viewer')  # Read-only viewer pages (large files)
 
         self.current_file = None
         self.tab_widget = QtWidgets.QTabWidget()
@@ -5494,6 +10847,9 @@ class Pythonico(QtWidgets.QMainWindow):
         
         self.initUI()
         
+        # Offer to restore buffers left behind by a crash
+        QtCore.QTimer.singleShot(0, self.recover_unsaved_buffers)
+        
     def closeEvent(self, event):
         # Properly terminate all AI worker threads
         for i in range(self.tab_widget.count()):
@@ -5546,6 +10902,7 @@ class Pythonico(QtWidgets.QMainWindow):
         
         # If selected tab then change to its title and filename
         self.tab_widget.currentChanged.connect(self.update_current_file)
+        self.tab_widget.currentChanged.connect(self.update_follow_action)
 
         # Create the plain text editor and related components
         self.editor = QtWidgets.QPlainTextEdit()
@@ -5557,6 +10914,9 @@ class Pythonico(QtWidgets.QMainWindow):
         
         # Create bottom code completer
         self.bottom_completer = BottomCodeCompleter()
+        self.bottom_completer.frecency = self.completion_frecency
+        self.bottom_completer.profiler = self.completion_profiler
+        self.bottom_completer.word_index = self.word_index
         self.bottom_completer.set_editor(self.editor)
         
         # Apply editor settings to completer
@@ -5627,20 +10987,17 @@ class Pythonico(QtWidgets.QMainWindow):
         # with the text editor's document
         self.highlighter = AdvancedPythonSyntaxHighlighter(self.editor.document())
 
-        # Add the editor widget to a new tab
-        tab_index = self.tab_widget.addTab(tab_widget, tab_name)
-        
-        self.editors[tab_index] = self.editor
-        self.highlighters[tab_index] = self.highlighter
-        
         auto_indent_filter = AutoIndentFilter(self.editor)
-        self.filters[tab_index] = auto_indent_filter
         self.editor.installEventFilter(auto_indent_filter)
-
-        self.completers[tab_index] = self.bottom_completer
         
-        # Store the splitter for split view functionality
-        self.splitters[tab_index] = editor_splitter
+        # The session owns the tab's editor, helpers and the splitter for split views
+        EditorSession(tab_widget, self.editor, self.highlighter, auto_indent_filter,
+                      self.bottom_completer, editor_splitter)
+        self.word_index.acquire(self.editor.document())
+        self.edit_journal.attach(self.editor)
+
+        # Add the editor widget to a new tab
+        self.tab_widget.addTab(tab_widget, tab_name)
 
         main_splitter.addWidget(self.tab_widget)
 
@@ -5675,6 +11032,11 @@ class Pythonico(QtWidgets.QMainWindow):
             QtWidgets.QDockWidget.DockWidgetFeature.DockWidgetClosable | 
             QtWidgets.QDockWidget.DockWidgetFeature.DockWidgetMovable
         )
+        
+        # Find in Files results dock, shown on demand
+        self.project_search = ProjectSearchPanel(self)
+        self.addDockWidget(QtCore.Qt.DockWidgetArea.BottomDockWidgetArea, self.project_search)
+        self.project_search.hide()
 
         # Create an Advanced Python Syntax Highlighter with Tokyo Night theme
         # with the text editor's document
@@ -5846,6 +11208,11 @@ class Pythonico(QtWidgets.QMainWindow):
         find_previous_action.triggered.connect(self.find_previous)
         find_menu.addAction(find_previous_action)
 
+        find_in_files_action = QtGui.QAction("Find in Files", self)
+        find_in_files_action.setShortcut(QtGui.QKeySequence("Ctrl+Shift+G"))
+        find_in_files_action.triggered.connect(self.show_project_search)
+        find_menu.addAction(find_in_files_action)
+
         # Add a separator
         find_menu.addSeparator()
 
@@ -5889,6 +11256,17 @@ class Pythonico(QtWidgets.QMainWindow):
         close_split_action.setShortcut(QtGui.QKeySequence("Ctrl+Shift+W"))
         close_split_action.triggered.connect(self.close_split)
         view_menu.addAction(close_split_action)
+        
+        view_menu.addSeparator()
+        
+        self.follow_file_action = QtGui.QAction("Follow File (Tail)", self)
+        self.follow_file_action.setCheckable(True)
+        self.follow_file_action.triggered.connect(self.toggle_follow_mode)
+        view_menu.addAction(self.follow_file_action)
+        
+        completion_diagnostics_action = QtGui.QAction("Completion Diagnostics", self)
+        completion_diagnostics_action.triggered.connect(self.show_completion_diagnostics)
+        view_menu.addAction(completion_diagnostics_action)
 
         # Run menu
         run_menu = menubar.addMenu("&Run")
@@ -6015,11 +11393,13 @@ class Pythonico(QtWidgets.QMainWindow):
         self.show()
         
     def close_tab(self, index):
-        editor = self.editors.get(index, self.editor)
-        text_empty = editor.document().isEmpty()
+        session = self.session_at(index)
+        editor = session.editor if session is not None else self.editor
+        if editor is not None:
+            self.cancel_streaming_load(editor)
 
         # Only prompt if document is not empty and is modified
-        if not text_empty and editor.document().isModified():
+        if editor and not editor.document().isEmpty() and editor.document().isModified():
             reply = QtWidgets.QMessageBox.question(
                 self,
                 'Save Changes',
@@ -6033,41 +11413,39 @@ class Pythonico(QtWidgets.QMainWindow):
             elif reply == QtWidgets.QMessageBox.StandardButton.Cancel:
                 return
 
-        self.tab_widget.removeTab(index)
-        if index in self.editors:
-            del self.editors[index]
-        if index in self.highlighters:
-            del self.highlighters[index]
-        if index in self.filters:
-            del self.filters[index]
-        if index in self.completers:
-            del self.completers[index]
-        if index in self.splitters:
-            del self.splitters[index]
-        if index in self.split_editors:
-            del self.split_editors[index]
-        if index in self.split_highlighters:
-            del self.split_highlighters[index]
-
-        # Reorder the remaining tabs' indices
-        for i in range(index, self.tab_widget.count()):
-            self.editors[i] = self.editors.pop(i + 1)
-            self.highlighters[i] = self.highlighters.pop(i + 1)
-            self.filters[i] = self.filters.pop(i + 1)
-            self.completers[i] = self.completers.pop(i + 1)
-            if i + 1 in self.splitters:
-                self.splitters[i] = self.splitters.pop(i + 1)
-            if i + 1 in self.split_editors:
-                self.split_editors[i] = self.split_editors.pop(i + 1)
-            if i + 1 in self.split_highlighters:
-                self.split_highlighters[i] = self.split_highlighters.pop(i + 1)
+        self.discard_tab(index)
 
         if self.tab_widget.count() == 0:
             self.close()
+    
+    def discard_tab(self, index):
+        """Remove a tab without prompting and release its session"""
+        session = self.session_at(index)
+        self.tab_widget.removeTab(index)
+        if session is not None:
+            session.close(self)
+    
+    def session_at(self, index):
+        """The EditorSession of the tab at index, or None"""
+        return EditorSession.of(self.tab_widget.widget(index)) if index >= 0 else None
+    
+    def session_for(self, widget):
+        """The EditorSession owning widget (an editor, pane or page), or None"""
+        return EditorSession.of(widget)
+    
+    def tab_index_of(self, widget):
+        """Current tab index of the tab owning widget, or -1 once it is closed"""
+        session = self.session_for(widget)
+        return self.tab_widget.indexOf(session.page) if session is not None else -1
         
-    def createNewTab(self, file_path=None):
+    def createNewTab(self, file_path=None, document=None):
         # Create a new plain text editor widget
         new_editor = QtWidgets.QPlainTextEdit(self)
+        if document is not None:
+            # Document was already loaded by the open pipeline
+            document.setDocumentLayout(QtWidgets.QPlainTextDocumentLayout(document))
+            document.setParent(new_editor)
+            new_editor.setDocument(document)
         new_editor.setLineWrapMode(QtWidgets.QPlainTextEdit.LineWrapMode.NoWrap)
         new_editor.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
 
@@ -6126,6 +11504,9 @@ class Pythonico(QtWidgets.QMainWindow):
         
         # Create bottom completer for this tab
         bottom_completer = BottomCodeCompleter()
+        bottom_completer.frecency = self.completion_frecency
+        bottom_completer.profiler = self.completion_profiler
+        bottom_completer.word_index = self.word_index
         bottom_completer.set_editor(new_editor)
         
         # Apply editor settings to the completer
@@ -6142,7 +11523,9 @@ class Pythonico(QtWidgets.QMainWindow):
 
         # Determine the tab name
         tab_name = "Untitled"
-        if file_path:
+        if file_path and document is not None:
+            tab_name = QtCore.QFileInfo(file_path).fileName()
+        elif file_path:
             file_path_str = file_path if isinstance(file_path, str) else file_path[0]
             file = QtCore.QFile(file_path_str)
             if file.open(QtCore.QFile.OpenModeFlag.ReadOnly | QtCore.QFile.OpenModeFlag.Text):
@@ -6152,24 +11535,20 @@ class Pythonico(QtWidgets.QMainWindow):
                 new_editor.setPlainText(text)
                 tab_name = QtCore.QFileInfo(file_path_str).fileName()
 
-        # Add the editor widget to a new tab
-        tab_index = self.tab_widget.addTab(editor_widget, tab_name)
-
-        # Store unique instances of editor, syntax highlighter, filter, and completer for each tab
-        self.editors[tab_index] = new_editor
-        self.highlighters[tab_index] = AdvancedPythonSyntaxHighlighter(new_editor.document())
-        self.filters[tab_index] = AutoIndentFilter(new_editor)
-        new_editor.installEventFilter(self.filters[tab_index])
-        
-        # Store the splitter for split view functionality
-        self.splitters[tab_index] = editor_splitter
+        # Store unique instances of editor, syntax highlighter, filter, and completer in the tab's session
+        auto_indent_filter = AutoIndentFilter(new_editor)
+        new_editor.installEventFilter(auto_indent_filter)
+        EditorSession(editor_widget, new_editor, AdvancedPythonSyntaxHighlighter(new_editor.document()),
+                      auto_indent_filter, bottom_completer, editor_splitter)
+        self.word_index.acquire(new_editor.document())
+        self.edit_journal.attach(new_editor)
 
         # Connect bottom completer signals
         bottom_completer.completion_selected.connect(self.insert_completion_from_completer)
         new_editor.textChanged.connect(lambda: self.update_bottom_completer_for_editor(new_editor, bottom_completer))
 
-        # Store the completer for the new tab
-        self.completers[tab_index] = bottom_completer
+        # Add the editor widget to a new tab
+        self.tab_widget.addTab(editor_widget, tab_name)
 
         # Set the current tab to the newly created one
         self.tab_widget.setCurrentWidget(editor_widget)
@@ -6184,7 +11563,7 @@ class Pythonico(QtWidgets.QMainWindow):
         QtCore.QTimer.singleShot(100, bottom_completer.set_width_to_match_editor)
         
         # Connect signals to update the status bar
-        self.editors[tab_index].cursorPositionChanged.connect(self.update_status_bar)
+        new_editor.cursorPositionChanged.connect(self.update_status_bar)
         self.tab_widget.currentChanged.connect(self.update_status_bar)
         self.file_label.setText(f"File: {tab_name}")
 
@@ -6202,12 +11581,14 @@ class Pythonico(QtWidgets.QMainWindow):
         self.completer.setCompletionPrefix(word)
         self.completer.complete()
     
+    def other_view_has_focus(self, editor):
+        """Split panes share the document, so every pane sees each edit; only the one typing reacts"""
+        return any(view is not editor and view.hasFocus() and view.document() is editor.document()
+                   for panes in self.split_editors.values() for view in panes)
+
     def update_bottom_completer(self):
         """Update the bottom completer based on current cursor position"""
-        # Skip if we're currently syncing to prevent recursion
-        current_index = self.tab_widget.currentIndex()
-        if (hasattr(self, '_syncing_editors') and current_index is not None 
-            and self._syncing_editors.get(current_index, False)):
+        if self.other_view_has_focus(self.editor):
             return
             
         # Skip if we're currently inserting a completion
@@ -6215,6 +11596,9 @@ class Pythonico(QtWidgets.QMainWindow):
             and getattr(self.bottom_completer, 'inserting_completion', False)):
             return
             
+        if hasattr(self, 'signature_help'):
+            self.signature_help.on_text_changed(self.editor)
+        
         cursor = self.editor.textCursor()
         cursor.select(QtGui.QTextCursor.SelectionType.WordUnderCursor)
         word = cursor.selectedText()
@@ -6228,6 +11612,13 @@ class Pythonico(QtWidgets.QMainWindow):
     
     def update_bottom_completer_for_editor(self, editor, bottom_completer):
         """Update bottom completer for a specific editor"""
+        if editor.property("streaming_load"):
+            return
+        if self.other_view_has_focus(editor):
+            return
+        if hasattr(self, 'signature_help') and not getattr(bottom_completer, 'inserting_completion', False):
+            self.signature_help.on_text_changed(editor)
+        
         cursor = editor.textCursor()
         cursor.select(QtGui.QTextCursor.SelectionType.WordUnderCursor)
         word = cursor.selectedText()
@@ -6332,20 +11723,11 @@ class Pythonico(QtWidgets.QMainWindow):
     def handle_split_editor_text_change(self, split_editor):
         """Handle text changes in split editor using shared completer"""
         try:
-            # Find the tab index for this split editor
-            tab_index = None
-            for idx, editor in self.split_editors.items():
-                if editor == split_editor:
-                    tab_index = idx
-                    break
+            # Find the tab this split editor belongs to
+            session = self.session_for(split_editor)
             
-            # Skip if we're currently syncing to prevent recursion
-            if (hasattr(self, '_syncing_editors') and tab_index is not None 
-                and self._syncing_editors.get(tab_index, False)):
-                return
-                
             # Skip if we're currently inserting a completion
-            completer = self.completers.get(tab_index) if tab_index is not None else self.bottom_completer
+            completer = session.completer if session is not None else self.bottom_completer
             if completer and getattr(completer, 'inserting_completion', False):
                 return
                 
@@ -6384,6 +11766,7 @@ class Pythonico(QtWidgets.QMainWindow):
             cursor = target_editor.textCursor()
             cursor.select(QtGui.QTextCursor.SelectionType.WordUnderCursor)
             selected_text = cursor.selectedText()
+            self.record_completion(target_editor, completion_text, selected_text)
             
             # If the completion text is the same as selected text, just position cursor at end
             if completion_text == selected_text:
@@ -6412,8 +11795,7 @@ class Pythonico(QtWidgets.QMainWindow):
             if current_index >= 0:
                 target_editor = self.editors.get(current_index)
                 # Check if there's a split editor with focus
-                if current_index in self.split_editors:
-                    split_editor = self.split_editors[current_index]
+                for split_editor in self.split_editors.get(current_index, []):
                     if split_editor.hasFocus():
                         target_editor = split_editor
         
@@ -6430,6 +11812,7 @@ class Pythonico(QtWidgets.QMainWindow):
             cursor = editor.textCursor()
             cursor.select(QtGui.QTextCursor.SelectionType.WordUnderCursor)
             selected_text = cursor.selectedText()
+            self.record_completion(editor, completion_text, selected_text)
             
             # If the completion text is the same as selected text, just position cursor at end
             if completion_text == selected_text:
@@ -6450,6 +11833,12 @@ class Pythonico(QtWidgets.QMainWindow):
             if hasattr(self, 'bottom_completer') and self.bottom_completer:
                 self.bottom_completer.inserting_completion = False
     
+    def record_completion(self, editor, completion_text, typed_text):
+        """Record an accepted completion in the usage statistics"""
+        if hasattr(self, 'completion_frecency'):
+            scope = self.completion_frecency.scope_for_editor(editor)
+            self.completion_frecency.record(scope, completion_text, len(typed_text))
+    
     def keyPressEvent(self, event):
         """Handle key press events for completer navigation"""
         if self.bottom_completer.isVisible():
@@ -6463,7 +11852,9 @@ class Pythonico(QtWidgets.QMainWindow):
         super().keyPressEvent(event)
             
     def update_current_file(self, tab_index):
+        # Track the current tab's widgets; closed tabs' widgets are deleted
         self.editor = self.editors.get(tab_index, self.editor)
+        self.bottom_completer = self.completers.get(tab_index, self.bottom_completer)
         self.current_file = self.tab_widget.tabText(tab_index)
         if self.current_file:
             self.setWindowTitle(f"Pythonico - {self.current_file}")
@@ -6489,45 +11880,149 @@ class Pythonico(QtWidgets.QMainWindow):
 
         if file_dialog.exec():
             file_paths = file_dialog.selectedFiles()  # Get the list of selected files
-            for file_path in file_paths:
-                try:
-                    file = QtCore.QFile(file_path)
-                    if file.open(QtCore.QFile.OpenModeFlag.ReadOnly | QtCore.QFile.OpenModeFlag.Text):
-                        text_stream = QtCore.QTextStream(file)
-                        text = text_stream.readAll()
-                        file.close()
-
-                        # Create a new tab for each file
-                        if self.tab_widget.count() == 1 and self.tab_widget.tabText(0) == "Untitled":
-                            self.tab_widget.removeTab(0)
-                        self.createNewTab(file_path)
-                        current_index = self.tab_widget.currentIndex()
-                        current_editor = self.editors.get(current_index, self.editor)
-
-                        # Set the content of the current editor
-                        current_editor.setPlainText(text)
-
-                        # Update current_file attribute
-                        self.current_file = file_path
-                        # Update window title
-                        self.setWindowTitle(f"Pythonico - {self.current_file}")
-
-                        # Update tab name with only the file name
-                        self.tab_widget.setTabText(current_index, QtCore.QFileInfo(file_path).fileName())
-
-                        # Store the file path in the editor's property
-                        current_editor.setProperty("file_path", file_path)
-                        
-                        self.statusBar().showMessage(f"File opened: {file_path}", 2000)
-                    else:
-                        QtWidgets.QMessageBox.critical(self, "Error", f"Could not open file: {file_path}")
-                except Exception as e:
-                    QtWidgets.QMessageBox.critical(self, "Error", f"Error opening file {file_path}: {str(e)}")
+            self.open_files(file_paths)
+
+    def open_files(self, file_paths):
+        """Open files through the background pipeline; tabs appear as they load"""
+        small_files = []
+        for file_path in file_paths:
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                size = 0
+            if is_binary_file(file_path):
+                self.open_hex_viewer(file_path)
+            elif size >= self.STRUCTURED_VIEWER_THRESHOLD and file_path.lower().endswith(('.json', '.ndjson', '.jsonl')):
+                self.open_json_viewer(file_path)
+            elif size >= self.LARGE_FILE_VIEWER_THRESHOLD:
+                self.open_large_file_viewer(file_path)
+            elif size >= self.STREAMING_LOAD_THRESHOLD:
+                self.open_file_streaming(file_path)
+            else:
+                small_files.append(file_path)
+        if small_files:
+            self.statusBar().showMessage(f"Opening {len(small_files)} file(s)...")
+            self.file_open_pipeline.open(small_files)
+
+    def open_large_file_viewer(self, file_path):
+        """Open a huge file in the memory-mapped read-only viewer"""
+        try:
+            view = LargeFileView(file_path)
+        except (OSError, ValueError) as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Could not open file: {file_path}\n{str(e)}")
+            return
+        self.add_viewer_tab(view, file_path)
+        view.viewer.cursor_moved.connect(self.update_status_bar)
+        self.statusBar().showMessage(f"Opened read-only large file view: {file_path}", 3000)
+
+    def open_json_viewer(self, file_path):
+        """Open a large JSON/NDJSON file in the lazy structured viewer"""
+        try:
+            view = JsonFileView(file_path)
+        except (OSError, ValueError) as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Could not open file: {file_path}\n{str(e)}")
+            return
+        self.add_viewer_tab(view, file_path)
+        self.statusBar().showMessage(f"Opened structured view: {file_path}", 3000)
+
+    def open_hex_viewer(self, file_path):
+        """Open a binary file in the lazy hex viewer instead of decoding it as text"""
+        try:
+            view = HexFileView(file_path)
+        except (OSError, ValueError) as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Could not open file: {file_path}\n{str(e)}")
+            return
+        self.add_viewer_tab(view, file_path)
+        self.statusBar().showMessage(f"Opened binary file in hex view: {file_path}", 3000)
+
+    def add_viewer_tab(self, view, file_path):
+        """Add a read-only viewer page as a tab"""
+        if self.tab_widget.count() == 1 and self.tab_widget.tabText(0) == "Untitled":
+            self.discard_tab(0)
+        EditorSession(view, viewer=view)
+        tab_index = self.tab_widget.addTab(view, QtCore.QFileInfo(file_path).fileName())
+        self.tab_widget.setCurrentIndex(tab_index)
+        self.current_file = file_path
+        self.setWindowTitle(f"Pythonico - {self.current_file}")
+        view.setFocus()
+
+    def open_file_streaming(self, file_path):
+        """Open a large file into a new tab, streaming it in chunks with progress"""
+        if self.tab_widget.count() == 1 and self.tab_widget.tabText(0) == "Untitled":
+            self.discard_tab(0)
+        self.createNewTab(file_path, QtGui.QTextDocument())
+        current_editor = self.editors.get(self.tab_widget.currentIndex(), self.editor)
+        current_editor.setProperty("file_path", file_path)
+        self.current_file = file_path
+        self.setWindowTitle(f"Pythonico - {self.current_file}")
+        
+        loader = StreamingFileLoader(current_editor, file_path, self.statusBar(), self)
+        loader.finished.connect(self.on_streaming_load_finished)
+        self.streaming_loaders.append(loader)
+        loader.start()
+
+    def on_streaming_load_finished(self, loader, completed):
+        if loader in self.streaming_loaders:
+            self.streaming_loaders.remove(loader)
+        try:
+            if completed:
+                self.external_watcher.watch(loader.editor, loader.file_path)
+                self.reveal_pending_location(loader.file_path)
+                self.statusBar().showMessage(f"File opened without syntax highlighting (too large): {loader.file_path}", 3000)
+            else:
+                # Never let a truncated buffer be saved over the original file
+                loader.editor.setProperty("file_path", None)
+                index = self.tab_index_of(loader.editor)
+                if index >= 0:
+                    self.tab_widget.setTabText(index, f"{QtCore.QFileInfo(loader.file_path).fileName()} [partial]")
+                self.statusBar().showMessage(f"Loading cancelled: {loader.file_path}", 3000)
+        except RuntimeError:
+            # Tab was closed while loading
+            pass
+        loader.deleteLater()
+
+    def cancel_streaming_load(self, editor):
+        for loader in list(self.streaming_loaders):
+            if loader.editor is editor:
+                loader.cancel()
+
+    def on_file_document_ready(self, file_path, document):
+        """Create the tab for a document built by the open pipeline"""
+        try:
+            # Replace the initial empty tab
+            if self.tab_widget.count() == 1 and self.tab_widget.tabText(0) == "Untitled":
+                self.discard_tab(0)
+            self.createNewTab(file_path, document)
+            current_index = self.tab_widget.currentIndex()
+            current_editor = self.editors.get(current_index, self.editor)
+
+            # Update current_file attribute
+            self.current_file = file_path
+            # Update window title
+            self.setWindowTitle(f"Pythonico - {self.current_file}")
+
+            # Store the file path in the editor's property
+            current_editor.setProperty("file_path", file_path)
+            self.external_watcher.watch(current_editor, file_path)
+            self.reveal_pending_location(file_path)
+            
+            self.statusBar().showMessage(f"File opened: {file_path}", 2000)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Error opening file {file_path}: {str(e)}")
+
+    def on_file_load_failed(self, file_path, error):
+        self.pending_locations.pop(os.path.normcase(os.path.abspath(file_path)), None)
+        QtWidgets.QMessageBox.critical(self, "Error", f"Could not open file: {file_path}\n{error}")
 
     def save_file(self):
         current_index = self.tab_widget.currentIndex()
         current_editor = self.editors.get(current_index, self.editor) or self.editor
 
+        refusal = self.save_engine.refusal(current_editor)
+        if refusal:
+            self.statusBar().showMessage(f"Not saved: {refusal}", 3000)
+            return
+
         file_path = current_editor.property("file_path")
         if not file_path:
             # No current file is set, prompt the user
@@ -6536,44 +12031,54 @@ class Pythonico(QtWidgets.QMainWindow):
             if not file_path:
                 return
 
-        try:
-            file = QtCore.QFile(file_path)
-            if file.open(QtCore.QFile.OpenModeFlag.WriteOnly | QtCore.QFile.OpenModeFlag.Text):
-                text_stream = QtCore.QTextStream(file)
-                text_stream << current_editor.toPlainText()
-                file.close()
-                self.current_file = file_path
-                self.setWindowTitle(f"Pythonico - {self.current_file}")
-                self.tab_widget.setTabText(current_index, QtCore.QFileInfo(file_path).fileName())
-                current_editor.setProperty("file_path", file_path)
-                self.statusBar().showMessage(f"File saved: {file_path}", 2000)
-            else:
-                QtWidgets.QMessageBox.critical(self, "Error", f"Could not save file: {file_path}")
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Error", f"Error saving file: {str(e)}")
+        self.save_engine.save(current_editor, file_path)
 
     def save_as_file(self):
         current_index = self.tab_widget.currentIndex()
         current_editor = self.editors.get(current_index, self.editor) or self.editor
 
+        refusal = self.save_engine.refusal(current_editor)
+        if refusal:
+            self.statusBar().showMessage(f"Not saved: {refusal}", 3000)
+            return
+
         home_dir = QtCore.QDir.homePath()
         file_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save File As", home_dir, "Python Files (*.py);;All Files (*.*)")
         if file_path:
+            self.save_engine.save(current_editor, file_path)
+
+    def on_save_finished(self, editor, file_path, written, error, quiet=False):
+        """Update the tab once a background save completes"""
+        if error:
+            if quiet:
+                self.statusBar().showMessage(f"Auto-save failed for {file_path}: {error}", 5000)
+            else:
+                QtWidgets.QMessageBox.critical(self, "Error", f"Error saving file {file_path}: {error}")
+            return
+        if written:
+            self.project_search.refresh_index([file_path])
+        if editor is not None:
             try:
-                file = QtCore.QFile(file_path)
-                if file.open(QtCore.QFile.OpenModeFlag.WriteOnly | QtCore.QFile.OpenModeFlag.Text):
-                    text_stream = QtCore.QTextStream(file)
-                    text_stream << current_editor.toPlainText()
-                    file.close()
-                    self.current_file = file_path
-                    self.setWindowTitle(f"Pythonico - {self.current_file}")
-                    self.tab_widget.setTabText(current_index, QtCore.QFileInfo(file_path).fileName())
-                    current_editor.setProperty("file_path", file_path)
-                    self.statusBar().showMessage(f"File saved as: {file_path}", 2000)
-                else:
-                    QtWidgets.QMessageBox.critical(self, "Error", f"Could not save file: {file_path}")
-            except Exception as e:
-                QtWidgets.QMessageBox.critical(self, "Error", f"Error saving file: {str(e)}")
+                editor.document().setProperty("loaded_bytes", os.path.getsize(file_path))
+            except OSError:
+                pass
+        if editor is None or quiet:
+            return
+        
+        # An explicit save confirms recovered text; auto-save may take over
+        editor.setProperty("recovered", False)
+        self.external_watcher.watch(editor, file_path)
+        current_index = self.tab_index_of(editor)
+        editor.setProperty("file_path", file_path)
+        if current_index >= 0:
+            self.tab_widget.setTabText(current_index, QtCore.QFileInfo(file_path).fileName())
+            if current_index == self.tab_widget.currentIndex():
+                self.current_file = file_path
+                self.setWindowTitle(f"Pythonico - {self.current_file}")
+        if written:
+            self.statusBar().showMessage(f"File saved: {file_path}", 2000)
+        else:
+            self.statusBar().showMessage(f"No changes to save: {file_path}", 2000)
 
     def onTextChanged(self):
         # Add an asterisk (*) to the current editor title to indicate unsaved changes
@@ -6756,6 +12261,89 @@ class Pythonico(QtWidgets.QMainWindow):
         layout.addLayout(options_layout)
         dialog.exec()
 
+    def recover_unsaved_buffers(self):
+        """Replay edit journals from a crashed session into new tabs"""
+        recovered = self.edit_journal.recoverable()
+        if not recovered:
+            return
+        
+        names = "\n".join(f"  {os.path.basename(path) or 'Untitled'} ({time.strftime('%Y-%m-%d %H:%M', time.localtime(saved))})"
+                          for _, path, _, saved in recovered)
+        reply = QtWidgets.QMessageBox.question(
+            self,
+            'Recover Unsaved Changes',
+            f"Pythonico did not shut down cleanly. Recover {len(recovered)} unsaved buffer(s)?\n\n{names}",
+            QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No
+        )
+        
+        for journal_id, file_path, text, _ in recovered:
+            if reply == QtWidgets.QMessageBox.StandardButton.Yes:
+                self.createNewTab()
+                current_index = self.tab_widget.currentIndex()
+                current_editor = self.editors.get(current_index, self.editor)
+                current_editor.setPlainText(text)
+                current_editor.document().setModified(True)
+                # Auto-save must not write recovered text until the user saves it explicitly
+                current_editor.setProperty("recovered", True)
+                if file_path:
+                    current_editor.setProperty("file_path", file_path)
+                    self.tab_widget.setTabText(current_index, f"{QtCore.QFileInfo(file_path).fileName()} (recovered)")
+                else:
+                    self.tab_widget.setTabText(current_index, "Untitled (recovered)")
+            self.edit_journal.discard_journal(journal_id)
+    
+    def toggle_follow_mode(self, checked):
+        """Start or stop following the current tab's file as it grows"""
+        current_index = self.tab_widget.currentIndex()
+        current_editor = self.editors.get(current_index)
+        if current_editor is None:
+            self.follow_file_action.setChecked(False)
+            return
+        
+        session = self.session_for(current_editor)
+        if session.tailer is not None:
+            if session.tailer.stop():
+                # The trimmed tail must never be saved over the log
+                self.external_watcher.unwatch(current_editor)
+                self.tab_widget.setTabText(current_index, f"{self.tab_widget.tabText(current_index)} [tail]")
+                self.statusBar().showMessage("Stopped following file; the buffer is now detached from it", 3000)
+            else:
+                self.statusBar().showMessage("Stopped following file", 2000)
+            session.tailer = None
+            self.follow_file_action.setChecked(False)
+            return
+        
+        file_path = current_editor.property("file_path")
+        if not file_path:
+            QtWidgets.QMessageBox.information(self, "Follow File", "Save the file first to follow it.")
+            self.follow_file_action.setChecked(False)
+            return
+        if current_editor.document().isModified():
+            QtWidgets.QMessageBox.warning(self, "Follow File", "The document has unsaved changes.")
+            self.follow_file_action.setChecked(False)
+            return
+        
+        max_lines = self.settings_manager.get("advanced", "tail_max_lines", 100000)
+        session.tailer = FileTailer(current_editor, file_path, max_lines,
+                                    current_editor.document().property("loaded_bytes"), self)
+        current_editor.moveCursor(QtGui.QTextCursor.MoveOperation.End)
+        self.follow_file_action.setChecked(True)
+        self.statusBar().showMessage(f"Following {file_path}", 2000)
+    
+    def update_follow_action(self):
+        if hasattr(self, 'follow_file_action'):
+            session = self.session_at(self.tab_widget.currentIndex())
+            self.follow_file_action.setChecked(session is not None and session.tailer is not None)
+    
+    def show_completion_diagnostics(self):
+        """Show the completion latency diagnostics panel"""
+        if not hasattr(self, 'completion_diagnostics') or not self.completion_diagnostics:
+            self.completion_diagnostics = CompletionDiagnosticsDialog(self.completion_profiler, self.completion_frecency, self)
+        
+        self.completion_diagnostics.show()
+        self.completion_diagnostics.raise_()
+        self.completion_diagnostics.activateWindow()
+    
     def show_find_dialog(self):
         """Show the Find/Replace dialog"""
         if not hasattr(self, 'find_dialog') or not self.find_dialog:
@@ -6769,55 +12357,42 @@ class Pythonico(QtWidgets.QMainWindow):
     def find_text_in_dialog(self, search_text, reverse=False, case_sensitive=False, whole_words=False, regex=False):
         """Enhanced find method for the Find/Replace dialog"""
         current_index = self.tab_widget.currentIndex()
+        if current_index in self.viewers:
+            viewer = self.current_text_viewer()
+            return viewer.find(search_text, reverse, case_sensitive, whole_words, regex) if viewer else False
         current_editor = self.editors.get(current_index, self.editor)
         if not current_editor or not search_text:
             return False
             
-        flags = 0 if case_sensitive else re.IGNORECASE
-        if not regex:
-            search_text = re.escape(search_text)
-        if whole_words:
-            search_text = r'\b' + search_text + r'\b'
-            
-        cursor = current_editor.textCursor()
-        start_pos = cursor.selectionEnd() if cursor.hasSelection() else cursor.position()
-        text = current_editor.toPlainText()
-        
         try:
-            pattern = re.compile(search_text, flags | 8)
-            
-            if reverse:
-                matches = list(pattern.finditer(text))
-                matches = [m for m in matches if m.end() <= start_pos]
-                match = matches[-1] if matches else None
-            else:
-                match = pattern.search(text, start_pos)
-                
-            if match:
-                cursor.setPosition(match.start())
-                cursor.setPosition(match.end(), QtGui.QTextCursor.MoveMode.KeepAnchor)
-                current_editor.setTextCursor(cursor)
-                current_editor.ensureCursorVisible()
-                return True
-            else:
-                # Wrap around search
-                if reverse:
-                    matches = list(pattern.finditer(text))
-                    match = matches[-1] if matches else None
-                else:
-                    match = pattern.search(text, 0)
-                    
-                if match:
-                    cursor.setPosition(match.start())
-                    cursor.setPosition(match.end(), QtGui.QTextCursor.MoveMode.KeepAnchor)
-                    current_editor.setTextCursor(cursor)
-                    current_editor.ensureCursorVisible()
-                    return True
-                    
+            pattern = build_search_pattern(search_text, case_sensitive, whole_words, regex)
         except re.error as e:
             QtWidgets.QMessageBox.warning(self, "Regex Error", f"Invalid regular expression: {e}")
-            
-        return False
+            return False
+        
+        index = self.match_index_cache.get(current_editor.document(), pattern, spans_lines=regex)
+        return self.select_indexed_match(current_editor, index, reverse)
+
+    def select_indexed_match(self, editor, index, reverse=False):
+        """Select the next (or previous) match after the cursor, wrapping around"""
+        # index holds document positions, the same units as the cursor
+        count = index.count()
+        if not count:
+            return False
+        cursor = editor.textCursor()
+        if reverse:
+            # Last match ending before the selection, else wrap to the last one
+            origin = cursor.selectionStart() if cursor.hasSelection() else cursor.position()
+            i = bisect.bisect_right(index.ends, origin) - 1
+            i = i if i >= 0 else count - 1
+        else:
+            origin = cursor.selectionEnd() if cursor.hasSelection() else cursor.position()
+            i = index.nearest(origin)
+        cursor.setPosition(index.starts[i])
+        cursor.setPosition(index.ends[i], QtGui.QTextCursor.MoveMode.KeepAnchor)
+        editor.setTextCursor(cursor)
+        editor.ensureCursorVisible()
+        return True
 
     def replace_current_selection(self, replace_text):
         """Replace the currently selected text"""
@@ -6837,58 +12412,31 @@ class Pythonico(QtWidgets.QMainWindow):
         if not current_editor or not find_text:
             return 0
             
-        flags = 0 if case_sensitive else re.IGNORECASE
-        if not regex:
-            find_text = re.escape(find_text)
-        if whole_words:
-            find_text = r'\b' + find_text + r'\b'
+        if current_editor.isReadOnly():
+            return 0
             
         try:
-            pattern = re.compile(find_text, flags | 8)
+            pattern = build_search_pattern(find_text, case_sensitive, whole_words, regex)
             text = current_editor.toPlainText()
-            new_text, count = pattern.subn(replace_text, text)
-            
-            if count > 0:
-                current_editor.setPlainText(new_text)
-                
-            return count
-            
+            edits = [(m.start(), m.end(), m.expand(replace_text)) for m in pattern.finditer(text)]
         except re.error as e:
             QtWidgets.QMessageBox.warning(self, "Regex Error", f"Invalid regular expression: {e}")
             return 0
+        
+        # Edit in place rather than setPlainText: one undo step, cursor and
+        # scroll position kept, only the changed lines re-highlighted
+        replace_spans_in_document(current_editor.document(), edits, text)
+        return len(edits)
 
     def find_text(self, search_text, editor, reverse=False):
-        flags = re.MULTILINE
-
-        cursor = editor.textCursor()
-
-        start_pos = (
-            cursor.selectionEnd()
-            if cursor.hasSelection()
-            else cursor.position()
-        )
-        text = editor.toPlainText()
-        pattern = re.compile(search_text, flags)
-
-        if reverse:
-            matches = list(pattern.finditer(text))
-            matches = [m for m in matches if m.end() <= start_pos]
-            match = matches[-1] if matches else None
-        else:
-            match = pattern.search(text, start_pos)
-        if match:
-            cursor.setPosition(match.start())
-            cursor.setPosition(match.end(), QtGui.QTextCursor.MoveMode.KeepAnchor)
-            editor.setTextCursor(cursor)
-            editor.setFocus()
+        try:
+            pattern = re.compile(search_text, re.MULTILINE)
+        except re.error as e:
+            QtWidgets.QMessageBox.warning(self, "Regex Error", f"Invalid regular expression: {e}")
             return
-
-        # If no match found, wrap around to the beginning and search again
-        match = pattern.search(text)
-        if match:
-            cursor.setPosition(match.start())
-            cursor.setPosition(match.end(), QtGui.QTextCursor.MoveMode.KeepAnchor)
-            editor.setTextCursor(cursor)
+        index = self.match_index_cache.get(editor.document(), pattern)
+        if self.select_indexed_match(editor, index, reverse):
+            editor.setFocus()
             
     def find_next(self):
         current_index = self.tab_widget.currentIndex()
@@ -6909,8 +12457,115 @@ class Pythonico(QtWidgets.QMainWindow):
         if ok and search_text:
             self.find_text(search_text, current_editor, reverse=True)
 
+    def show_project_search(self):
+        """Show the Find in Files panel, seeded with the current selection"""
+        current_editor = self.editors.get(self.tab_widget.currentIndex())
+        if current_editor is not None:
+            selected = current_editor.textCursor().selectedText()
+            if selected and '\u2029' not in selected:
+                self.project_search.query_edit.setText(selected)
+        self.project_search.show()
+        self.project_search.raise_()
+        self.project_search.query_edit.setFocus()
+        self.project_search.query_edit.selectAll()
+
+    def open_buffer_texts(self):
+        """Text of file-backed tabs with unsaved edits, keyed by normalized path"""
+        texts = {}
+        for editor in self.editors.values():
+            file_path = editor.property("file_path")
+            if file_path and editor.document().isModified() and not editor.property("streaming_load"):
+                texts[os.path.normcase(os.path.abspath(file_path))] = editor.toPlainText()
+        return texts
+
+    def find_tab_for_path(self, file_path):
+        """Index of the tab showing file_path, or -1"""
+        target = os.path.normcase(os.path.abspath(file_path))
+        for index, editor in self.editors.items():
+            path = editor.property("file_path")
+            if path and os.path.normcase(os.path.abspath(path)) == target:
+                return index
+        for index, view in self.viewers.items():
+            if os.path.normcase(os.path.abspath(view.file_path)) == target:
+                return index
+        return -1
+
+    def reveal_location(self, file_path, line, column=0, length=0):
+        """Show a 0-based line (and optional span, in code points) of a file, opening it if needed"""
+        index = self.find_tab_for_path(file_path)
+        if index < 0:
+            key = os.path.normcase(os.path.abspath(file_path))
+            already_opening = key in self.pending_locations
+            self.pending_locations[key] = (line, column, length)
+            if not already_opening:
+                self.open_files([file_path])
+            # Viewer tabs open synchronously; editors reveal once loaded
+            index = self.find_tab_for_path(file_path)
+            if index < 0 or index not in self.viewers:
+                return
+            self.pending_locations.pop(key, None)
+        self.tab_widget.setCurrentIndex(index)
+        self.goto_location(index, line, column, length)
+
+    def reveal_pending_location(self, file_path):
+        location = self.pending_locations.pop(os.path.normcase(os.path.abspath(file_path)), None)
+        index = self.find_tab_for_path(file_path) if location is not None else -1
+        if index >= 0:
+            self.tab_widget.setCurrentIndex(index)
+            self.goto_location(index, *location)
+
+    def goto_location(self, index, line, column=0, length=0):
+        if index in self.viewers:
+            view = self.viewers[index]
+            viewer = view.text_viewer() if hasattr(view, 'text_viewer') else None
+            if viewer is not None:
+                viewer.goto_line(min(line + 1, viewer.index.line_count()))
+                viewer.setFocus()
+            return
+        editor = self.editors.get(index)
+        if editor is None:
+            return
+        document = editor.document()
+        block = document.findBlockByNumber(min(line, document.blockCount() - 1))
+        # Hit columns count code points; the document counts UTF-16 units
+        text = block.text()
+        column = min(column, len(text))
+        in_block = utf16_position_mapper(text)
+        cursor = editor.textCursor()
+        cursor.setPosition(block.position() + in_block(column))
+        cursor.setPosition(block.position() + in_block(min(column + length, len(text))), QtGui.QTextCursor.MoveMode.KeepAnchor)
+        editor.setTextCursor(cursor)
+        editor.centerCursor()
+        editor.setFocus()
+
+    def current_text_viewer(self):
+        """The LargeFileViewer shown in the current tab, if any"""
+        view = self.viewers.get(self.tab_widget.currentIndex())
+        return view.text_viewer() if hasattr(view, 'text_viewer') else None
+
     def goToLine(self):
         current_index = self.tab_widget.currentIndex()
+        if current_index in self.viewers and hasattr(self.viewers[current_index], 'hex_viewer'):
+            hex_viewer = self.viewers[current_index].hex_viewer
+            offset, ok = QtWidgets.QInputDialog.getText(self, "Go to Offset", "Byte offset (decimal or 0x hex):")
+            if ok and offset.strip():
+                try:
+                    hex_viewer.goto_offset(parse_offset(offset))
+                    hex_viewer.setFocus()
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "Invalid Offset", f"Not a valid offset: {offset}")
+            return
+        if current_index in self.viewers:
+            viewer = self.current_text_viewer()
+            if viewer is None:
+                return
+            max_lines = viewer.index.line_count()
+            line, ok = QtWidgets.QInputDialog.getInt(self, "Go to Line",
+                f"Line Number (1 - {max_lines}):", value=viewer.cursor_line + 1, min=1, max=max_lines)
+            if ok:
+                viewer.goto_line(line)
+                viewer.setFocus()
+            return
         current_editor = self.editors.get(current_index, self.editor)
         if current_editor is None:
             QtWidgets.QMessageBox.warning(self, "No Editor", "No editor available.")
@@ -7004,50 +12659,114 @@ class Pythonico(QtWidgets.QMainWindow):
                     claude_ai_widget.output_window.setStyleSheet(f"background-color: {background_color}; color: {font_color};")
             
     def split_horizontal(self):
-        """Split the current editor horizontally"""
-        current_index = self.tab_widget.currentIndex()
-        if current_index >= 0:
-            splitter = self.splitters.get(current_index)
-            if splitter and splitter.count() == 1:
-                self._create_split_editor(current_index, QtCore.Qt.Orientation.Vertical)
+        """Split the focused pane into top and bottom"""
+        self.split_current_pane(QtCore.Qt.Orientation.Vertical)
     
     def split_vertical(self):
-        """Split the current editor vertically"""
-        current_index = self.tab_widget.currentIndex()
-        if current_index >= 0:
-            splitter = self.splitters.get(current_index)
-            if splitter and splitter.count() == 1:
-                self._create_split_editor(current_index, QtCore.Qt.Orientation.Horizontal)
+        """Split the focused pane side by side"""
+        self.split_current_pane(QtCore.Qt.Orientation.Horizontal)
+    
+    def tab_panes(self, tab_index):
+        """The tab's main editor followed by its split panes"""
+        main_editor = self.editors.get(tab_index)
+        return ([main_editor] if main_editor is not None else []) + self.split_editors.get(tab_index, [])
+    
+    def focused_pane(self, tab_index):
+        focus = QtWidgets.QApplication.focusWidget()
+        panes = self.tab_panes(tab_index)
+        return next((pane for pane in panes if pane is focus), panes[0] if panes else None)
+    
+    def pane_container(self, pane):
+        """The widget holding pane (and its gutter) directly inside a splitter"""
+        widget = pane
+        while widget is not None and not isinstance(widget.parentWidget(), QtWidgets.QSplitter):
+            widget = widget.parentWidget()
+        return widget
     
-    def close_split(self):
-        """Close the split view and return to single editor"""
-        current_index = self.tab_widget.currentIndex()
-        if current_index >= 0:
-            splitter = self.splitters.get(current_index)
-            if splitter and splitter.count() > 1:
-                # Clean up split editor references
-                if current_index in self.split_editors:
-                    del self.split_editors[current_index]
-                if current_index in self.split_highlighters:
-                    del self.split_highlighters[current_index]
-                if hasattr(self, '_syncing_editors') and current_index in self._syncing_editors:
-                    del self._syncing_editors[current_index]
-                
-                # Remove the second editor
-                while splitter.count() > 1:
-                    widget = splitter.widget(1)
-                    splitter.widget(1).setParent(None)
-                    widget.deleteLater()
-    
-    def _create_split_editor(self, tab_index, orientation):
-        """Create a split editor with the specified orientation"""
-        current_editor = self.editors.get(tab_index)
-        if not current_editor:
+    def split_current_pane(self, orientation):
+        """
+        Open another view of the current tab's document next to the focused
+        pane. Splitting across the orientation of the surrounding splitter
+        nests a new splitter in the pane's place, so panes can be tiled in
+        any arrangement.
+        """
+        tab_index = self.tab_widget.currentIndex()
+        root = self.splitters.get(tab_index)
+        target = self.focused_pane(tab_index)
+        container = self.pane_container(target) if target is not None else None
+        if root is None or container is None:
             return
         
-        splitter = self.splitters.get(tab_index)
-        if not splitter:
+        pane_widget, split_editor = self._create_split_editor(tab_index)
+        splitter = container.parentWidget()
+        if splitter.count() == 1 or splitter.orientation() == orientation:
+            splitter.setOrientation(orientation)
+            splitter.insertWidget(splitter.indexOf(container) + 1, pane_widget)
+        else:
+            sizes = splitter.sizes()
+            nested = QtWidgets.QSplitter(orientation)
+            nested.setHandleWidth(root.handleWidth())
+            nested.setChildrenCollapsible(False)
+            nested.setStyleSheet(root.styleSheet())
+            splitter.insertWidget(splitter.indexOf(container), nested)
+            nested.addWidget(container)
+            nested.addWidget(pane_widget)
+            splitter.setSizes(sizes)
+            splitter = nested
+        
+        session = self.session_at(tab_index)
+        session.split_editors.append(split_editor)
+        session.attach_pane(split_editor)
+        # Share the space equally, again once the layout has settled
+        self.equalize_splitter(splitter)
+        QtCore.QTimer.singleShot(50, lambda: self.equalize_splitter(splitter))
+        split_editor.setFocus()
+    
+    def equalize_splitter(self, splitter):
+        try:
+            horizontal = splitter.orientation() == QtCore.Qt.Orientation.Horizontal
+            total = splitter.width() if horizontal else splitter.height()
+            splitter.setSizes([max(total, 400) // splitter.count()] * splitter.count())
+        except RuntimeError:
+            pass  # Splitter removed before the timer fired
+    
+    def close_split(self):
+        """Close the focused split pane (or the newest one when the main editor has focus)"""
+        tab_index = self.tab_widget.currentIndex()
+        panes = self.split_editors.get(tab_index)
+        if not panes:
             return
+        focus = QtWidgets.QApplication.focusWidget()
+        pane = next((pane for pane in panes if pane is focus), panes[-1])
+        panes.remove(pane)
+        
+        main_editor = self.editors.get(tab_index)
+        container = self.pane_container(pane)
+        splitter = container.parentWidget()
+        # The shared completer may have moved into this pane; give it back to the main editor
+        if container.findChildren(BottomCodeCompleter):
+            self.switch_completer_to_editor(main_editor)
+        container.setParent(None)
+        container.deleteLater()
+        
+        # Fold away nested splitters left with a single pane
+        root = self.splitters.get(tab_index)
+        while splitter is not root and splitter.count() == 1:
+            parent = splitter.parentWidget()
+            sizes = parent.sizes()
+            parent.insertWidget(parent.indexOf(splitter), splitter.widget(0))
+            splitter.setParent(None)
+            splitter.deleteLater()
+            parent.setSizes(sizes)
+            splitter = parent
+        self.focused_pane(tab_index).setFocus()
+    
+    def _create_split_editor(self, tab_index):
+        """
+        Create a pane viewing the tab's document: its own cursor, scroll
+        position and gutter, sharing text, undo, highlighting and indexes
+        """
+        current_editor = self.editors.get(tab_index)
         
         # Create a new editor for the split
         split_editor = QtWidgets.QPlainTextEdit()
@@ -7058,8 +12777,10 @@ class Pythonico(QtWidgets.QMainWindow):
         split_editor.setStyleSheet(current_editor.styleSheet())
         split_editor.setFont(current_editor.font())
         
-        # Set the same content
-        split_editor.setPlainText(current_editor.toPlainText())
+        # Show the same document: edits, undo history and highlighting are shared,
+        # while each pane keeps its own cursor and scroll position
+        split_editor.setDocument(current_editor.document())
+        split_editor.setTextCursor(current_editor.textCursor())
         
         # Create line count widget for split editor
         split_line_count = LineCountWidget(split_editor)
@@ -7083,141 +12804,27 @@ class Pythonico(QtWidgets.QMainWindow):
         # Add only the editor to the layout (shared completer will be positioned dynamically)
         split_layout.addWidget(editor_widget)
         
-        # Set minimum size for split widget to match primary editor
+        # Set minimum size for each pane
         split_widget.setMinimumWidth(200)
         split_widget.setMinimumHeight(150)
         
-        # Set orientation and add to splitter
-        splitter.setOrientation(orientation)
-        splitter.addWidget(split_widget)
-        
-        # Force equal sizes for both panes
-        if orientation == QtCore.Qt.Orientation.Horizontal:
-            # Side by side - split width equally
-            total_width = splitter.size().width() if splitter.size().width() > 0 else 800
-            sizes = [total_width // 2, total_width // 2]
-        else:
-            # Top and bottom - split height equally  
-            total_height = splitter.size().height() if splitter.size().height() > 0 else 600
-            sizes = [total_height // 2, total_height // 2]
-        
-        splitter.setSizes(sizes)
-        
-        # Use a timer to ensure proper sizing after layout updates
-        QtCore.QTimer.singleShot(50, lambda: splitter.setSizes(sizes))
-        
-        # Set up syntax highlighting for split editor
-        split_highlighter = AdvancedPythonSyntaxHighlighter(split_editor.document())
-        
-        # Store split editor and highlighter references
-        self.split_editors[tab_index] = split_editor
-        self.split_highlighters[tab_index] = split_highlighter
-        
         # Set up auto-completion for split editor
         split_filter = AutoIndentFilter(split_editor)
         split_editor.installEventFilter(split_filter)
         
-        # Store reference to split editor for focus management
-        self.split_editors[tab_index] = split_editor
-        
-        # Add syncing flag to prevent recursion
-        if not hasattr(self, '_syncing_editors'):
-            self._syncing_editors = {}
-        self._syncing_editors[tab_index] = False
-        
         # Connect split editor text changes to update the shared completer
         split_editor.textChanged.connect(lambda: self.handle_split_editor_text_change(split_editor))
         
-        # Create focus event filter for managing shared completer
-        class FocusEventFilter(QtCore.QObject):
-            def __init__(self, parent_window):
-                super().__init__()
-                self.parent_window = parent_window
-                
-            def eventFilter(self, obj, event):
-                if event.type() == QtCore.QEvent.Type.FocusIn:
-                    if obj == split_editor:
-                        self.parent_window.switch_completer_to_editor(split_editor)
-                    elif obj == current_editor:
-                        self.parent_window.switch_completer_to_editor(current_editor)
-                return super().eventFilter(obj, event)
-        
-        # Install focus event filter
-        focus_filter = FocusEventFilter(self)
-        split_editor.installEventFilter(focus_filter)
-        current_editor.installEventFilter(focus_filter)
-        
-        # Sync content between main and split editor
-        def sync_to_split():
-            try:
-                if (split_editor is not None and not split_editor.hasFocus() 
-                    and not self._syncing_editors.get(tab_index, False)):
-                    # Set syncing flag to prevent recursion
-                    self._syncing_editors[tab_index] = True
-                    split_editor.setPlainText(current_editor.toPlainText())
-                    self._syncing_editors[tab_index] = False
-            except RuntimeError:
-                # Widget has been deleted, disconnect signal
-                current_editor.textChanged.disconnect(sync_to_split)
-                self._syncing_editors[tab_index] = False
-        
-        def sync_to_main():
-            try:
-                if (current_editor is not None and not current_editor.hasFocus() 
-                    and not self._syncing_editors.get(tab_index, False)):
-                    # Set syncing flag to prevent recursion
-                    self._syncing_editors[tab_index] = True
-                    current_editor.setPlainText(split_editor.toPlainText())
-                    self._syncing_editors[tab_index] = False
-            except RuntimeError:
-                # Widget has been deleted, disconnect signal
-                split_editor.textChanged.disconnect(sync_to_main)
-                self._syncing_editors[tab_index] = False
-        
-        current_editor.textChanged.connect(sync_to_split)
-        split_editor.textChanged.connect(sync_to_main)
+        # Move the shared completer to whichever pane gets focus
+        if not hasattr(self, 'pane_focus_filter'):
+            self.pane_focus_filter = PaneFocusFilter(self)
+        split_editor.installEventFilter(self.pane_focus_filter)
+        current_editor.installEventFilter(self.pane_focus_filter)
         
         # Update line count for split editor
         split_line_count.update_line_numbers()
-        
-        # Enhanced splitter configuration for better resizing
-        splitter.setHandleWidth(8)  # Wider handle for easier resizing
-        splitter.setChildrenCollapsible(False)  # Prevent panes from collapsing completely
-        
-        # Set custom splitter handle style
-        splitter.setStyleSheet("""
-            QSplitter::handle {
-                background-color: #3b4261;
-                border: 1px solid #565f89;
-                border-radius: 3px;
-            }
-            QSplitter::handle:hover {
-                background-color: #414868;
-                border: 1px solid #7aa2f7;
-            }
-            QSplitter::handle:pressed {
-                background-color: #7aa2f7;
-            }
-            QSplitter::handle:horizontal {
-                width: 8px;
-                image: url(data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==);
-            }
-            QSplitter::handle:vertical {
-                height: 8px;
-                image: url(data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==);
-            }
-        """)
-        
-        # Set equal sizes for split panes with minimum size constraints
-        total_width = splitter.width() if splitter.width() > 0 else 800
-        splitter.setSizes([total_width // 2, total_width // 2])
-        
-        # Set minimum sizes to prevent panes from becoming too small
-        for i in range(splitter.count()):
-            widget = splitter.widget(i)
-            if widget:
-                widget.setMinimumWidth(200)  # Minimum width for each pane
-                widget.setMinimumHeight(150)  # Minimum height for each pane
+        return split_widget, split_editor
+
 
     def apply_font_to_all_editors(self):
         font, ok = QtWidgets.QFontDialog.getFont()
@@ -7231,8 +12838,8 @@ class Pythonico(QtWidgets.QMainWindow):
                     editor.setFont(font)
             
             # Apply font to all split editors
-            for split_editor in self.split_editors.values():
-                if split_editor:
+            for panes in self.split_editors.values():
+                for split_editor in panes:
                     split_editor.setFont(font)
                 
             # Change font for all LineCountWidgets
@@ -7389,7 +12996,7 @@ class Pythonico(QtWidgets.QMainWindow):
 
                 # Close the initial "Untitled" tab if multiple tabs are being loaded
                 if len(session_data["text_files"]) > 1:
-                    self.tab_widget.removeTab(0)
+                    self.discard_tab(0)
 
                 # Load text files
                 for text_file in session_data["text_files"]:
@@ -7450,7 +13057,7 @@ class Pythonico(QtWidgets.QMainWindow):
                     self.save_file()
                 elif reply == QtWidgets.QMessageBox.StandardButton.Cancel:
                     return
-            self.tab_widget.removeTab(current_index)
+            self.discard_tab(current_index)
         self.tab_widget.tabBar().setVisible(False)
 
     def showMessageBox(self, message):
@@ -7463,6 +13070,13 @@ class Pythonico(QtWidgets.QMainWindow):
         
     def update_status_bar(self):
         current_index = self.tab_widget.currentIndex()
+        if current_index in self.viewers:
+            viewer = self.current_text_viewer()
+            if viewer is not None:
+                self.line_label.setText(f"Line: {viewer.cursor_line + 1}")
+                self.column_label.setText("Column: 1")
+            self.file_label.setText(f"File: {self.tab_widget.tabText(current_index)}")
+            return
         # Get editor from the editors dictionary using current tab index
         current_editor = self.editors.get(current_index) if current_index in self.editors else self.editor
 
@@ -7901,10 +13515,28 @@ class Pythonico(QtWidgets.QMainWindow):
             self.settings_manager.set("interface", "window_geometry", self.saveGeometry().data().hex())
             self.settings_manager.set("interface", "window_state", self.saveState().data().hex())
         
+        # Flush pending completion statistics
+        if hasattr(self, 'completion_frecency'):
+            self.completion_frecency.save()
+        if hasattr(self, 'signature_help'):
+            self.signature_help.wait_for_workers()
+        if hasattr(self, 'file_open_pipeline'):
+            self.file_open_pipeline.wait()
+        if hasattr(self, 'save_engine'):
+            self.save_engine.wait()
+        for view in getattr(self, 'viewers', {}).values():
+            view.close_file()
+        if hasattr(self, 'project_search'):
+            self.project_search.shutdown()
+        if hasattr(self, 'edit_journal'):
+            self.edit_journal.shutdown(clean=True)
+        
         self.cleanup_threads()
         event.accept()
 
 def main():
+    # Pool workers of the frozen build re-run this executable; let them run the worker instead
+    multiprocessing.freeze_support()
     app = QtWidgets.QApplication(sys.argv)
     editor = Pythonico()
     editor.show()